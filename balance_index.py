@@ -0,0 +1,36 @@
+class BalanceIndex:
+    """Name -> value lookups over one year's statement, built once per run instead of scanning the detail lists.
+
+    Sections are the balance sheet parts ('current_assets', 'equity', ...) and the statement's detail lists
+    ('GeneralAdminExpensesDetails', ...).
+    """
+
+    def __init__(self, statement):
+        sections = dict(statement['BalanceSheet'])
+        sections.update((key, value) for key, value in statement.items() if key.endswith('Details'))
+        self._first = {}  # section -> {name: (position, value)} of the first item with that name
+        self._totals = {}  # section -> {name: sum of every item with that name}
+        for section, details in sections.items():
+            if not isinstance(details, (list, tuple)):
+                continue
+            first = self._first[section] = {}
+            totals = self._totals[section] = {}
+            for position, item in enumerate(details):
+                first.setdefault(item['name'], (position, item['value']))
+                totals[item['name']] = totals.get(item['name'], 0) + item['value']
+
+    def value(self, section, name, default=0):
+        """Return the value of the first item called name in the section."""
+        found = self._first[section].get(name)
+        return found[1] if found else default
+
+    def first(self, section, names, default=0):
+        """Return the value of the earliest item in the section whose name is one of names."""
+        first = self._first[section]
+        found = [first[name] for name in names if name in first]
+        return min(found)[1] if found else default
+
+    def total(self, section, names):
+        """Return the sum of every item in the section whose name is one of names."""
+        totals = self._totals[section]
+        return sum(totals.get(name, 0) for name in dict.fromkeys(names))
@@ -0,0 +1,264 @@
+"""Generate audit and aux reports for many companies from a manifest, without the GUI.
+
+Usage:
+    python batch.py manifest.csv --workers 4 --summary results.json
+
+The manifest is a CSV file with one row per company, or a JSON/YAML file holding either a list of
+jobs or {"defaults": {...}, "jobs": [...]}. Each job takes the keyword arguments of
+DocumentGenerator.generate_document / generate_aux_document (excel_file, current_year, audit_type,
+company_name_en, directors, ...). A job writes the main report if it has an output_path and the
+aux report if it has an aux_output_path. Relative paths are resolved against the manifest's folder.
+Reports whose inputs are all unchanged since an earlier run are copied from the report cache;
+--force regenerates them.
+YAML manifests need PyYAML.
+"""
+import argparse
+import csv
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+MAIN_OUTPUT = 'output_path'
+AUX_OUTPUT = 'aux_output_path'
+PATH_FIELDS = ('excel_file', MAIN_OUTPUT, AUX_OUTPUT)
+# Fields holding names; CSV cells separate them with ';' or new lines
+LIST_FIELDS = ('directors', 'shareholders')
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+FALSE_VALUES = ('0', 'false', 'no', 'n', '')
+
+# Generator arguments that only make sense from code
+INTERNAL_ARGS = ('progress', 'metrics')
+
+# Values the GUI always passes that a manifest should not have to repeat
+JOB_DEFAULTS = {'business_type': 'general trading', 'has_stocking_letter': False, 'currency': 'HK$'}
+
+SUMMARY_FIELDS = ['id', 'status', 'message', 'outputs', 'seconds']
+
+# Set up once per worker process by _init_worker
+_category_manager = None
+_tb_cache = None
+_report_cache = None
+
+
+def load_manifest(path):
+    """Return the jobs in a CSV, JSON or YAML manifest, with defaults applied and paths made absolute."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            # Empty cells fall back to the generator defaults
+            content = [{key: value for key, value in row.items() if key and value not in (None, '')} for row in csv.DictReader(f)]
+    elif extension == '.json':
+        with open(path, encoding='utf-8') as f:
+            content = json.load(f)
+    elif extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("Reading YAML manifests requires PyYAML (pip install pyyaml)")
+        with open(path, encoding='utf-8') as f:
+            content = yaml.safe_load(f)
+    else:
+        raise ValueError(f"Unsupported manifest format '{extension}', expected .csv, .json, .yaml or .yml")
+
+    defaults = {}
+    if isinstance(content, dict):
+        defaults = content.get('defaults') or {}
+        content = content.get('jobs') or []
+    if not isinstance(content, list):
+        raise ValueError("The manifest must hold a list of jobs")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for number, entry in enumerate(content, start=1):
+        job = {**JOB_DEFAULTS, **defaults, **entry}
+        job['id'] = str(job.get('id') or number)
+        for field in PATH_FIELDS:
+            if job.get(field):
+                job[field] = os.path.join(base_dir, os.path.expanduser(str(job[field])))
+        jobs.append(job)
+    return jobs
+
+
+def _coerce(name, value, default):
+    """Convert a manifest value (usually a CSV string) to the type the generator expects."""
+    if not isinstance(value, str):
+        return value
+    if name in LIST_FIELDS:
+        return [item.strip() for item in value.replace(';', '\n').splitlines() if item.strip()]
+    if name == 'current_year':
+        return int(value)
+    if isinstance(default, bool) and value.strip().lower() in TRUE_VALUES + FALSE_VALUES:
+        return value.strip().lower() in TRUE_VALUES
+    return value
+
+
+def job_kwargs(job, method):
+    """Pick and convert the job fields accepted by a DocumentGenerator method.
+
+    Raises ValueError naming every required argument the job does not give.
+    """
+    kwargs, missing = {}, []
+    for name, parameter in inspect.signature(method).parameters.items():
+        if name in job and name not in INTERNAL_ARGS:
+            kwargs[name] = _coerce(name, job[name], parameter.default)
+        elif parameter.default is inspect.Parameter.empty:
+            missing.append(name)
+    if missing:
+        raise ValueError(f"Missing required field(s) for {method.__name__}: {', '.join(missing)}")
+    return kwargs
+
+
+def _init_worker(categories_file, tb_cache_dir, log_settings=None, report_cache_dir=None):
+    global _category_manager, _tb_cache, _report_cache
+    if log_settings is not None:
+        # Each worker process writes through its own queue listener
+        from log_config import configure_logging
+        configure_logging(**log_settings)
+    from gui.category_manager import CategoryManager
+    from tb_cache import TBCache
+    from report_cache import ReportCache
+    _category_manager = CategoryManager(categories_file)
+    _tb_cache = TBCache(tb_cache_dir) if tb_cache_dir else None
+    _report_cache = ReportCache(report_cache_dir) if report_cache_dir else None
+
+
+def run_job(job):
+    """Generate the reports of one job and return its summary entry."""
+    from document_generator import DocumentGenerator
+
+    started = time.perf_counter()
+    status, messages, outputs, metrics = 'ok', [], [], {}
+    generator = DocumentGenerator(_category_manager, tb_cache=_tb_cache, report_cache=_report_cache)
+    # The aux report goes first, like in the GUI; the main report reuses its loaded TB
+    for method, output_field in ((generator.generate_aux_document, AUX_OUTPUT), (generator.generate_document, MAIN_OUTPUT)):
+        if not job.get(output_field):
+            continue
+        try:
+            outcome = method(**job_kwargs(job, method))
+            result, message = outcome
+            metrics[output_field] = outcome.metrics.to_dict()
+        except Exception as e:
+            result, message = None, str(e)
+        if result:
+            outputs.append(job[output_field])
+            if message:
+                status = 'warning' if status == 'ok' else status
+                messages.append(message)
+        else:
+            status = 'error'
+            messages.append(message or f"Failed to generate {job[output_field]}")
+    if not outputs and status == 'ok':
+        status, messages = 'error', [f"Job has neither {MAIN_OUTPUT} nor {AUX_OUTPUT}"]
+    return {
+        'id': job['id'],
+        'status': status,
+        'message': "; ".join(messages),
+        'outputs': outputs,
+        'seconds': round(time.perf_counter() - started, 3),
+        'metrics': metrics,
+    }
+
+
+def run_batch(jobs, workers=None, categories_file='categories.json', tb_cache_dir=None, log_settings=None,
+              report_cache_dir=None):
+    """Run every job, in a process pool unless workers is 1, and return the summaries in manifest order.
+
+    log_settings are the configure_logging arguments for the worker processes.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    results = [None] * len(jobs)
+    if workers == 1:
+        _init_worker(categories_file, tb_cache_dir, report_cache_dir=report_cache_dir)
+        for position, job in enumerate(jobs):
+            results[position] = run_job(job)
+            _print_result(results[position])
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(categories_file, tb_cache_dir, log_settings, report_cache_dir)) as executor:
+            futures = {executor.submit(run_job, job): position for position, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                position = futures[future]
+                job = jobs[position]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself failed, e.g. it was killed
+                    result = {'id': job['id'], 'status': 'error', 'message': str(e), 'outputs': [], 'seconds': None, 'metrics': {}}
+                results[position] = result
+                _print_result(result)
+    return results
+
+
+def _print_result(result):
+    line = f"[{result['status']}] {result['id']}"
+    if result['message']:
+        line += f": {result['message']}"
+    print(line, flush=True)
+
+
+def write_summary(path, results):
+    """Write the job summaries to a .csv file, or to JSON for any other extension; only JSON has the run metrics."""
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for result in results:
+                writer.writerow(dict(result, outputs=";".join(result['outputs'])))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate audit and aux reports for every company in a manifest.")
+    parser.add_argument('manifest', help="CSV, JSON or YAML file with one job per company")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help="worker processes (default: CPU count)")
+    parser.add_argument('--summary', help="write the per-job results to this .json or .csv file")
+    parser.add_argument('--categories', default='categories.json', help="category configuration file (default: categories.json)")
+    parser.add_argument('--no-tb-cache', action='store_true', help="do not use the on-disk cache of parsed TB sheets")
+    parser.add_argument('--no-report-cache', action='store_true', help="do not reuse or store generated reports")
+    parser.add_argument('--force', action='store_true', help="regenerate every report even if its inputs are unchanged")
+    parser.add_argument('--log-file', help="also write the log to this file")
+    parser.add_argument('--log-level', default='WARNING',
+                        help="log level, optionally per subsystem, e.g. INFO,document_generator=DEBUG (default: WARNING)")
+    args = parser.parse_args(argv)
+
+    from log_config import configure_logging, parse_levels
+    try:
+        levels = parse_levels(args.log_level)
+    except ValueError as e:
+        parser.error(str(e))
+    log_settings = {'log_file': args.log_file, 'level': levels.pop('', logging.WARNING), 'levels': levels, 'console': True}
+    configure_logging(**log_settings)
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        parser.error(f"Cannot read manifest: {str(e)}")
+
+    if args.force:
+        for job in jobs:
+            job['force'] = True
+
+    from tb_cache import DEFAULT_CACHE_DIR
+    from report_cache import DEFAULT_CACHE_DIR as DEFAULT_REPORT_CACHE_DIR
+    started = time.perf_counter()
+    results = run_batch(jobs, args.workers, args.categories, None if args.no_tb_cache else DEFAULT_CACHE_DIR, log_settings,
+                        None if args.no_report_cache else DEFAULT_REPORT_CACHE_DIR)
+    if args.summary:
+        write_summary(args.summary, results)
+
+    counts = {status: sum(1 for result in results if result['status'] == status) for status in ('ok', 'warning', 'error')}
+    print(f"{len(results)} jobs in {time.perf_counter() - started:.1f}s: "
+          f"{counts['ok']} ok, {counts['warning']} with warnings, {counts['error']} failed")
+    return 1 if counts['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
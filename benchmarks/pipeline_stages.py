@@ -0,0 +1,165 @@
+"""Time each report pipeline stage on synthetic trial balances and fail when a stage regresses past its baseline.
+
+Usage:
+    python benchmarks/pipeline_stages.py [--sizes 50 500 5000 50000] [--audit-types WH LAI] [--repeat 3]
+    python benchmarks/pipeline_stages.py --save-baseline
+
+For every TB size (lines per sheet) the script writes a synthetic workbook (see synthetic_tb.py), then
+times DataLoader._load_data and _categorize_items, and for every audit type the context building,
+template render and post-processing stages of generate_document, using the spans of its RunMetrics.
+Each figure is the median of --repeat runs.
+
+Results are compared with the baseline file; a stage fails when it is more than --threshold slower than
+its baseline and by more than --min-delta-ms. Baselines depend on the machine, so record them with
+--save-baseline on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from synthetic_tb import write_workbook  # noqa: E402
+
+DEFAULT_SIZES = (50, 500, 5000, 50000)
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baselines', 'pipeline_stages.json')
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 5.0
+CURRENT_YEAR = 2024
+
+# generate_document arguments other than the TB, audit type and output path
+REPORT_ARGS = dict(
+    business_type="general trading", current_year=CURRENT_YEAR, company_name_en="Synthetic Limited",
+    company_name_cn="合成有限公司", company_address="1 Benchmark Road\nHong Kong", business_description="trading",
+    last_day_of_year="31 December 2024", approval_date="1 April 2025", directors=["Director One", "Director Two"],
+    shareholders=["Director One"], investment_in_company=True, capital_increase="no_change",
+    date_of_incorporation="1 January 2020",
+)
+
+
+def _median(run, repeat):
+    """Call run() repeat times and return the median time it took, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def measure(sizes, audit_types, repeat, first_year=False, decimals=False):
+    """Return {'<size>/<stage>' or '<size>/<audit type>/<stage>': median seconds}."""
+    from document_generator import DocumentGenerator
+    from generation_stages import STAGE_BUILDING_CONTEXT, STAGE_RENDERING, STAGE_POST_PROCESSING
+    from gui.category_manager import CategoryManager
+
+    report_stages = {'context': STAGE_BUILDING_CONTEXT, 'render': STAGE_RENDERING, 'post_process': STAGE_POST_PROCESSING}
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The synthetic items come from the default categories, so no categories.json is read
+        generator = DocumentGenerator(CategoryManager(os.path.join(work_dir, 'categories.json')))
+        # Template loading and compiling is paid once per process, not per report
+        for audit_type in audit_types:
+            generator.warm_up_templates(audit_type).join()
+        for size in sizes:
+            workbook = write_workbook(os.path.join(work_dir, f'tb_{size}.xlsx'), rows=size, decimals=decimals)
+            loader = generator._get_accountant_helper(workbook, first_year, CURRENT_YEAR)
+
+            results[f'{size}/load'] = _median(loader._load_data, repeat)
+            results[f'{size}/categorize'] = _median(lambda: loader._categorize_items(CURRENT_YEAR), repeat)
+            _print_progress(size, 'load', results)
+            _print_progress(size, 'categorize', results)
+
+            for audit_type in audit_types:
+                output_path = os.path.join(work_dir, f'report_{size}_{audit_type}.docx')
+                spans = {stage: [] for stage in report_stages}
+                for _ in range(repeat):
+                    outcome = generator.generate_document(
+                        excel_file=loader, output_path=output_path, audit_type=audit_type, first_year=first_year, **REPORT_ARGS)
+                    if outcome.result is None:
+                        raise RuntimeError(f"{audit_type} report failed on {size} TB lines: {outcome.message}")
+                    seconds = dict(outcome.metrics.spans)
+                    for stage, span in report_stages.items():
+                        spans[stage].append(seconds[span])
+                for stage, timings in spans.items():
+                    results[f'{size}/{audit_type}/{stage}'] = statistics.median(timings)
+                    _print_progress(size, f'{audit_type}/{stage}', results)
+    return results
+
+
+def _print_progress(size, stage, results):
+    print(f"  {size:>6} lines  {stage:<22} {results[f'{size}/{stage}'] * 1000:10.1f} ms", flush=True)
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Return the (key, seconds, baseline seconds) of every stage slower than threshold allows."""
+    regressions = []
+    for key, seconds in results.items():
+        base = baseline.get(key)
+        if base is not None and seconds > base * (1 + threshold) and seconds - base > min_delta:
+            regressions.append((key, seconds, base))
+    return regressions
+
+
+def main(argv=None):
+    from document_generator import DocumentGenerator
+
+    audit_types = sorted(key for key in DocumentGenerator.FILE_TPLS if not key.endswith('_1'))
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline stages against a baseline.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f"TB lines per sheet (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--audit-types', nargs='+', default=audit_types, choices=audit_types,
+                        help="report templates to render (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per measurement; the median is kept (default: 3)")
+    parser.add_argument('--first-year', action='store_true', help="use the first-year templates")
+    parser.add_argument('--decimals', action='store_true', help="use TB amounts with two decimals")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline and exit")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed slowdown as a fraction of the baseline (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help=f"ignore slowdowns smaller than this (default: {DEFAULT_MIN_DELTA_MS} ms)")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    args.baseline = os.path.abspath(args.baseline)
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    # Relative template paths are resolved against the working directory
+    os.chdir(REPO_DIR)
+    results = measure(args.sizes, args.audit_types, args.repeat, args.first_year, args.decimals)
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms / 1000)
+    for key, seconds, base in regressions:
+        print(f"FAIL: {key} took {seconds * 1000:.1f} ms, baseline {base * 1000:.1f} ms (+{(seconds / base - 1) * 100:.0f}%)")
+    if regressions:
+        return 1
+    print(f"OK: {len(results)} stages within {args.threshold * 100:.0f}% of the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Measure how long importing the GUI takes, with python -X importtime, and fail when it exceeds a budget.
+
+Usage:
+    python benchmarks/startup_import_time.py [--runs 5] [--budget-ms 250] [--top 15]
+
+Each run imports gui.main_gui in a fresh interpreter. The script prints the median total import time and
+the slowest modules, and exits with status 1 if the median is over the budget or if a module that should
+load lazily (pandas, docxtpl, python-docx, ...) was imported at startup.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_MODULE = 'gui.main_gui'
+DEFAULT_BUDGET_MS = 250
+
+# Loaded on first use or by the background warm-up, never before the window is shown
+LAZY_MODULES = ('pandas', 'numpy', 'openpyxl', 'docx', 'docxtpl', 'lxml', 'jinja2', 'dateutil', 'document_generator', 'data_loader')
+
+
+def measure_once():
+    """Import the startup module in a new interpreter; return {module: cumulative microseconds} and the lazy modules it loaded."""
+    code = (
+        f"import sys, {STARTUP_MODULE}\n"
+        f"print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    # Run in a scratch directory so nothing the import writes lands in the tree
+    with tempfile.TemporaryDirectory() as work_dir:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=work_dir, env=env,
+                                capture_output=True, text=True, check=True)
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative)
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return timings, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the GUI import time against a budget.")
+    parser.add_argument('--runs', type=int, default=5, help="number of fresh interpreters to time (default: 5)")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"maximum median import time in milliseconds (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument('--top', type=int, default=15, help="number of slowest modules to list (default: 15)")
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(args.runs)]
+    totals = [timings[STARTUP_MODULE] / 1000 for timings, _ in runs]
+    median_ms = statistics.median(totals)
+
+    timings, loaded = runs[-1]
+    print("Slowest imports of the last run (cumulative ms):")
+    for name, micros in sorted(timings.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {micros / 1000:8.1f}  {name}")
+    print(f"{STARTUP_MODULE}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}), budget {args.budget_ms:.0f} ms")
+
+    failed = False
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import time is {median_ms - args.budget_ms:.1f} ms over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: modules that should load lazily were imported at startup: {', '.join(loaded)}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Generate synthetic trial balance workbooks for benchmarks and manual testing.
+
+Usage:
+    python benchmarks/synthetic_tb.py out.xlsx [--rows 5000] [--years 2024 2023] [--decimals] [--seed 0]
+
+Every '{year}TB' sheet has the 3 header rows, the TB lines from row 4 and the closing '合計' and
+'董事簽名：' lines, like the client workbooks. Item names are drawn from
+CategoryManager.load_default_categories. Each year balances: its 'Balance b/f current period' line is set so
+that net assets equal equity plus retained earnings, and its closing inventories match its inventories, so
+the sheets go through DocumentGenerator without errors or warnings.
+"""
+import argparse
+import os
+import random
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from data_loader import VALID_ITEM_NAME, TERMINATOR_ITEMS  # noqa: E402
+from gui.category_manager import CategoryManager  # noqa: E402
+
+HEADER_ROWS = (["Company"], ["Trial balance"], ["Item", "Debtor", "Creditor"])
+
+# Default share of the filler lines drawn from each category
+DEFAULT_MIX = {
+    'general_admin_expenses_items': 0.35,
+    'current_assets': 0.2,
+    'current_liabilities': 0.15,
+    'other_income_items': 0.1,
+    'revenue_items': 0.07,
+    'cost_of_sales_items': 0.07,
+    'non_current_assets': 0.04,
+    'non_current_liabilities': 0.01,
+    'finance_costs_items': 0.01,
+}
+
+# Side of the TB each category's amounts are entered on
+DEBIT_CATEGORIES = ('non_current_assets', 'current_assets', 'cost_of_sales_items', 'general_admin_expenses_items', 'finance_costs_items')
+CREDIT_CATEGORIES = ('current_liabilities', 'non_current_liabilities', 'revenue_items', 'other_income_items')
+
+# Lines every sheet has once; they are never used as filler
+FIXED_ITEMS = ('inventories', 'closing inventories', 'share capital', 'reserves', 'dividends paid to shareholders')
+
+RELATED_PARTY_PREFIXES = ('amount due from ', 'amount due to ')
+
+
+def default_categories():
+    """Return the default category lists, keeping only item names the TB validation accepts."""
+    categories = CategoryManager.load_default_categories(None)
+    return {
+        category: [item for item in items if VALID_ITEM_NAME.fullmatch(item) and item not in FIXED_ITEMS]
+        for category, items in categories.items()
+    }
+
+
+class SyntheticTB:
+    """Builds the TB lines of one year.
+
+    rows is the number of TB lines before the closing lines. mix maps category keys to the share of filler
+    lines drawn from them (DEFAULT_MIX). related_parties adds one due-from or due-to line per related-party
+    family. decimals gives every amount two decimals.
+    """
+
+    def __init__(self, rows=500, mix=None, decimals=False, related_parties=True, seed=0, categories=None):
+        self.rows = rows
+        self.mix = mix or DEFAULT_MIX
+        self.decimals = decimals
+        self.related_parties = related_parties
+        self.random = random.Random(seed)
+        self.categories = categories or default_categories()
+
+    def _cents(self, low=100, high=50000):
+        cents = self.random.randint(low, high) * 100
+        return cents + self.random.randint(1, 99) if self.decimals else cents
+
+    def lines(self):
+        """Return the TB lines as (item, debtor cents, creditor cents) tuples; the amounts are in cents."""
+        lines = []
+
+        def add(category, item, cents=None):
+            cents = self._cents() if cents is None else cents
+            lines.append((item, cents, 0) if category in DEBIT_CATEGORIES else (item, 0, cents))
+
+        add('current_assets', 'cash and bank balances')
+        inventories = self._cents()
+        add('current_assets', 'inventories', inventories)
+        add('revenue_items', 'sales of goods', self._cents(500000, 5000000))
+        add('cost_of_sales_items', 'opening inventories')
+        add('cost_of_sales_items', 'purchases')
+        # Closing inventories are entered as a negative debit equal to the inventories
+        lines.append(('closing inventories', -inventories, 0))
+        for item in ('audit fee', "director's remuneration", 'salaries'):
+            add('general_admin_expenses_items', item)
+        add('current_liabilities', 'accrued expenses')
+        lines.append(('share capital', 0, 10000 * 100))
+        lines.append(('reserves', 0, self._cents()))
+        lines.append(('dividends paid to shareholders', self._cents(), 0))
+        lines.append(('taxation', self._cents(), 0))
+
+        if self.related_parties:
+            for family in ('director', 'shareholder', 'final holding parent company', 'immediate parent company',
+                           'holding company', 'ultimate holding company', 'related company'):
+                side = self.random.choice(RELATED_PARTY_PREFIXES)
+                category = 'current_assets' if side == 'amount due from ' else 'current_liabilities'
+                names = [item for item in self.categories[category] if item.startswith(side) and item.endswith(family)]
+                if names:
+                    add(category, self.random.choice(names))
+
+        # One line is kept for the balance b/f
+        filler = max(0, self.rows - len(lines) - 1)
+        mix = [(category, share) for category, share in self.mix.items() if self.categories.get(category)]
+        chosen = self.random.choices([category for category, _ in mix], [share for _, share in mix], k=filler)
+        for category in chosen:
+            add(category, self.random.choice(self.categories[category]))
+
+        lines.append(('balance b/f current period',) + self._balance_before(lines))
+        return lines
+
+    @staticmethod
+    def _balance_before(lines):
+        """Return the (debtor, creditor) cents of the balance b/f that makes the year balance.
+
+        The TB balances when debits equal credits, with closing inventories entered as a negative debit.
+        """
+        difference = sum(debtor - creditor for _, debtor, creditor in lines)
+        return (0, difference) if difference >= 0 else (-difference, 0)
+
+    def sheet_rows(self):
+        """Return the worksheet rows: headers, TB lines with amounts in dollars, then the closing lines."""
+        def amount(cents):
+            if not cents:
+                return None
+            return cents / 100 if self.decimals else cents // 100
+
+        rows = [list(row) for row in HEADER_ROWS]
+        rows.extend([item.capitalize(), amount(debtor), amount(creditor)] for item, debtor, creditor in self.lines())
+        rows.extend([item, None, None] for item in TERMINATOR_ITEMS)
+        return rows
+
+
+def make_sheets(years=(2024, 2023), rows=500, seed=0, **options):
+    """Return {sheet name: worksheet rows} for each year, with a different random seed per year."""
+    return {
+        f"{year}TB": SyntheticTB(rows=rows, seed=seed * 10007 + year, **options).sheet_rows()
+        for year in years
+    }
+
+
+def make_frames(years=(2024, 2023), rows=500, seed=0, **options):
+    """Return {sheet name: DataFrame} in the form DataLoader accepts instead of a workbook path."""
+    import pandas as pd
+    from data_loader import TB_FIRST_ROW
+
+    return {
+        sheet: pd.DataFrame(sheet_rows[TB_FIRST_ROW - 1:], columns=[0, 1, 2])
+        for sheet, sheet_rows in make_sheets(years, rows, seed, **options).items()
+    }
+
+
+def write_workbook(path, years=(2024, 2023), rows=500, seed=0, **options):
+    """Write a synthetic TB workbook to path with openpyxl's write-only mode."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet, sheet_rows in make_sheets(years, rows, seed, **options).items():
+        worksheet = workbook.create_sheet(sheet)
+        for row in sheet_rows:
+            worksheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic trial balance workbook.")
+    parser.add_argument('output', help=".xlsx file to write")
+    parser.add_argument('--rows', type=int, default=500, help="TB lines per sheet (default: 500)")
+    parser.add_argument('--years', type=int, nargs='+', default=[2024, 2023], help="years to write a TB sheet for")
+    parser.add_argument('--decimals', action='store_true', help="give every amount two decimals")
+    parser.add_argument('--no-related-parties', action='store_true', help="leave out the related-party lines")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    write_workbook(args.output, args.years, args.rows, args.seed, decimals=args.decimals,
+                   related_parties=not args.no_related_parties)
+    print(f"Wrote {args.output}: {', '.join(f'{year}TB' for year in args.years)} with {args.rows} lines each")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+from collections import namedtuple
+
+# Items that carry the opening retained earnings; they are valid TB lines but
+# are picked up separately by DataLoader._get_balance_before_period
+BALANCE_BEFORE_ITEMS = ('balance before current period', 'balance bf current period', 'balance b/f current period')
+
+# Lines that appear in the TB sheet but are never categorized
+IGNORED_ITEMS = frozenset(['董事簽名：', '合計', '0', 'taxation'])
+
+# Income statement sections in precedence order: (category key, section, (debtor factor, creditor factor))
+STATEMENT_SECTIONS = (
+    ('revenue_items', 'revenue', (0, 1)),
+    ('cost_of_sales_items', 'cost_of_sales', (1, 0)),
+    ('closing_inventories', 'closing_inventories', (-1, 0)),
+    ('other_income_items', 'other_income', (0, 1)),
+    ('general_admin_expenses_items', 'general_admin_expenses', (1, 0)),
+    ('finance_costs_items', 'finance_costs', (-1, 0)),
+)
+
+# Balance sheet sections in precedence order: (category key, (debtor factor, creditor factor))
+BALANCE_SECTIONS = (
+    ('non_current_assets', (1, 0)),
+    ('current_assets', (1, 0)),
+    ('current_liabilities', (0, 1)),
+    ('non_current_liabilities', (0, 1)),
+    ('equity', (-1, 1)),
+)
+
+STATEMENT_SIGNS = {section: sign for _, section, sign in STATEMENT_SECTIONS}
+BALANCE_SIGNS = dict(BALANCE_SECTIONS)
+
+# statement/balance are section names (or None); the signs are (debtor factor, creditor factor)
+CategoryEntry = namedtuple('CategoryEntry', ['statement', 'balance', 'statement_sign', 'balance_sign'])
+
+
+def normalize_item(item):
+    """Normalize a TB item or category name for lookups."""
+    return str(item).strip().lower()
+
+
+class CategoryIndex:
+    """Precompiled item name -> CategoryEntry map built from the category lists."""
+
+    def __init__(self, categories):
+        self._entries = {}
+        statement = {}
+        balance = {}
+        # Flat item -> section maps for Series.map in DataLoader._categorize_items
+        self.statement_sections = {}
+        self.balance_sections = {}
+
+        for key, section, sign in STATEMENT_SECTIONS:
+            items = categories.get(key) or []
+            if key == 'closing_inventories':
+                # Only the first closing inventories name is treated as the closing stock line
+                items = [items] if isinstance(items, str) else items[:1]
+            for item in items:
+                statement.setdefault(normalize_item(item), (section, sign))
+
+        for key, sign in BALANCE_SECTIONS:
+            for item in categories.get(key) or []:
+                balance.setdefault(normalize_item(item), (key, sign))
+
+        valid_items = set(statement) | set(balance)
+        for key in ('closing_inventories', 'tax_items'):
+            items = categories.get(key) or []
+            valid_items.update(normalize_item(item) for item in ([items] if isinstance(items, str) else items))
+        valid_items.update(BALANCE_BEFORE_ITEMS)
+
+        for item in valid_items:
+            statement_section, statement_sign = statement.get(item, (None, None))
+            balance_section, balance_sign = balance.get(item, (None, None))
+            self._entries[item] = CategoryEntry(statement_section, balance_section, statement_sign, balance_sign)
+            if statement_section:
+                self.statement_sections[item] = statement_section
+            if balance_section:
+                self.balance_sections[item] = balance_section
+        self.valid_items = frozenset(self._entries)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, item, default=None):
+        """Return the CategoryEntry for an already normalized item name."""
+        return self._entries.get(item, default)
+
+    def classify(self, item):
+        """Return the CategoryEntry for a raw item name, or None if it is not a known item."""
+        return self._entries.get(normalize_item(item))
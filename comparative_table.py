@@ -0,0 +1,45 @@
+"""Two-year comparative tables: the current and previous year details of a statement section joined by item name."""
+
+
+def values_by_name(details):
+    """Map item names to values; the first entry wins when a name repeats."""
+    values = {}
+    for item in details:
+        values.setdefault(item['name'], item['value'])
+    return values
+
+
+def order_names(names, priority=(), others=True):
+    """Put the priority names first, in their given order, then the other names sorted unless others is False."""
+    ordered = [name for name in priority if name in names]
+    if others:
+        ordered.extend(sorted(name for name in names if name not in priority))
+    return ordered
+
+
+def comparative_rows(current, previous, format_values, priority=(), others=True, footnotes=None):
+    """Build the template rows of one section from its current and previous year details.
+
+    format_values(names, values) formats the amounts of a list of rows in one call and returns their strings.
+    Rows get an 'fnnum' key when footnotes maps item names to note numbers. A name missing from one year shows
+    that year's value as 0.
+    """
+    current_values = values_by_name(current)
+    previous_values = values_by_name(previous)
+    names = order_names(current_values.keys() | previous_values.keys(), priority, others)
+    amounts = format_values(
+        names * 2,
+        [current_values.get(name, 0) for name in names] + [previous_values.get(name, 0) for name in names],
+    )
+    rows = []
+    for idx, name in enumerate(names):
+        row = {
+            'name': name.capitalize(),
+            'cu': amounts[idx],
+            'pr': amounts[len(names) + idx],
+        }
+        if footnotes is not None:
+            row['fnnum'] = str(footnotes.get(name, ""))
+        row['is_last'] = idx == len(names) - 1
+        rows.append(row)
+    return rows
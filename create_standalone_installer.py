@@ -11,7 +11,7 @@ PROJECT_NAME = "AuditReport"
 MAIN_SCRIPT = "main.py"  # Main Python script
 OUTPUT_DIR = "dist"
 INSTALLER_DIR = "installer"
-RESOURCES = ["__init__.py", "data_loader.py", "document_generator.py", "exceptions.py", "utils.py", "template", "gui"]
+RESOURCES = ["__init__.py", "balance_index.py", "category_index.py", "comparative_table.py", "data_loader.py", "document_generator.py", "exceptions.py", "generation_stages.py", "instrumentation.py", "lazy_import.py", "log_config.py", "number_format.py", "report_cache.py", "tb_cache.py", "tb_sheets.py", "template_cache.py", "utils.py", "template", "gui"]
 PYTHON_VERSION = "3.9"  # Adjust based on your Python version
 ICON_PATH = "app.ico"  # Optional: Path to an icon file
 UPX_DIR = "D:\\program files\\upx-5.0.0-win64"  # UPX installation directory
@@ -80,7 +80,19 @@ def bundle_with_pyinstaller():
         # Custom modules (verify if needed)
         "--hidden-import", "document_generator",
         "--hidden-import", "data_loader",
+        "--hidden-import", "balance_index",
+        "--hidden-import", "number_format",
+        "--hidden-import", "report_cache",
+        "--hidden-import", "instrumentation",
+        "--hidden-import", "category_index",
+        "--hidden-import", "comparative_table",
         "--hidden-import", "exceptions",
+        "--hidden-import", "generation_stages",
+        "--hidden-import", "lazy_import",
+        "--hidden-import", "log_config",
+        "--hidden-import", "tb_cache",
+        "--hidden-import", "tb_sheets",
+        "--hidden-import", "template_cache",
         "--hidden-import", "utils",
         # TCL/TK for tkinter
         "--add-data", "C:\\Program Files\\Python39\\tcl\\tcl8.6;tcl\\tcl8.6",
@@ -1,11 +1,51 @@
+import io
+import os
+import numpy as np
 import pandas as pd
 import re
-from exceptions import InvalidTBSheetFormatError, InvalidItemNameError, UnrecognizedItemError
+from pandas.errors import ParserError
+from types import MappingProxyType
+from category_index import CategoryIndex, IGNORED_ITEMS, BALANCE_BEFORE_ITEMS, STATEMENT_SIGNS, BALANCE_SIGNS
+from exceptions import InvalidTBSheetFormatError, InvalidItemNameError, UnrecognizedItemError, MissingTBSheetError
+
+# Rows that close the TB listing; both backends stop reading at the first one
+TERMINATOR_ITEMS = ('合計', '董事簽名：')
+
+# Excel row of the first TB line, below the 3 header rows
+TB_FIRST_ROW = 4
+
+# Item names may contain only letters, spaces and simple punctuation
+VALID_ITEM_NAME = re.compile(r"[a-zA-Z\s\/\-,\.\']+")
+
+# Validation failures that depend only on the workbook contents, so they are cached too
+CACHED_ERRORS = {
+    error.__name__: error for error in (InvalidTBSheetFormatError, InvalidItemNameError, MissingTBSheetError)
+}
+
+# Sources DataLoader can read the TB sheets with
+BACKENDS = ('pandas', 'openpyxl')
+
+
+def _freeze(value):
+    """Return a read-only view of a statement: dicts become mapping proxies and lists become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
 class DataLoader:
+    """Parse the TB sheets of a workbook and categorize them into statements.
+
+    excel_file is the workbook path, its bytes, or a dict mapping sheet names such as '2024TB' to
+    DataFrames already read from the workbook (columns A-C, from row 4).
+    """
+
     def __init__(self, excel_file, first_year, current_year, non_current_assets, current_assets, current_liabilities,
                  non_current_liabilities, equity, revenue_items, cost_of_sales_items, closing_inventories,
-                 other_income_items, general_admin_expenses_items, finance_costs_items, tax_items):
+                 other_income_items, general_admin_expenses_items, finance_costs_items, tax_items, category_index=None,
+                 backend='pandas', cache=None):
         self.excel_file = excel_file
         self.first_year = first_year
         self.current_year = current_year
@@ -24,132 +64,208 @@ class DataLoader:
         self.general_admin_expenses_items = general_admin_expenses_items
         self.finance_costs_items = finance_costs_items
         self.tax_items = tax_items
+        if category_index is None:
+            category_index = CategoryIndex({
+                'non_current_assets': non_current_assets,
+                'current_assets': current_assets,
+                'current_liabilities': current_liabilities,
+                'non_current_liabilities': non_current_liabilities,
+                'equity': equity,
+                'revenue_items': revenue_items,
+                'cost_of_sales_items': cost_of_sales_items,
+                'closing_inventories': closing_inventories,
+                'other_income_items': other_income_items,
+                'general_admin_expenses_items': general_admin_expenses_items,
+                'finance_costs_items': finance_costs_items,
+                'tax_items': tax_items
+            })
+        self.category_index = category_index
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown TB backend '{backend}', expected one of: {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.cache = cache  # Optional TBCache of parsed sheets
+        self.loaded_from_cache = False  # True when self.data came from the TBCache
         self.use_two_decimals = False  # Initialize precision flag
-        self.data = self._load_data()
-
-    def _load_data(self):
-        try:
-            xl = pd.ExcelFile(self.excel_file)
-            sheet_names = xl.sheet_names
-            data = {}
-
-            # Regular expression to match only letters and spaces
-            valid_item_name_pattern = r'^[a-zA-Z\s\/\-,\.\']+$'
-
-            def validate_item_name(item, sheet_name):
-                if pd.isna(item) or not str(item).strip() or str(item).strip() in ('合計', '董事簽名：'):
-                    return
-                item_str = str(item).strip()
-                if not re.match(valid_item_name_pattern, item_str):
-                    raise InvalidItemNameError(
-                        f"Invalid item name '{item_str}' in sheet '{sheet_name}'. "
-                        "Item names must contain only letters and spaces."
-                    )
-
-            # Helper function to check if a value has decimal places
-            def has_decimal(value):
-                if pd.isna(value):
-                    return False
-                try:
-                    float_val = float(value)
-                    return abs(float_val - round(float_val)) > 1e-6
-                except (ValueError, TypeError):
-                    return False
-
-            # Load current year TB
-            if self.current_sheet not in sheet_names:
-                raise ValueError(f"Sheet {self.current_sheet} not found in Excel file")
-            current_df = pd.read_excel(xl, sheet_name=self.current_sheet, header=None, skiprows=3)
-            if len(current_df.columns) < 3:
+        self._statement_cache = {}  # year -> (data frame, category index, precision, statement)
+        self.data = self._load_cached_data()
+
+    def _required_sheets(self, sheet_names):
+        """Return the TB sheets to load, raising MissingTBSheetError if any are not in the workbook."""
+        sheets = [self.current_sheet] if self.first_year else [self.current_sheet, self.previous_sheet]
+        missing_sheets = [sheet for sheet in sheets if sheet not in sheet_names]
+        if missing_sheets:
+            raise MissingTBSheetError(
+                "Required sheets not found: "
+                f"The Excel file does not contain the required sheet(s): {', '.join(missing_sheets)}.\n"
+                f"The Excel file contains the following sheets: {', '.join(sheet_names)}."
+            )
+        return sheets
+
+    def _read_tb_sheets(self):
+        """Open the workbook once and parse only the TB sheets, columns A-C from row 4."""
+        if isinstance(self.excel_file, dict):
+            sheets = self._required_sheets(list(self.excel_file))
+            return {sheet: self.excel_file[sheet].iloc[:, :3].copy() for sheet in sheets}
+        if self.backend == 'openpyxl' and str(self.excel_file).lower().endswith(('.xlsx', '.xlsm')):
+            return self._stream_tb_sheets()
+        source = io.BytesIO(self.excel_file) if isinstance(self.excel_file, bytes) else self.excel_file
+        with pd.ExcelFile(source) as xl:
+            sheets = self._required_sheets(xl.sheet_names)
+            try:
+                return pd.read_excel(xl, sheet_name=sheets, header=None, skiprows=TB_FIRST_ROW - 1, usecols="A:C")
+            except ParserError:
+                # Raised when a sheet has fewer than 3 columns
                 raise InvalidTBSheetFormatError(
                     "Failed to recognize the sheets. The first 3 rows are the headers, "
                     "the data should start from row 4 with columns 'Item', 'Debtor', 'Creditor'."
                 )
-            current_df.columns = ['Item', 'Debtor', 'Creditor']
-            current_df['Item'] = current_df['Item'].astype(str).str.strip().str.lower()
-            current_df = current_df[current_df['Item'].notna() & (current_df['Item'] != "") & (current_df['Item'] != "nan")]
-            current_df[['Debtor', 'Creditor']] = current_df[['Debtor', 'Creditor']].fillna(0)
-
-            # Check for decimal values in current year
-            for col in ['Debtor', 'Creditor']:
-                if any(has_decimal(val) for val in current_df[col]):
-                    self.use_two_decimals = True
-                    break
 
-            # Validate item names for current year
-            for item in current_df['Item']:
-                validate_item_name(item, self.current_sheet)
-            try:
-                current_df['Debtor'] = pd.to_numeric(current_df['Debtor'], errors='raise')
-                current_df['Creditor'] = pd.to_numeric(current_df['Creditor'], errors='raise')
-                if self.use_two_decimals:
-                    current_df['Debtor'] = current_df['Debtor'].round(2)
-                    current_df['Creditor'] = current_df['Creditor'].round(2)
-                else:
-                    current_df['Debtor'] = current_df['Debtor'].astype(int)
-                    current_df['Creditor'] = current_df['Creditor'].astype(int)
-            except ValueError as e:
-                raise InvalidTBSheetFormatError(
-                    "Failed to recognize the sheets. The first 3 rows are the headers, "
-                    "the data should start from row 4 with columns 'Item', 'Debtor', 'Creditor'. "
-                    f"Error in data conversion: {str(e)}"
-                )
-            current_df = current_df.fillna(0)
-            data[self.current_year] = current_df
+    def _stream_tb_sheets(self):
+        """Stream the TB sheets row by row with openpyxl, keeping only non-blank lines before the totals row."""
+        from openpyxl import load_workbook
 
-            if self.first_year:
-                previous_df = pd.DataFrame(columns=['Item', 'Debtor', 'Creditor'])
-                data[self.previous_year] = previous_df
-                return data
-
-            # Load previous year TB
-            if self.previous_sheet not in sheet_names:
-                raise ValueError(f"Sheet {self.previous_sheet} not found in Excel file")
-            previous_df = pd.read_excel(xl, sheet_name=self.previous_sheet, header=None, skiprows=3)
-            if len(previous_df.columns) < 3:
-                raise InvalidTBSheetFormatError(
-                    "Failed to recognize the sheets. The first 3 rows are the headers, "
-                    "the data should start from row 4 with columns 'Item', 'Debtor', 'Creditor'."
-                )
-            previous_df.columns = ['Item', 'Debtor', 'Creditor']
-            previous_df['Item'] = previous_df['Item'].astype(str).str.strip().str.lower()
-            previous_df = previous_df[previous_df['Item'].notna() & (previous_df['Item'] != "") & (previous_df['Item'] != "nan")]
-            previous_df[['Debtor', 'Creditor']] = previous_df[['Debtor', 'Creditor']].fillna(0)
-
-            # Check for decimal values in previous year
-            for col in ['Debtor', 'Creditor']:
-                for val in previous_df[col]:
-                #if any(has_decimal(val) for val in previous_df[col]):
-                    if has_decimal(val):
-                        self.use_two_decimals = True
+        workbook = load_workbook(self.excel_file, read_only=True, data_only=True)
+        try:
+            sheets = self._required_sheets(workbook.sheetnames)
+            data = {}
+            for sheet in sheets:
+                worksheet = workbook[sheet]
+                if worksheet.max_column is not None and worksheet.max_column < 3:
+                    raise InvalidTBSheetFormatError(
+                        "Failed to recognize the sheets. The first 3 rows are the headers, "
+                        "the data should start from row 4 with columns 'Item', 'Debtor', 'Creditor'."
+                    )
+                rows = []
+                index = []  # Offsets from TB_FIRST_ROW, matching the pandas reader's index
+                has_cells = False
+                row_values = worksheet.iter_rows(min_row=TB_FIRST_ROW, max_col=3, values_only=True)
+                for offset, (item, debtor, creditor) in enumerate(row_values):
+                    has_cells = has_cells or any(value is not None for value in (item, debtor, creditor))
+                    if item is None or not str(item).strip():
+                        continue
+                    if str(item).strip() in TERMINATOR_ITEMS:
                         break
+                    rows.append((item, debtor, creditor))
+                    index.append(offset)
+                # Like pandas, a sheet with nothing below the headers has no columns, so _prepare_sheet rejects it
+                data[sheet] = pd.DataFrame(rows, columns=[0, 1, 2], index=index) if has_cells else pd.DataFrame()
+            return data
+        finally:
+            workbook.close()
+
+    def _load_cached_data(self):
+        """Return the parsed TB data, from the persistent cache when the workbook was parsed before."""
+        # Only workbooks on disk are cached
+        if self.cache is None or not isinstance(self.excel_file, (str, os.PathLike)):
+            return self._load_data()
+        try:
+            key = self.cache.key_for(self.excel_file, self.current_sheet, self.previous_sheet, bool(self.first_year), self.backend)
+        except OSError:
+            return self._load_data()
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry['error']:
+                error_class, message = entry['error']
+                raise CACHED_ERRORS[error_class](message)
+            self.use_two_decimals = entry['use_two_decimals']
+            self.loaded_from_cache = True
+            return entry['data']
 
-            # Validate item names for previous year
-            for item in previous_df['Item']:
-                validate_item_name(item, self.previous_sheet)
-            try:
-                previous_df['Debtor'] = pd.to_numeric(previous_df['Debtor'], errors='raise')
-                previous_df['Creditor'] = pd.to_numeric(previous_df['Creditor'], errors='raise')
-                if self.use_two_decimals:
-                    previous_df['Debtor'] = previous_df['Debtor'].round(2)
-                    previous_df['Creditor'] = previous_df['Creditor'].round(2)
-                else:
-                    previous_df['Debtor'] = previous_df['Debtor'].astype(int)
-                    previous_df['Creditor'] = previous_df['Creditor'].astype(int)
-            except ValueError as e:
-                raise InvalidTBSheetFormatError(
-                    "Failed to recognize the sheets. The first 3 rows are the headers, "
-                    "the data should start from row 4 with columns 'Item', 'Debtor', 'Creditor'. "
-                    f"Error in data conversion: {str(e)}"
+        try:
+            data = self._load_data()
+        except tuple(CACHED_ERRORS.values()) as e:
+            self.cache.put(key, {'error': (type(e).__name__, str(e))})
+            raise
+        self.cache.put(key, {'error': None, 'use_two_decimals': self.use_two_decimals, 'data': data})
+        return data
+
+    def _prepare_sheet(self, df):
+        """Name the TB columns, normalize item names, drop blank lines and everything from the first terminator row."""
+        if len(df.columns) < 3:
+            raise InvalidTBSheetFormatError(
+                "Failed to recognize the sheets. The first 3 rows are the headers, "
+                "the data should start from row 4 with columns 'Item', 'Debtor', 'Creditor'."
+            )
+        df.columns = ['Item', 'Debtor', 'Creditor']
+        df['Item'] = df['Item'].astype(str).str.strip().str.lower()
+        terminators = df['Item'].isin(TERMINATOR_ITEMS).to_numpy()
+        if terminators.any():
+            df = df.iloc[:terminators.argmax()]
+        df = df[df['Item'].notna() & (df['Item'] != "") & (df['Item'] != "nan")]
+        df[['Debtor', 'Creditor']] = df[['Debtor', 'Creditor']].fillna(0)
+        return df
+
+    @staticmethod
+    def _invalid_item_rows(df, sheet_name):
+        """Describe every item in a prepared sheet whose name fails VALID_ITEM_NAME."""
+        items = df['Item']
+        invalid = ~items.isin(TERMINATOR_ITEMS) & ~items.str.fullmatch(VALID_ITEM_NAME)
+        return [
+            f"Sheet '{sheet_name}', row {index + TB_FIRST_ROW}: '{item}'"
+            for index, item in items[invalid].items()
+        ]
+
+    @staticmethod
+    def _has_decimals(df):
+        """Return True if any numeric Debtor/Creditor amount has a fractional part."""
+        values = df[['Debtor', 'Creditor']].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        return bool((np.abs(values - np.round(values)) > 1e-6).any())
+
+    def _convert_amounts(self, df):
+        """Convert the amount columns to numbers, rounded to cents or truncated to whole dollars."""
+        try:
+            df['Debtor'] = pd.to_numeric(df['Debtor'], errors='raise')
+            df['Creditor'] = pd.to_numeric(df['Creditor'], errors='raise')
+            if self.use_two_decimals:
+                df['Debtor'] = df['Debtor'].round(2)
+                df['Creditor'] = df['Creditor'].round(2)
+            else:
+                df['Debtor'] = df['Debtor'].astype(int)
+                df['Creditor'] = df['Creditor'].astype(int)
+        except ValueError as e:
+            raise InvalidTBSheetFormatError(
+                "Failed to recognize the sheets. The first 3 rows are the headers, "
+                "the data should start from row 4 with columns 'Item', 'Debtor', 'Creditor'. "
+                f"Error in data conversion: {str(e)}"
+            )
+        return df.fillna(0)
+
+    def _load_data(self):
+        try:
+            sheets = self._read_tb_sheets()
+            years = [(self.current_year, self.current_sheet)]
+            if not self.first_year:
+                years.append((self.previous_year, self.previous_sheet))
+
+            frames = {year: self._prepare_sheet(sheets[sheet]) for year, sheet in years}
+
+            # Report every bad item name in both sheets at once
+            invalid_rows = []
+            for year, sheet in years:
+                invalid_rows.extend(self._invalid_item_rows(frames[year], sheet))
+            if invalid_rows:
+                raise InvalidItemNameError(
+                    "Invalid item names found. Item names must contain only letters and spaces:\n"
+                    + "\n".join(invalid_rows)
                 )
-            previous_df = previous_df.fillna(0)
-            data[self.previous_year] = previous_df
 
+            # The current year is converted before the previous year's decimals are seen, as before
+            data = {}
+            for year, _ in years:
+                if self._has_decimals(frames[year]):
+                    self.use_two_decimals = True
+                data[year] = self._convert_amounts(frames[year])
+
+            if self.first_year:
+                data[self.previous_year] = pd.DataFrame(columns=['Item', 'Debtor', 'Creditor'])
             return data
         except InvalidTBSheetFormatError as e:
             raise e
         except InvalidItemNameError as e:
             raise e
+        except MissingTBSheetError as e:
+            raise e
         except Exception as e:
             raise Exception(f"Failed to load Excel file: {str(e)}")
 
@@ -157,207 +273,75 @@ class DataLoader:
         if year not in self.data:
             return 0
         df = self.data[year]
-        balance_before_items = ['balance before current period', 'balance bf current period', 'balance b/f current period']
-        for _, row in df.iterrows():
-            item = row['Item']
-            if item in balance_before_items:
-                creditor = float(row['Creditor'] or 0)
-                debtor = float(row['Debtor'] or 0)
-                value = creditor if creditor != 0 else -debtor
-                return round(value, 2) if self.use_two_decimals else int(value)
-        return 0
+        rows = df[df['Item'].isin(BALANCE_BEFORE_ITEMS)]
+        if rows.empty:
+            return 0
+        creditor = float(rows['Creditor'].iloc[0] or 0)
+        debtor = float(rows['Debtor'].iloc[0] or 0)
+        value = creditor if creditor != 0 else -debtor
+        return round(value, 2) if self.use_two_decimals else int(value)
+
+    def _amounts(self, column):
+        """Return a TB amount column as numbers at the loader's precision."""
+        values = pd.to_numeric(column).fillna(0).astype(float)
+        return values.round(2) if self.use_two_decimals else values.astype('int64')
 
     def _categorize_items(self, year):
         df = self.data[year]
+        df = df[~df['Item'].isin(IGNORED_ITEMS)]
+        items = df['Item']
+
+        unrecognized = ~items.isin(self.category_index.valid_items)
+        if unrecognized.any():
+            raise UnrecognizedItemError(f"Unrecognized item found in TB sheet: '{items[unrecognized].iloc[0]}'")
+
+        debtor = self._amounts(df['Debtor'])
+        creditor = self._amounts(df['Creditor'])
+
+        def signed_values(sections, signs):
+            debtor_factor = sections.map({section: sign[0] for section, sign in signs.items()}).fillna(0)
+            creditor_factor = sections.map({section: sign[1] for section, sign in signs.items()}).fillna(0)
+            values = debtor * debtor_factor + creditor * creditor_factor
+            return values if self.use_two_decimals else values.astype('int64')
+
+        def details(mask, values):
+            return [{'name': name, 'value': value} for name, value in zip(items[mask].tolist(), values[mask].tolist())]
+
+        statement = items.map(self.category_index.statement_sections)
+        statement_values = signed_values(statement, STATEMENT_SIGNS)
+        statement_totals = statement_values.groupby(statement).sum()
+        statement_totals = dict(zip(statement_totals.index, statement_totals.tolist()))
+        listed = statement_values != 0
+
+        balance = items.map(self.category_index.balance_sections)
+        balance_values = signed_values(balance, BALANCE_SIGNS)
+        balance_totals = balance_values.groupby(balance).sum()
+        balance_totals = dict(zip(balance_totals.index, balance_totals.tolist()))
+
+        balance_sheet = {'net_assets': 0}
+        for section in BALANCE_SIGNS:
+            balance_sheet[section] = details(balance == section, balance_values)
+            balance_sheet['total_' + section] = balance_totals.get(section, 0)
+
+        revenue_items_details = details(listed & (statement == 'revenue'), statement_values)
+        cost_items_details = details(listed & statement.isin(['cost_of_sales', 'closing_inventories']), statement_values)
+        other_income_details = details(listed & (statement == 'other_income'), statement_values)
+        general_admin_expenses_details = details(listed & (statement == 'general_admin_expenses'), statement_values)
+        finance_costs_details = details(listed & (statement == 'finance_costs'), statement_values)
+
+        revenue = statement_totals.get('revenue', 0)
+        cost_of_sales = statement_totals.get('cost_of_sales', 0)
+        # Closing inventories are listed as a deduction but added to cost of sales
+        closing_inv = -statement_totals.get('closing_inventories', 0)
+        other_income = statement_totals.get('other_income', 0)
+        general_admin_expenses = statement_totals.get('general_admin_expenses', 0)
+        finance_costs = statement_totals.get('finance_costs', 0)
 
-        # Use category lists passed to the constructor
-        non_current_assets = self.non_current_assets
-        current_assets = self.current_assets
-        current_liabilities = self.current_liabilities
-        non_current_liabilities = self.non_current_liabilities
-        equity = self.equity
-        revenue_items = self.revenue_items
-        cost_of_sales_items = self.cost_of_sales_items
-        closing_inventories = self.closing_inventories
-        other_income_items = self.other_income_items
-        general_admin_expenses_items = self.general_admin_expenses_items
-        finance_costs_items = self.finance_costs_items
-        tax_items = self.tax_items
-
-        # Normalize lists for case-insensitive comparison
-        non_current_assets_lower = [item.lower() for item in non_current_assets]
-        current_assets_lower = [item.lower() for item in current_assets]
-        current_liabilities_lower = [item.lower() for item in current_liabilities]
-        non_current_liabilities_lower = [item.lower() for item in non_current_liabilities]
-        equity_lower = [item.lower() for item in equity]
-        revenue_items_lower = [item.lower() for item in revenue_items]
-        cost_of_sales_items_lower = [item.lower() for item in cost_of_sales_items]
-        closing_inventories_lower = closing_inventories.lower() if isinstance(closing_inventories, str) else closing_inventories[0].lower()
-        other_income_items_lower = [item.lower() for item in other_income_items]
-        general_admin_expenses_items_lower = [item.lower() for item in general_admin_expenses_items]
-        finance_costs_items_lower = [item.lower() for item in finance_costs_items]
-        tax_items_lower = [item.lower() for item in tax_items]
-        balance_before_items_lower = ['balance before current period', 'balance bf current period', 'balance b/f current period']
-
-        all_valid_items = (
-            non_current_assets + current_assets + current_liabilities + non_current_liabilities + equity +
-            revenue_items + cost_of_sales_items + ([closing_inventories] if isinstance(closing_inventories, str) else closing_inventories) +
-            other_income_items + general_admin_expenses_items + finance_costs_items + tax_items +
-            ['balance before current period', 'balance bf current period', 'balance b/f current period']
-        )
-        all_valid_items_lower = [item.lower() for item in all_valid_items]
-
-        revenue = 0
-        cost_of_sales = 0
-        closing_inv = 0
-        other_income = 0
-        general_admin_expenses = 0
-        finance_costs = 0
         taxation = 0
-
-        revenue_items_details = []
-        cost_items_details = []
-        other_income_details = []
-        general_admin_expenses_details = []
-        finance_costs_details = []
-
-        balance_sheet = {
-            'non_current_assets': [],
-            'current_assets': [],
-            'current_liabilities': [],
-            'non_current_liabilities': [],
-            'equity': [],
-            'total_non_current_assets': 0,
-            'total_current_assets': 0,
-            'total_current_liabilities': 0,
-            'total_non_current_liabilities': 0,
-            'total_equity': 0,
-            'net_assets': 0
-        }
-
-        for _, row in df.iterrows():
-            item = row['Item']
-            debtor = float(row['Debtor'] or 0)
-            creditor = float(row['Creditor'] or 0)
-            if self.use_two_decimals:
-                debtor = round(debtor, 2)
-                creditor = round(creditor, 2)
-            else:
-                debtor = int(debtor)
-                creditor = int(creditor)
-
-            if item in ['董事簽名：', '合計', '0', 'taxation']:
-                continue
-
-            if item not in all_valid_items_lower:
-                raise UnrecognizedItemError(f"Unrecognized item found in TB sheet: '{item}'")
-
-            if item in balance_before_items_lower:
-                continue
-
-            if item in revenue_items_lower:
-                revenue += creditor
-                if creditor != 0:
-                    revenue_items_details.append({
-                        'name': item,
-                        'value': creditor
-                    })
-            elif item in cost_of_sales_items_lower:
-                cost_of_sales += debtor
-                if debtor != 0:
-                    cost_items_details.append({
-                        'name': item,
-                        'value': debtor
-                    })
-            elif item == closing_inventories_lower:
-                closing_inv += debtor
-                if debtor != 0:
-                    cost_items_details.append({
-                        'name': item,
-                        'value': -debtor
-                    })
-            elif item in other_income_items_lower:
-                other_income += creditor
-                if creditor != 0:
-                    other_income_details.append({
-                        'name': item,
-                        'value': creditor
-                    })
-            elif item in general_admin_expenses_items_lower:
-                general_admin_expenses += debtor
-                if debtor != 0:
-                    general_admin_expenses_details.append({
-                        'name': item,
-                        'value': debtor
-                    })
-            elif item in finance_costs_items_lower:
-                finance_costs -= debtor
-                if debtor != 0:
-                    finance_costs_details.append({
-                        'name': item,
-                        'value': -debtor
-                    })
-
-            if item in non_current_assets_lower:
-                idx = non_current_assets_lower.index(item)
-                original_item = non_current_assets[idx]
-                value = debtor
-                balance_sheet['non_current_assets'].append({
-                    'name': item,
-                    'value': value
-                })
-                balance_sheet['total_non_current_assets'] += value
-            elif item in current_assets_lower:
-                idx = current_assets_lower.index(item)
-                original_item = current_assets[idx]
-                value = debtor
-                balance_sheet['current_assets'].append({
-                    'name': item,
-                    'value': value
-                })
-                balance_sheet['total_current_assets'] += value
-            elif item in current_liabilities_lower:
-                idx = current_liabilities_lower.index(item)
-                original_item = current_liabilities[idx]
-                value = creditor
-                balance_sheet['current_liabilities'].append({
-                    'name': item,
-                    'value': value
-                })
-                balance_sheet['total_current_liabilities'] += value
-            elif item in non_current_liabilities_lower:
-                idx = non_current_liabilities_lower.index(item)
-                original_item = non_current_liabilities[idx]
-                value = creditor
-                balance_sheet['non_current_liabilities'].append({
-                    'name': item,
-                    'value': value
-                })
-                balance_sheet['total_non_current_liabilities'] += value
-            elif item in equity_lower:
-                idx = equity_lower.index(item)
-                original_item = equity[idx]
-                value = creditor - debtor
-                balance_sheet['equity'].append({
-                    'name': item,
-                    'value': value
-                })
-                balance_sheet['total_equity'] += value
-
-        # Second pass for 'taxation' item
-        for _, row in df.iterrows():
-            item = row['Item']
-            debtor = float(row['Debtor'] or 0)
-            creditor = float(row['Creditor'] or 0)
-            if self.use_two_decimals:
-                debtor = round(debtor, 2)
-                creditor = round(creditor, 2)
-            else:
-                debtor = int(debtor)
-                creditor = int(creditor)
-            if item == 'taxation':
-                taxation = creditor - debtor
-                break
+        is_taxation = self.data[year]['Item'] == 'taxation'
+        if is_taxation.any():
+            tax_rows = self.data[year][is_taxation]
+            taxation = (self._amounts(tax_rows['Creditor']) - self._amounts(tax_rows['Debtor'])).tolist()[0]
 
         # Apply precision to totals
         if self.use_two_decimals:
@@ -437,7 +421,19 @@ class DataLoader:
             "FinanceCostsDetails": finance_costs_details
         }
 
+    def invalidate_cache(self):
+        """Drop cached statements, e.g. after modifying self.data in place."""
+        self._statement_cache.clear()
+
     def get_income_statement(self, year):
+        """Return the read-only statement for a year, categorizing it only once per data/category set."""
         if year not in [self.current_year, self.previous_year]:
             raise ValueError(f"Year must be {self.current_year} or {self.previous_year}")
-        return self._categorize_items(year)
\ No newline at end of file
+        df = self.data[year]
+        cached = self._statement_cache.get(year)
+        if (cached and cached[0] is df and cached[1] is self.category_index
+                and cached[2] == self.use_two_decimals):
+            return cached[3]
+        statement = _freeze(self._categorize_items(year))
+        self._statement_cache[year] = (df, self.category_index, self.use_two_decimals, statement)
+        return statement
\ No newline at end of file
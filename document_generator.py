@@ -1,28 +1,122 @@
+import functools
+import hashlib
+import inspect
 import logging
 import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from docx.shared import Pt
-from docxtpl import DocxTemplate
 from data_loader import DataLoader
-from utils import resource_path, format_number, update_fields, insert_page_break_before_income_statement
-from exceptions import InvalidTBSheetFormatError, UnrecognizedItemError, InvalidItemNameError, NetAssetsEquityMismatchError
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('document_generator.log'),
-        logging.StreamHandler()
-    ]
+from template_cache import TEMPLATE_CACHE
+from number_format import get_formatter
+from balance_index import BalanceIndex
+from comparative_table import comparative_rows, values_by_name
+from utils import resource_path, format_number, update_fields, apply_border_placeholders, insert_page_break_before_income_statement
+from generation_stages import (
+    STAGE_LOADING_TB, STAGE_CATEGORIZING, STAGE_BUILDING_CONTEXT, STAGE_RENDERING, STAGE_POST_PROCESSING, STAGE_SAVING,
+    GENERATION_STAGES
 )
+from instrumentation import GenerationResult, RunMetrics, instrumented
+from exceptions import InvalidTBSheetFormatError, UnrecognizedItemError, InvalidItemNameError, NetAssetsEquityMismatchError, GenerationCancelledError
+
 logger = logging.getLogger(__name__)
 
+# Row order of the comparative tables; equity lists only these items
+EQUITY_ORDER = ("share capital", "reserves", "capital reserves")
+COST_ITEMS_ORDER = ('opening inventories', 'purchases', 'closing inventories', 'direct costs')
+
+# Trial balance figures shared by the aux and main reports, see DocumentGenerator._load_tb
+TB_FIELDS = (
+    'accountant_helper', 'use_two_decimals', 'statement_current', 'balance_current', 'statement_previous',
+    'balance_previous', 'index_current', 'index_previous', 'all_items_curr', 'all_items_prev', 'all_items', 'has_inventories_curr', 'inventories_curr',
+    'inventories_prev', 'has_due_from_directors_curr', 'due_from_directors_curr', 'due_to_directors_curr', 'has_subsidiary',
+)
+EMPTY_TB = dict(
+    accountant_helper=None, use_two_decimals=False, statement_current=None, balance_current=None, statement_previous=None,
+    balance_previous=None, index_current=None, index_previous=None, all_items_curr=frozenset(), all_items_prev=frozenset(), all_items=frozenset(),
+    has_inventories_curr=False, inventories_curr=0, inventories_prev=0, has_due_from_directors_curr=False,
+    due_from_directors_curr=0, due_to_directors_curr=0, has_subsidiary=False,
+)
+
+# The dates, TB figures and related-party balances of a reporting period, see build_report_context.
+# The aux and main reports of a company are generated from the same ReportContext.
+ReportContext = namedtuple('ReportContext', (
+    'first_year', 'date_of_incorporation', 'last_day_date', 'exactly_one_year_ago', 'last_day_date_num',
+    'last_day_date_cn', 'is_december', 'one_year_ago', 'one_year_ago_cn', 'audit_year', 'cu_year_for_first_year',
+    'pr_year_for_first_year', 'over18m', 'c_year_for_first_year', 'related_party_info',
+) + TB_FIELDS)
+
+# Everything one generate_document/generate_aux_document call works from. It is built per call and
+# never mutated, so a single DocumentGenerator can run jobs for different companies concurrently.
+JobContext = namedtuple('JobContext', (
+    'directors_list', 'shareholders_list', 'business_type', 'company_name_en', 'currency',
+) + ReportContext._fields)
+
+# generate_document/generate_aux_document arguments that build_report_context works from
+REPORT_CONTEXT_ARGS = ('excel_file', 'first_year', 'current_year', 'last_day_of_year', 'date_of_incorporation')
+
+
+# generate_document/generate_aux_document arguments that generate_all passes itself
+GENERATE_ALL_RESERVED = ('progress', 'metrics', 'context', 'force')
+
+# generate_document/generate_aux_document arguments that do not change the report's contents
+REPORT_CACHE_IGNORED = ('excel_file', 'output_path', 'aux_output_path', 'progress', 'metrics', 'force', 'context')
+
+
+def _monotonic_progress(progress):
+    """Wrap a progress callback shared by concurrent runs so the reported stage never moves back."""
+    if progress is None:
+        return None
+    lock = threading.Lock()
+    reached = [-1]
+
+    def report(stage):
+        with lock:
+            if stage in GENERATION_STAGES:
+                reached[0] = max(reached[0], GENERATION_STAGES.index(stage))
+                stage = GENERATION_STAGES[reached[0]]
+            progress(stage)
+    return report
+
+
+def cached_report(output_field):
+    """Copy the report from the generator's ReportCache instead of generating it when no input changed.
+
+    output_field names the decorated method's output path argument.
+    """
+    def decorate(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            key = self._report_cache_key(arguments, output_field)
+            if key is None:
+                return method(self, *args, **kwargs)
+
+            output_path, metrics = arguments[output_field], arguments['metrics']
+            message = self._fetch_report(key, output_path, metrics)
+            if message is not None:
+                return True, message
+
+            result, message = method(self, *args, **kwargs)
+            if result:
+                metrics.count('report_cache_misses')
+                try:
+                    self._report_cache.put(key, output_path, message)
+                except OSError as e:
+                    logger.warning(f"Failed to cache report {output_path}: {str(e)}")
+            return result, message
+        return wrapper
+    return decorate
+    return wrapper
+
 
 class DocumentGenerator:
     FILE_TPLS = {
@@ -115,78 +209,186 @@ class DocumentGenerator:
     ]
     due_holding_company_items = [] + due_from_holding_company_items + due_to_holding_company_items
 
-    def __init__(self, category_manager):
-        self._last_day_date = None
-        self._last_day_date_num = None
-        self._last_day_date_cn = None
-        self._one_year_ago = None
-        self._first_year = False
-        self._cu_year_for_first_year = ""
-        self._c_year_for_first_year = ""
-        self._pr_year_for_first_year = ""
-        self._over18m = False
-        self._exactly_one_year_ago = None
-        self._one_year_ago_cn = None
-        self._date_of_incorporation=None
-        self._audit_year = None
-        self._is_december = None
-        self._directors_list = None
-        self._shareholders_list = None
-        self._business_type = None
-        self._company_name_en = None
-        self._currency = None
-        self._has_inventories_curr = False
-        self._due_to_directors_curr = 0
-        self._has_due_from_directors_curr = False
-        self._due_from_directors_curr = 0
-        self._inventories_curr = 0
-        self._inventories_prev = 0
-        self._closing_inventories_prev = 0
-        self._closing_inventories_curr = 0
-        self._has_subsidiary = False
-        self._all_items = None
-        self._all_items_curr = None
-        self._all_items_prev = None
-        self._accountant_helper = None
-        self._statement_current = None
-        self._statement_previous = None
-        self._balance_current = None
-        self._balance_previous = None
+    # Related-party families resolved together by get_related_party_info: family -> (due from items, due to items)
+    RELATED_PARTY_FAMILIES = {
+        'final_holding_parent_company': (due_from_final_holding_parent_company_items, due_to_final_holding_parent_company_items),
+        'shareholder': (due_from_shareholder_items, due_to_shareholder_items),
+        'imme_parent_company': (due_from_imme_parent_company_items, due_to_imme_parent_company_items),
+        'ultimate_holding_company': (due_from_ultimate_holding_company_items, due_to_ultimate_holding_company_items),
+        'holding_company': (due_from_holding_company_items, due_to_holding_company_items),
+    }
+
+    due_from_director_items = ['amount due from a director', 'amount due from the director', 'amount due from director', 'amount due from directors']
+    due_to_director_items = ['amount due to a director', 'amount due to the director', 'amount due to director', 'amount due to directors']
+    subsidiary_items = [
+        'investments in a subsidiary', 'investments in subsidiaries',
+        'interests in subsidiaries', 'interests in a subsidiary'
+    ]
+
+    def __init__(self, category_manager, tb_backend="pandas", tb_cache=None, template_cache=None, loader_factory=None,
+                 report_cache=None):
+        # Only shared, run-independent state lives here; per-run state goes in a JobContext
+        self._accountant_helper = None  # Last DataLoader, reused while its workbook is unchanged
+        self._accountant_source = None
+        self._accountant_lock = threading.Lock()
         self._category_manager = category_manager
-        self._use_two_decimals = False  # Initialize precision flag
-
-    def get_due_info(self, due_from_items, due_to_items, due_all_items, need_title=True):
-        # Original calculation for due_final_curr, due_final_prev
-        due_final_curr = 0
-        due_final_prev = 0
-
-        # Current year: Check assets for "from" items
-        for item in self._balance_current['current_assets']:
-            if item['name'] in due_from_items:
-                due_final_curr = item['value']
-                break
-
-        # Current year: Check liabilities for "to" items
-        for item in self._balance_current['current_liabilities']:
-            if item['name'] in due_to_items:
-                due_final_curr = -item['value']
-                break
-
-        # Previous year: Check assets for "from" items
-        for item in self._balance_previous['current_assets']:
-            if item['name'] in due_from_items:
-                due_final_prev = item['value']
-                break
-
-        # Previous year: Check liabilities for "to" items
-        for item in self._balance_previous['current_liabilities']:
-            if item['name'] in due_to_items:
-                due_final_prev = -item['value']
-                break
+        self._tb_backend = tb_backend  # 'pandas' or 'openpyxl' (streaming, for very large workbooks)
+        self._tb_cache = tb_cache  # Optional TBCache shared across runs
+        self._template_cache = template_cache or TEMPLATE_CACHE
+        self._loader_factory = loader_factory or DataLoader  # Called with DataLoader's arguments
+        self._report_cache = report_cache  # Optional ReportCache of generated reports
+
+    def _get_accountant_helper(self, excel_file, first_year, current_year, metrics=None):
+        """Return a DataLoader for the TB, reusing the last one (and its statement cache) while the workbook is unchanged.
+
+        excel_file is the workbook path, its bytes, a dict of TB sheet DataFrames or an already loaded DataLoader.
+        """
+        if isinstance(excel_file, DataLoader):
+            logger.info("Using pre-loaded trial balance")
+            return excel_file
+
+        tb_file = excel_file if excel_file else "example_tb_for_test.xlsx"
+        try:
+            stat = os.stat(tb_file)
+            source = (os.path.abspath(tb_file), stat.st_mtime_ns, stat.st_size, bool(first_year), current_year, self._tb_backend)
+        except (OSError, TypeError, ValueError):
+            # Bytes and DataFrames are not tied to a file, so their loader is not reused
+            source = None
+
+        # The loader may be in use by another job, so a category change builds a new one instead of updating it
+        category_index = self._category_manager.get_index()
+        with self._accountant_lock:
+            cached = self._accountant_helper if source is not None and self._accountant_source == source else None
+        if cached is not None and cached.category_index is category_index:
+            logger.info(f"Reusing loaded trial balance: {tb_file}")
+            if metrics is not None:
+                metrics.count('tb_loader_reused')
+            return cached
+
+        logger.info(f"Using trial balance file: {tb_file if isinstance(tb_file, (str, os.PathLike)) else type(tb_file).__name__}")
+        accountant_helper = self._loader_factory(
+            excel_file=tb_file,
+            first_year=first_year,
+            current_year=current_year,
+            non_current_assets=self._category_manager.categories['non_current_assets'],
+            current_assets=self._category_manager.categories['current_assets'],
+            current_liabilities=self._category_manager.categories['current_liabilities'],
+            non_current_liabilities=self._category_manager.categories['non_current_liabilities'],
+            equity=self._category_manager.categories['equity'],
+            revenue_items=self._category_manager.categories['revenue_items'],
+            cost_of_sales_items=self._category_manager.categories['cost_of_sales_items'],
+            closing_inventories=self._category_manager.categories['closing_inventories'],
+            other_income_items=self._category_manager.categories['other_income_items'],
+            general_admin_expenses_items=self._category_manager.categories['general_admin_expenses_items'],
+            finance_costs_items=self._category_manager.categories['finance_costs_items'],
+            tax_items=self._category_manager.categories['tax_items'],
+            category_index=category_index,
+            backend=self._tb_backend,
+            cache=self._tb_cache
+        )
+        if metrics is not None and getattr(accountant_helper, 'loaded_from_cache', False):
+            metrics.count('tb_cache_hits')
+        with self._accountant_lock:
+            self._accountant_helper, self._accountant_source = accountant_helper, source
+        return accountant_helper
+
+    @staticmethod
+    def _report_stage(progress, stage, metrics=None):
+        """Tell the progress callback a new stage is starting; this is where a cancelled run stops.
+
+        The stage is also timed as a span of metrics, until the next stage starts.
+        """
+        logger.info(f"Stage: {stage}")
+        if metrics is not None:
+            metrics.begin(stage)
+        if progress is not None:
+            progress(stage)
+
+    @staticmethod
+    @contextmanager
+    def _stage(progress, stage, metrics):
+        """Run a with block as a stage: end the open stage, report this one as _report_stage does and time the block."""
+        logger.info(f"Stage: {stage}")
+        metrics.end()
+        if progress is not None:
+            progress(stage)
+        with metrics.span(stage):
+            yield
+
+    def _report_cache_key(self, arguments, output_field):
+        """Return the report cache key of a generate_document/generate_aux_document call, or None if it is not cached.
+
+        The key covers the report's code version, the TB and template contents, the categories and every form field.
+        """
+        if self._report_cache is None or arguments['force'] or not arguments[output_field]:
+            return None
+        excel_file = arguments['excel_file']
+        try:
+            if isinstance(excel_file, bytes):
+                tb_digest = hashlib.sha256(excel_file).hexdigest()
+            elif isinstance(excel_file, (str, os.PathLike)) and excel_file:
+                tb_digest = self._report_cache.digest(excel_file)
+            else:
+                return None  # DataFrames, a DataLoader or the example TB
+            if output_field == 'aux_output_path':
+                template_path = DocumentGenerator.AUX_TPLS[arguments['audit_type']]
+            else:
+                template_path = DocumentGenerator.FILE_TPLS[arguments['audit_type'] + ("_1" if arguments['first_year'] else "")]
+            template_digest = self._report_cache.digest(resource_path(template_path))
+        except (OSError, KeyError):
+            return None  # The generate method reports the missing file or template
+        fields = {name: value for name, value in arguments.items() if name not in REPORT_CACHE_IGNORED and name != 'self'}
+        return self._report_cache.key_for(output_field, tb_digest, template_digest, self._category_manager.categories, fields)
+
+    def _fetch_report(self, key, output_path, metrics):
+        """Copy a cached report to output_path and return its message, or return None on a miss."""
+        message = self._report_cache.fetch(key, output_path)
+        if message is not None:
+            logger.info(f"Inputs unchanged, copied the cached report to {output_path}")
+            metrics.count('report_cache_hits')
+        return message
+
+    def _cached_result(self, method, output_field, kwargs):
+        """Return the GenerationResult of a generate method call served from the ReportCache, or None on a miss."""
+        bound = inspect.signature(method).bind(**kwargs)
+        bound.apply_defaults()
+        key = self._report_cache_key(bound.arguments, output_field)
+        if key is None:
+            return None
+        metrics = RunMetrics()
+        message = self._fetch_report(key, bound.arguments[output_field], metrics)
+        return None if message is None else GenerationResult(True, message, metrics.finish())
+
+    def _get_template(self, template_path, metrics=None):
+        path = resource_path(template_path)
+        if metrics is not None:
+            metrics.count('template_cache_hits' if self._template_cache.is_cached(path) else 'template_cache_misses')
+        return self._template_cache.get(path)
+
+    def warm_up_templates(self, audit_type):
+        """Start loading the main (first and later year) and aux templates for an audit type in the background."""
+        template_paths = [
+            DocumentGenerator.FILE_TPLS.get(f"{audit_type}_1"),
+            DocumentGenerator.FILE_TPLS.get(audit_type),
+            DocumentGenerator.AUX_TPLS.get(audit_type),
+        ]
+        paths = [resource_path(path) for path in template_paths if path and os.path.exists(resource_path(path))]
+        return self._template_cache.warm_up(paths)
+
+    def get_due_info(self, job, due_from_items, due_to_items, due_all_items, need_title=True):
+        # A "to" balance (liability) takes precedence over a "from" balance (asset) in the same year
+        due_final_curr = job.index_current.first('current_assets', due_from_items)
+        due_to_curr = job.index_current.first('current_liabilities', due_to_items, None)
+        if due_to_curr is not None:
+            due_final_curr = -due_to_curr
+        due_final_prev = job.index_previous.first('current_assets', due_from_items)
+        due_to_prev = job.index_previous.first('current_liabilities', due_to_items, None)
+        if due_to_prev is not None:
+            due_final_prev = -due_to_prev
 
         # Calculate max
         due_final_max = max(due_final_curr, due_final_prev)
-        if self._use_two_decimals:
+        if job.use_two_decimals:
             due_final_curr = round(due_final_curr, 2)
             due_final_prev = round(due_final_prev, 2)
             due_final_max = round(due_final_max, 2)
@@ -196,13 +398,13 @@ class DocumentGenerator:
             due_final_max = int(due_final_max)
 
         due_final_curr_formatted = format_number(
-            due_final_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+            due_final_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
         ) if due_final_curr != 0 else "-"
         due_final_prev_formatted = format_number(
-            due_final_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+            due_final_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
         ) if due_final_prev != 0 else "-"
         due_final_max_formatted = format_number(
-            due_final_max, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+            due_final_max, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
         ) if due_final_max != 0 else "-"
 
         if due_final_curr == 0 and due_final_prev == 0:
@@ -217,7 +419,7 @@ class DocumentGenerator:
 
         title_name = ""
         if need_title:
-            matches = [item for item in due_all_items if item in self._all_items]
+            matches = [item for item in due_all_items if item in job.all_items]
             from_name = next((item for item in matches if item in due_from_items), "")
             to_name = next((item for item in matches if item in due_to_items), "")
             if from_name and to_name:
@@ -225,10 +427,10 @@ class DocumentGenerator:
             else:
                 title_name = from_name if from_name else to_name
 
-        if True: #self._first_year:
+        if True: #job.first_year:
             return {
-                'need_footnote': any(item in self._all_items_curr for item in due_all_items),
-                'both_to': any(item in self._all_items_curr for item in due_all_items),
+                'need_footnote': any(item in job.all_items_curr for item in due_all_items),
+                'both_to': any(item in job.all_items_curr for item in due_all_items),
                 'curr': due_final_curr_formatted,
                 'prev': due_final_prev_formatted,
                 'max': due_final_max_formatted,
@@ -236,8 +438,8 @@ class DocumentGenerator:
             }
 
         # Logic for both_to
-        curr_to = any(item in self._all_items_curr for item in due_to_items)
-        prev_to = any(item in self._all_items_prev for item in due_to_items)
+        curr_to = any(item in job.all_items_curr for item in due_to_items)
+        prev_to = any(item in job.all_items_prev for item in due_to_items)
         both_to = (curr_to and prev_to) or (curr_to and due_final_prev == 0)
 
         # Logic for need_footnote
@@ -254,6 +456,13 @@ class DocumentGenerator:
             'title_name': title_name
         }
 
+    def get_related_party_info(self, job):
+        """Return the get_due_info result of every related-party family, keyed like RELATED_PARTY_FAMILIES."""
+        return {
+            family: self.get_due_info(job, due_from_items, due_to_items, due_from_items + due_to_items)
+            for family, (due_from_items, due_to_items) in self.RELATED_PARTY_FAMILIES.items()
+        }
+
     def _initialize_common_data(
         self,
         last_day_of_year,
@@ -265,132 +474,168 @@ class DocumentGenerator:
         excel_file=None,
         first_year=False,
         current_year=None,
-        date_of_incorporation=None
+        date_of_incorporation=None,
+        progress=None,
+        metrics=None,
+        context=None
     ):
-        """Initialize shared data used by both aux and main document generation."""
+        """Build the JobContext of an aux or main document, from context when it is given."""
         # Validate directors
         if not directors or not isinstance(directors, list):
             logger.error("Directors list is empty or invalid")
             raise ValueError("Directors list cannot be empty or invalid")
-        self._directors_list = [d.strip() for d in directors if d.strip()]
-        if not self._directors_list:
+        directors_list = [d.strip() for d in directors if d.strip()]
+        if not directors_list:
             logger.error("Directors list is empty after cleaning")
             raise ValueError("Directors list cannot be empty after cleaning")
 
-        self._shareholders_list = shareholders
-        # Store other parameters
-        self._business_type = business_type.lower()
-        self._company_name_en = company_name_en
-        self._currency = currency
-        self._first_year = first_year
-        self._date_of_incorporation = date_of_incorporation
+        if context is None:
+            context = self.build_report_context(
+                last_day_of_year, excel_file, first_year, current_year, date_of_incorporation, progress, metrics
+            )
+
+        return JobContext(
+            directors_list=directors_list,
+            shareholders_list=shareholders,
+            business_type=business_type.lower(),
+            company_name_en=company_name_en,
+            currency=currency,
+            **context._asdict()
+        )
+
+    def build_report_context(
+        self,
+        last_day_of_year,
+        excel_file=None,
+        first_year=False,
+        current_year=None,
+        date_of_incorporation=None,
+        progress=None,
+        metrics=None
+    ):
+        """Compute the ReportContext of a reporting period: date strings, TB figures and related-party balances.
+
+        Pass it as context= to generate_document and generate_aux_document to load and categorize the TB once
+        for both; see generate_all.
+        """
+        cu_year_for_first_year = ""
+        pr_year_for_first_year = ""
+        c_year_for_first_year = ""
+        over18m = False
 
         # Date calculations
         try:
-            self._last_day_date = datetime.strptime(last_day_of_year, "%d %B %Y")
-            #self._exactly_one_year_ago = self._last_day_date.replace(year=self._last_day_date.year - 1).strftime("%d %B %Y").lstrip("0")
-            self._exactly_one_year_ago = self._last_day_date.replace(year=self._last_day_date.year - 1).strftime(
-                "%d %B %Y")
-            self._last_day_date_num = self._last_day_date.strftime("%d.%m.%Y").replace(" 0", "").replace(".0", ".")
-            self._last_day_date_cn = self._last_day_date.strftime("%Y年%m月%d日")
-            self._is_december = self._last_day_date.month == 12
-            if self._is_december:
+            last_day_date = datetime.strptime(last_day_of_year, "%d %B %Y")
+            #exactly_one_year_ago = last_day_date.replace(year=last_day_date.year - 1).strftime("%d %B %Y").lstrip("0")
+            exactly_one_year_ago = last_day_date.replace(year=last_day_date.year - 1).strftime("%d %B %Y")
+            last_day_date_num = last_day_date.strftime("%d.%m.%Y").replace(" 0", "").replace(".0", ".")
+            last_day_date_cn = last_day_date.strftime("%Y年%m月%d日")
+            is_december = last_day_date.month == 12
+            if is_december:
                 # For December dates, set one_year_ago to 1 January of the same year
-                one_year_ago_date = datetime(self._last_day_date.year, 1, 1)
+                one_year_ago_date = datetime(last_day_date.year, 1, 1)
             else:
                 # For non-December dates, get next day and subtract one year
-                next_day_date = self._last_day_date + timedelta(days=1)
+                next_day_date = last_day_date + timedelta(days=1)
                 try:
                     one_year_ago_date = next_day_date.replace(year=next_day_date.year - 1)
                 except ValueError:
                     # Handle leap year edge case (e.g., 29 Feb on non-leap year)
                     one_year_ago_date = next_day_date.replace(year=next_day_date.year - 1, day=next_day_date.day - 1)
-            self._one_year_ago = one_year_ago_date.strftime("%d %B %Y").lstrip("0")
-            self._one_year_ago_cn = one_year_ago_date.strftime("%Y年%m月%d日")
+            one_year_ago = one_year_ago_date.strftime("%d %B %Y").lstrip("0")
+            one_year_ago_cn = one_year_ago_date.strftime("%Y年%m月%d日")
 
-            if self._last_day_date.month >= 4:
-                self._audit_year = f"{self._last_day_date.year}/{str(self._last_day_date.year + 1)[-2:]}"
+            if last_day_date.month >= 4:
+                audit_year = f"{last_day_date.year}/{str(last_day_date.year + 1)[-2:]}"
             else:
-                self._audit_year = f"{self._last_day_date.year - 1}/{str(self._last_day_date.year)[-2:]}"
+                audit_year = f"{last_day_date.year - 1}/{str(last_day_date.year)[-2:]}"
 
-            if self._first_year and self._date_of_incorporation:
-                self._cu_year_for_first_year = self._last_day_date.strftime("%d/%m/%Y").lstrip("0").replace("/0", "/")
-                incorporation_date = datetime.strptime(self._date_of_incorporation, "%d %B %Y")
-                self._pr_year_for_first_year = incorporation_date.strftime("%d/%m/%Y").lstrip("0").replace("/0", "/")
-                self._one_year_ago_cn = incorporation_date.strftime("%Y年%m月%d日")
+            if first_year and date_of_incorporation:
+                cu_year_for_first_year = last_day_date.strftime("%d/%m/%Y").lstrip("0").replace("/0", "/")
+                incorporation_date = datetime.strptime(date_of_incorporation, "%d %B %Y")
+                pr_year_for_first_year = incorporation_date.strftime("%d/%m/%Y").lstrip("0").replace("/0", "/")
+                one_year_ago_cn = incorporation_date.strftime("%Y年%m月%d日")
                 eighteen_months_later = incorporation_date + relativedelta(months=18)
-                self._over18m = self._last_day_date >= eighteen_months_later
-                self._c_year_for_first_year = self._last_day_date.year
+                over18m = last_day_date >= eighteen_months_later
+                c_year_for_first_year = last_day_date.year
         # Handle invalid date format    
         except ValueError as e:
             logger.error(f"Invalid date format for LastDayOfYear: {last_day_of_year}. Expected format: '31 December 2024'")
             raise ValueError(f"Invalid date format for LastDayOfYear: {last_day_of_year}. Expected format: '31 December 2024'")
 
         # Initialize trial balance data if provided
-        if excel_file and current_year:
-            tb_file = excel_file if excel_file else "example_tb_for_test.xlsx"
-            self._accountant_helper = DataLoader(
-                excel_file=tb_file,
-                first_year=first_year,
-                current_year=current_year,
-                non_current_assets= self._category_manager.categories['non_current_assets'],
-                current_assets= self._category_manager.categories['current_assets'],
-                current_liabilities= self._category_manager.categories['current_liabilities'],
-                non_current_liabilities= self._category_manager.categories['non_current_liabilities'],
-                equity= self._category_manager.categories['equity'],
-                revenue_items= self._category_manager.categories['revenue_items'],
-                cost_of_sales_items= self._category_manager.categories['cost_of_sales_items'],
-                closing_inventories= self._category_manager.categories['closing_inventories'],
-                other_income_items= self._category_manager.categories['other_income_items'],
-                general_admin_expenses_items= self._category_manager.categories['general_admin_expenses_items'],
-                finance_costs_items= self._category_manager.categories['finance_costs_items'],
-                tax_items= self._category_manager.categories['tax_items']
-            )
-            self._use_two_decimals = self._accountant_helper.use_two_decimals  # Set precision from DataLoader
-            self._statement_current = self._accountant_helper.get_income_statement(current_year)
-            self._balance_current = self._statement_current['BalanceSheet']
-            self._statement_previous = self._accountant_helper.get_income_statement(current_year - 1)
-            self._balance_previous = self._statement_previous['BalanceSheet']
-            self._all_items_curr = set(str(row['Item']).strip().lower() for _, row in self._accountant_helper.data[current_year].iterrows())
-            self._all_items_prev = set(str(row['Item']).strip().lower() for _, row in self._accountant_helper.data[current_year - 1].iterrows())
-
-            # Calculate HasInventoriesCurr and InventoriesCurr
-            self._has_inventories_curr = 'inventories' in self._all_items_curr
-            self._inventories_curr = 0
-            self._inventories_prev = 0
-            for item in self._balance_current['current_assets']:
-                if item['name'] == "inventories":
-                    self._inventories_curr = item['value']
-                    break
-            for item in self._balance_previous['current_assets']:
-                if item['name'] == "inventories":
-                    self._inventories_prev = item['value']
-                    break
-
-            # Calculate HasDueFromDirectorsCurr and DueFromDirectorsCurr
-            due_from_directors_items = ['amount due from director', 'amount due from a director', 'amount due from the director', 'amount due from directors']
-            self._has_due_from_directors_curr = any(item in self._all_items_curr for item in due_from_directors_items)
-            self._due_from_directors_curr = 0
-            for item in self._balance_current['current_assets']:
-                if item['name'] in due_from_directors_items:
-                    self._due_from_directors_curr = item['value']
-                    break
-
-            # Calculate DueToDirectorsCurr
-            self._due_to_directors_curr = 0
-            due_to_directors_items = ['amount due to director', 'amount due to a director', 'amount due to the director', 'amount due to directors']
-            for item in self._balance_current['current_liabilities']:
-                if item['name'] in due_to_directors_items:
-                    self._due_to_directors_curr = -item['value']
-                    break
-
-            # Calculate HasSubsidiary
-            subsidiary_items = [
-                'investments in a subsidiary', 'investments in subsidiaries',
-                'interests in subsidiaries', 'interests in a subsidiary'
-            ]
-            self._has_subsidiary = any(item in self._all_items_curr for item in subsidiary_items)
+        tb = self._load_tb(excel_file, first_year, current_year, progress, metrics) if excel_file and current_year else EMPTY_TB
+
+        context = ReportContext(
+            first_year=first_year,
+            date_of_incorporation=date_of_incorporation,
+            last_day_date=last_day_date,
+            exactly_one_year_ago=exactly_one_year_ago,
+            last_day_date_num=last_day_date_num,
+            last_day_date_cn=last_day_date_cn,
+            is_december=is_december,
+            one_year_ago=one_year_ago,
+            one_year_ago_cn=one_year_ago_cn,
+            audit_year=audit_year,
+            cu_year_for_first_year=cu_year_for_first_year,
+            pr_year_for_first_year=pr_year_for_first_year,
+            over18m=over18m,
+            c_year_for_first_year=c_year_for_first_year,
+            related_party_info=None,
+            **tb
+        )
+        if context.accountant_helper is not None:
+            context = context._replace(related_party_info=self.get_related_party_info(context))
+        return context
+
+    def _load_tb(self, excel_file, first_year, current_year, progress=None, metrics=None):
+        """Load the trial balance and return the JobContext fields derived from it (see TB_FIELDS)."""
+        self._report_stage(progress, STAGE_LOADING_TB, metrics)
+        accountant_helper = self._get_accountant_helper(excel_file, first_year, current_year, metrics)
+        self._report_stage(progress, STAGE_CATEGORIZING, metrics)
+        statement_current = accountant_helper.get_income_statement(current_year)
+        balance_current = statement_current['BalanceSheet']
+        statement_previous = accountant_helper.get_income_statement(current_year - 1)
+        balance_previous = statement_previous['BalanceSheet']
+        # DataLoader has already stripped and lowercased the item names
+        all_items_curr = frozenset(accountant_helper.data[current_year]['Item'])
+        all_items_prev = frozenset(accountant_helper.data[current_year - 1]['Item'])
+
+        if metrics is not None:
+            metrics.count('tb_rows', len(accountant_helper.data[current_year]) + len(accountant_helper.data[current_year - 1]))
+
+        # Name -> value lookups used for the rest of the run
+        index_current = BalanceIndex(statement_current)
+        index_previous = BalanceIndex(statement_previous)
+
+        # Calculate HasDueFromDirectorsCurr and DueFromDirectorsCurr
+        due_from_directors_curr = index_current.first('current_assets', self.due_from_director_items)
+        # Calculate DueToDirectorsCurr
+        due_to_directors_curr = -index_current.first('current_liabilities', self.due_to_director_items)
+
+        return dict(
+            accountant_helper=accountant_helper,
+            use_two_decimals=accountant_helper.use_two_decimals,  # Precision from DataLoader
+            statement_current=statement_current,
+            balance_current=balance_current,
+            statement_previous=statement_previous,
+            balance_previous=balance_previous,
+            index_current=index_current,
+            index_previous=index_previous,
+            all_items_curr=all_items_curr,
+            all_items_prev=all_items_prev,
+            all_items=all_items_curr | all_items_prev,
+            has_inventories_curr='inventories' in all_items_curr,
+            inventories_curr=index_current.value('current_assets', 'inventories'),
+            inventories_prev=index_previous.value('current_assets', 'inventories'),
+            has_due_from_directors_curr=any(item in all_items_curr for item in self.due_from_director_items),
+            due_from_directors_curr=due_from_directors_curr,
+            due_to_directors_curr=due_to_directors_curr,
+            has_subsidiary=any(item in all_items_curr for item in self.subsidiary_items),
+        )
 
+    @instrumented
+    @cached_report('aux_output_path')
     def generate_aux_document(
         self,
         last_day_of_year,
@@ -436,7 +681,11 @@ class DocumentGenerator:
         investment_in_security=False,
         audit_opinion="Opinion",
         audit_type="",
-        date_of_incorporation=None
+        date_of_incorporation=None,
+        progress=None,
+        metrics=None,
+        force=False,
+        context=None
     ):
         template_path = DocumentGenerator.AUX_TPLS[audit_type]
         if not os.path.exists(resource_path(template_path)):
@@ -446,13 +695,12 @@ class DocumentGenerator:
 
         logger.info(f"Attempting to load aux template: {template_path}")
         try:
-            template = DocxTemplate(resource_path(template_path))
+            template = self._get_template(template_path, metrics)
         except Exception as e:
             logger.error(f"Failed to initialize aux DocxTemplate: {str(e)}")
             raise ValueError(f"Failed to initialize aux DocxTemplate: {str(e)}")
 
-        # Initialize common data if not already set
-        self._initialize_common_data(
+        job = self._initialize_common_data(
             last_day_of_year,
             business_type,
             company_name_en,
@@ -462,59 +710,60 @@ class DocumentGenerator:
             excel_file,
             first_year,
             current_year,
-            date_of_incorporation
+            date_of_incorporation,
+            progress,
+            metrics,
+            context=context
         )
+        self._report_stage(progress, STAGE_BUILDING_CONTEXT, metrics)
 
         company_address_cleaned = company_address.replace('\n', ' ').strip()
 
         data = {
             "LastDayOfYear": last_day_of_year,
-            "LastDayOfYearNum": self._last_day_date_num,
-            "LastDayOfYearCN": self._last_day_date_cn,
-            "OneYearAgoCN": self._one_year_ago_cn,
-            "AuditYear": self._audit_year,
-            "BusinessType": self._business_type,
-            "CompanyNameInEnglishPlaceholder": self._company_name_en,
+            "LastDayOfYearNum": job.last_day_date_num,
+            "LastDayOfYearCN": job.last_day_date_cn,
+            "OneYearAgoCN": job.one_year_ago_cn,
+            "AuditYear": job.audit_year,
+            "BusinessType": job.business_type,
+            "CompanyNameInEnglishPlaceholder": job.company_name_en,
             "CompanyNameInChinesePlaceholder": company_name_cn or "",
             "CompanyAddressPlaceHolder": company_address_cleaned,
             "BusinessDescriptionPlaceholder": business_description,
             "bizAdditionalDesc": additional_business_description,
-            "Directors": self._directors_list,
-            "Shareholders": self._shareholders_list,
-            "Currency": self._currency,
+            "Directors": job.directors_list,
+            "Shareholders": job.shareholders_list,
+            "Currency": job.currency,
             "CurrencyDesc": currency_desc,
             "CurrencyFullDesc": currency_full_desc,
             "HasStockingLetter": has_stocking_letter,
             "BRNo": br_no,
-            "HasInventoriesCurr": self._has_inventories_curr,
-            "HasDueToDirectorsCurr": self._due_to_directors_curr != 0,
+            "HasInventoriesCurr": job.has_inventories_curr,
+            "HasDueToDirectorsCurr": job.due_to_directors_curr != 0,
             "DueToDirectorsCurr": format_number(
-                self._due_to_directors_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            ) if self._due_to_directors_curr != 0 else "-",
+                job.due_to_directors_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
+            ) if job.due_to_directors_curr != 0 else "-",
             "DueToDirectorsCurrFn": format_number(
-                self._due_to_directors_curr, is_cost_or_admin=False, is_liability=False, is_tax=True, use_two_decimals=self._use_two_decimals
-            ) if self._due_to_directors_curr != 0 else "-",
-            "HasDueFromDirectorsCurr": self._has_due_from_directors_curr,
+                job.due_to_directors_curr, is_cost_or_admin=False, is_liability=False, is_tax=True, use_two_decimals=job.use_two_decimals
+            ) if job.due_to_directors_curr != 0 else "-",
+            "HasDueFromDirectorsCurr": job.has_due_from_directors_curr,
             "DueFromDirectorsCurr": format_number(
-                self._due_from_directors_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            ) if self._due_from_directors_curr != 0 else "-",
+                job.due_from_directors_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
+            ) if job.due_from_directors_curr != 0 else "-",
             "DueFromDirectorsCurrFn": format_number(
-                self._due_from_directors_curr, is_cost_or_admin=False, is_liability=False, is_tax=True, use_two_decimals=self._use_two_decimals
-            ) if self._due_from_directors_curr != 0 else "-",
+                job.due_from_directors_curr, is_cost_or_admin=False, is_liability=False, is_tax=True, use_two_decimals=job.use_two_decimals
+            ) if job.due_from_directors_curr != 0 else "-",
             "InventoriesCurr": format_number(
-                self._inventories_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            ) if self._inventories_curr != 0 else "-",
-            "HasSubsidiary": self._has_subsidiary,
+                job.inventories_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
+            ) if job.inventories_curr != 0 else "-",
+            "HasSubsidiary": job.has_subsidiary,
             "AuditFirmInEnglishPlacehoder": audit_firm,
             "ApprovalDatePlaceholder": approval_date,
             "AuditorNamePlaceholder": auditor_name,
             "AuditorLicenseNoPlaceholder": auditor_license,
-            "SharesCurr": format_number(
-                shares_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            ),
-            "SharesPrev": format_number(
-                shares_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            ),
+            # Share counts, not amounts: always whole numbers
+            "SharesCurr": format_number(shares_curr, is_cost_or_admin=False, is_liability=False),
+            "SharesPrev": format_number(shares_prev, is_cost_or_admin=False, is_liability=False),
             "HasNameChanged": has_name_changed,
             "PassedDate": passed_date,
             "NewCompanyName": new_company_name,
@@ -544,15 +793,22 @@ class DocumentGenerator:
                 return None, f"Error: Please fill in all fields: {key}"
         # Render and save the template
         try:
-            logger.info(f"Rendering aux template to {aux_output_path}")
-            template.render(data)
-            template.save(aux_output_path)
+            with self._stage(progress, STAGE_RENDERING, metrics):
+                logger.info(f"Rendering aux template to {aux_output_path}")
+                metrics.count('context_fields', len(data))
+                template.render(data)
+            with self._stage(progress, STAGE_SAVING, metrics):
+                template.save(aux_output_path)
             logger.info(f"Aux document successfully generated at: {aux_output_path}")
             return True, ""
+        except GenerationCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Failed to render or save aux document: {str(e)}")
             return False, f"Error: Failed to generate aux document: {str(e)}"
 
+    @instrumented
+    @cached_report('output_path')
     def generate_document(
         self,
         business_type="general trading",
@@ -608,7 +864,11 @@ class DocumentGenerator:
         investment_in_security=False,
         audit_opinion="Opinion",
         audit_type="WH",
-        shareholders=None
+        shareholders=None,
+        progress=None,
+        metrics=None,
+        force=False,
+        context=None
     ):
         try:
             file_key = audit_type
@@ -620,13 +880,12 @@ class DocumentGenerator:
                 raise FileNotFoundError(f"Template file not found at: {template_path}")
 
             logger.info(f"Attempting to load template: {template_path}")
-            template = DocxTemplate(resource_path(template_path))
+            template = self._get_template(template_path, metrics)
             if template is None:
                 logger.error("Failed to initialize DocxTemplate: template is None")
                 raise ValueError("Failed to initialize DocxTemplate: template is None")
 
-            # Initialize common data if not already set
-            self._initialize_common_data(
+            job = self._initialize_common_data(
                 last_day_of_year,
                 business_type,
                 company_name_en,
@@ -636,10 +895,13 @@ class DocumentGenerator:
                 excel_file,
                 first_year,
                 current_year,
-                date_of_incorporation
+                date_of_incorporation,
+                progress,
+                metrics,
+                context=context
             )
 
-            first_director_name = self._directors_list[0] if self._directors_list else ""
+            first_director_name = job.directors_list[0] if job.directors_list else ""
 
             if current_year is None:
                 logger.error("current_year must be provided to generate_document")
@@ -647,55 +909,34 @@ class DocumentGenerator:
 
             company_address_cleaned = company_address.replace('\n', ' ').strip()
 
-            if self._business_type == "general trading":
+            if job.business_type == "general trading":
                 revenue_name = "Sales of goods"
-            elif self._business_type == "services":
+            elif job.business_type == "services":
                 revenue_name = "Services fee income"
-            elif self._business_type == "agency services":
+            elif job.business_type == "agency services":
                 revenue_name = "Agency service income"
-            elif self._business_type in ("dormant", "investment holding"):
+            elif job.business_type in ("dormant", "investment holding"):
                 revenue_name = "Sales of goods"
             else:
                 logger.error("Business type must be 'general trading', 'services', 'dormant', 'agency services', or 'investment holding'")
                 raise ValueError("Business type must be 'general trading', 'services', 'dormant', 'agency services', or 'investment holding'")
 
-            # Use existing accountant_helper if initialized
-            if not self._accountant_helper:
-                tb_file = excel_file if excel_file else "example_tb_for_test.xlsx"
-                logger.info(f"Using trial balance file: {tb_file}")
-                self._accountant_helper = DataLoader(
-                    excel_file=tb_file,
-                    first_year=first_year,
-                    current_year=current_year,
-                    non_current_assets=self._category_manager.categories['non_current_assets'],
-                    current_assets=self._category_manager.categories['current_assets'],
-                    current_liabilities=self._category_manager.categories['current_liabilities'],
-                    non_current_liabilities=self._category_manager.categories['non_current_liabilities'],
-                    equity=self._category_manager.categories['equity'],
-                    revenue_items=self._category_manager.categories['revenue_items'],
-                    cost_of_sales_items=self._category_manager.categories['cost_of_sales_items'],
-                    closing_inventories=self._category_manager.categories['closing_inventories'],
-                    other_income_items=self._category_manager.categories['other_income_items'],
-                    general_admin_expenses_items=self._category_manager.categories['general_admin_expenses_items'],
-                    finance_costs_items=self._category_manager.categories['finance_costs_items'],
-                    tax_items=self._category_manager.categories['tax_items']
-                )
-                self._use_two_decimals = self._accountant_helper.use_two_decimals  # Set precision from DataLoader
+            # Without a TB file the example TB is used
+            if job.accountant_helper is None:
+                job = job._replace(**self._load_tb(excel_file, first_year, current_year, progress, metrics))
+            self._report_stage(progress, STAGE_BUILDING_CONTEXT, metrics)
 
-            statement_current = self._accountant_helper.get_income_statement(current_year)
+            statement_current = job.statement_current
             previous_year = current_year - 1
-            statement_previous = self._accountant_helper.get_income_statement(previous_year)
+            statement_previous = job.statement_previous
 
             balance_current = statement_current['BalanceSheet']
             balance_previous = statement_previous['BalanceSheet']
 
-            all_items = set()
-            for year in [current_year, previous_year]:
-                df = self._accountant_helper.data[year]
-                all_items.update(str(row['Item']).strip().lower() for _, row in df.iterrows())
-            self._all_items = all_items
+            all_items = job.all_items
 
-            logger.debug(f"all_items: {sorted(all_items)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("all_items: %s", sorted(all_items))
 
             due_from_directos_items = ['amount due from director', 'amount due from a director', 'amount due from the director', 'amount due from directors']
             due_from_dir = any(item in all_items for item in due_from_directos_items)
@@ -715,17 +956,17 @@ class DocumentGenerator:
             has_intangible_assets = 'intangible assets' in all_items
             has_associate = any(item in all_items for item in ['investments in an associate', 'investments in associates'])
 
-            logger.debug(f"has_inventories: {has_inventories}")
-            logger.debug(f"due_from_dir: {due_from_dir}")
-            logger.debug(f"has_associate: {has_associate}")
-            logger.debug(f"has_long_term_investments: {has_long_term_investments}")
-            logger.debug(f"has_property: {has_property}")
-            logger.debug(f"has_investment: {has_investment}")
-            logger.debug(f"has_intangible_asset: {has_intangible_asset}")
+            logger.debug("has_inventories: %s", has_inventories)
+            logger.debug("due_from_dir: %s", due_from_dir)
+            logger.debug("has_associate: %s", has_associate)
+            logger.debug("has_long_term_investments: %s", has_long_term_investments)
+            logger.debug("has_property: %s", has_property)
+            logger.debug("has_investment: %s", has_investment)
+            logger.debug("has_intangible_asset: %s", has_intangible_asset)
 
             pbt_current = statement_current['ProfitBeforeTax']
             pbt_previous = statement_previous['ProfitBeforeTax']
-            if self._first_year:
+            if job.first_year:
                if pbt_current >=0:
                    plbft_name = "Profit"
                else:
@@ -740,7 +981,7 @@ class DocumentGenerator:
 
             pfy_current = statement_current['ProfitForYear']
             pfy_previous = statement_previous['ProfitForYear']
-            if self._first_year:
+            if job.first_year:
                 if pfy_current >= 0:
                     pl_name = "Profit"
                 else:
@@ -768,7 +1009,7 @@ class DocumentGenerator:
 
             net_assets_current = balance_current['net_assets']
             net_assets_previous = balance_previous['net_assets']
-            if self._first_year:
+            if job.first_year:
                 if net_assets_current >= 0:
                     net_assets_name = "Net assets"
                 else:
@@ -781,24 +1022,18 @@ class DocumentGenerator:
                 else:
                     net_assets_name = "Net assets/(liabilities)"
 
-            cash_bank = "-"
-            for item in balance_current['current_assets']:
-                if item['name'] == "cash and bank balances":
-                    cash_bank = format_number(item['value'], use_two_decimals=self._use_two_decimals)
-                    break
+            index_current = job.index_current
+            index_previous = job.index_previous
+
+            cash_bank = index_current.value('current_assets', "cash and bank balances", None)
+            cash_bank = format_number(cash_bank, use_two_decimals=job.use_two_decimals) if cash_bank is not None else "-"
             
             long_term_investments_curr = 0
             long_term_investments_prev = 0
             if has_long_term_investments:
-                for item in balance_current['non_current_assets']:
-                    if item['name'] == "long-term investments":
-                        long_term_investments_curr = item['value']
-                        break
-                for item in balance_previous['non_current_assets']:
-                    if item['name'] == "long-term investments":
-                        long_term_investments_prev = item['value']
-                        break
-            if self._use_two_decimals:
+                long_term_investments_curr = index_current.value('non_current_assets', "long-term investments")
+                long_term_investments_prev = index_previous.value('non_current_assets', "long-term investments")
+            if job.use_two_decimals:
                 long_term_investments_curr = round(long_term_investments_curr, 2)
                 long_term_investments_prev = round(long_term_investments_prev, 2)
             else:
@@ -808,186 +1043,112 @@ class DocumentGenerator:
             current_investment_curr = 0
             current_investment_prev = 0
             if has_current_investments:
-                for item in balance_current['current_assets']:
-                    if item['name'] == "current investments":
-                        current_investment_curr = item['value']
-                        break
-                for item in balance_previous['current_assets']:
-                    if item['name'] == "current investments":
-                        current_investment_prev = item['value']
-                        break
-            if self._use_two_decimals:
+                current_investment_curr = index_current.value('current_assets', "current investments")
+                current_investment_prev = index_previous.value('current_assets', "current investments")
+            if job.use_two_decimals:
                 current_investment_curr = round(current_investment_curr, 2)
                 current_investment_prev = round(current_investment_prev, 2)
             else:
                 current_investment_curr = int(current_investment_curr)
                 current_investment_prev = int(current_investment_prev)
 
-            audit_fee_current = "-"
-            audit_fee_previous = "-"
-            for item in statement_current['GeneralAdminExpensesDetails']:
-                if item['name'] in ["audit fee", "auditors' remuneration"]:
-                    audit_fee_current = format_number(item['value'], is_cost_or_admin=False, use_two_decimals=self._use_two_decimals)
-                    break
-            for item in statement_previous['GeneralAdminExpensesDetails']:
-                if item['name'] in ["audit fee", "auditors' remuneration"]:
-                    audit_fee_previous = format_number(item['value'], is_cost_or_admin=False, use_two_decimals=self._use_two_decimals)
-                    break
-
-            d_salary_curr = "-"
-            d_salary_prev = "-"
-            for item in statement_current['GeneralAdminExpensesDetails']:
-                if item['name'] in ["director's remuneration", "director’s remuneration"]:
-                    d_salary_curr = format_number(item['value'], is_cost_or_admin=False, use_two_decimals=self._use_two_decimals)
-                    break
-            for item in statement_previous['GeneralAdminExpensesDetails']:
-                if item['name'] in ["director's remuneration", "director’s remuneration"]:
-                    d_salary_prev = format_number(item['value'], is_cost_or_admin=False, use_two_decimals=self._use_two_decimals)
-                    break
-
-            benefit_current = 0
-            benefit_previous = 0
-            for item in statement_current['GeneralAdminExpensesDetails']:
-                if item['name'] in ["director's remuneration", "director’s remuneration", "salaries"]:
-                    benefit_current += item['value']
-            for item in statement_previous['GeneralAdminExpensesDetails']:
-                if item['name'] in ["director's remuneration", "director’s remuneration", "salaries"]:
-                    benefit_previous += item['value']
-            if self._use_two_decimals:
+            def general_admin_amount(index, names):
+                value = index.first('GeneralAdminExpensesDetails', names, None)
+                return format_number(value, is_cost_or_admin=False, use_two_decimals=job.use_two_decimals) if value is not None else "-"
+
+            audit_fee_current = general_admin_amount(index_current, ["audit fee", "auditors' remuneration"])
+            audit_fee_previous = general_admin_amount(index_previous, ["audit fee", "auditors' remuneration"])
+
+            d_salary_curr = general_admin_amount(index_current, ["director's remuneration", "director’s remuneration"])
+            d_salary_prev = general_admin_amount(index_previous, ["director's remuneration", "director’s remuneration"])
+
+            benefit_items = ["director's remuneration", "director’s remuneration", "salaries"]
+            benefit_current = index_current.total('GeneralAdminExpensesDetails', benefit_items)
+            benefit_previous = index_previous.total('GeneralAdminExpensesDetails', benefit_items)
+            if job.use_two_decimals:
                 benefit_current = round(benefit_current, 2)
                 benefit_previous = round(benefit_previous, 2)
             else:
                 benefit_current = int(benefit_current)
                 benefit_previous = int(benefit_previous)
             benefit_current = format_number(
-                benefit_current, is_cost_or_admin=False, use_two_decimals=self._use_two_decimals
+                benefit_current, is_cost_or_admin=False, use_two_decimals=job.use_two_decimals
             ) if benefit_current != 0 else "-"
             benefit_previous = format_number(
-                benefit_previous, is_cost_or_admin=False, use_two_decimals=self._use_two_decimals
+                benefit_previous, is_cost_or_admin=False, use_two_decimals=job.use_two_decimals
             ) if benefit_previous != 0 else "-"
 
-            due_from_director_curr = 0
-            due_to_director_curr = 0
-            due_from_director_prev = 0
-            due_to_director_prev = 0
-            show_due_paragraph = False
-
-
-            inventories_curr = 0
-            inventories_prev = 0
-            for item in balance_current['current_assets']:
-                if item['name'] == "inventories":
-                    inventories_curr = item['value']
-                    break
-            for item in balance_previous['current_assets']:
-                if item['name'] == "inventories":
-                    inventories_prev = item['value']
-                    break
-            if self._use_two_decimals:
+            inventories_curr = job.inventories_curr
+            inventories_prev = job.inventories_prev
+            if job.use_two_decimals:
                 inventories_curr = round(inventories_curr, 2)
                 inventories_prev = round(inventories_prev, 2)
             else:
                 inventories_curr = int(inventories_curr)
                 inventories_prev = int(inventories_prev)
             inventories_curr = format_number(
-                inventories_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                inventories_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if inventories_curr != 0 else "-"
             inventories_prev = format_number(
-                inventories_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                inventories_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if inventories_prev != 0 else "-"
 
             investment_in_sub_curr = 0
             investment_in_sub_prev = 0
-            subsidiary_items = [
-                'investments in a subsidiary', 'investments in subsidiaries',
-                'interests in subsidiaries', 'interests in a subsidiary'
-            ]
+            subsidiary_items = self.subsidiary_items
             has_subsidiary_for_report = any(item in all_items for item in subsidiary_items)
             if has_subsidiary_for_report:
-                for item in balance_current['non_current_assets']:
-                    if item['name'] in subsidiary_items:
-                        investment_in_sub_curr += item['value']
-                for item in balance_previous['non_current_assets']:
-                    if item['name'] in subsidiary_items:
-                        investment_in_sub_prev += item['value']
-            if self._use_two_decimals:
+                investment_in_sub_curr = index_current.total('non_current_assets', subsidiary_items)
+                investment_in_sub_prev = index_previous.total('non_current_assets', subsidiary_items)
+            if job.use_two_decimals:
                 investment_in_sub_curr = round(investment_in_sub_curr, 2)
                 investment_in_sub_prev = round(investment_in_sub_prev, 2)
             else:
                 investment_in_sub_curr = int(investment_in_sub_curr)
                 investment_in_sub_prev = int(investment_in_sub_prev)
             investment_in_sub_curr = format_number(
-                investment_in_sub_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                investment_in_sub_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if investment_in_sub_curr != 0 else "-"
             investment_in_sub_prev = format_number(
-                investment_in_sub_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                investment_in_sub_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if investment_in_sub_prev != 0 else "-"
 
-            investment_in_asso_curr = 0
-            investment_in_asso_prev = 0
             associate_items = ['investments in an associate', 'investments in associates']
-            for item in balance_current['non_current_assets']:
-                if item['name'] in associate_items:
-                    investment_in_asso_curr += item['value']
-            for item in balance_previous['non_current_assets']:
-                if item['name'] in associate_items:
-                    investment_in_asso_prev += item['value']
-            if self._use_two_decimals:
+            investment_in_asso_curr = index_current.total('non_current_assets', associate_items)
+            investment_in_asso_prev = index_previous.total('non_current_assets', associate_items)
+            if job.use_two_decimals:
                 investment_in_asso_curr = round(investment_in_asso_curr, 2)
                 investment_in_asso_prev = round(investment_in_asso_prev, 2)
             else:
                 investment_in_asso_curr = int(investment_in_asso_curr)
                 investment_in_asso_prev = int(investment_in_asso_prev)
             investment_in_asso_curr = format_number(
-                investment_in_asso_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                investment_in_asso_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if investment_in_asso_curr != 0 else "-"
             investment_in_asso_prev = format_number(
-                investment_in_asso_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                investment_in_asso_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if investment_in_asso_prev != 0 else "-"
 
-            dividend_curr = 0
-            dividend_prev = 0
             dividend_items = ['dividends paid to shareholders', 'dividends paid to a shareholder', 'dividends paid to shareholder']
-            for item in balance_current['equity']:
-                if item['name'] in dividend_items:
-                    dividend_curr += item['value']
-            for item in balance_previous['equity']:
-                if item['name'] in dividend_items:
-                    dividend_prev += item['value']
-            if self._use_two_decimals:
+            dividend_curr = index_current.total('equity', dividend_items)
+            dividend_prev = index_previous.total('equity', dividend_items)
+            if job.use_two_decimals:
                 dividend_curr = round(dividend_curr, 2)
                 dividend_prev = round(dividend_prev, 2)
             else:
                 dividend_curr = int(dividend_curr)
                 dividend_prev = int(dividend_prev)
 
-            shares_gap = float(shares_curr.replace(',', '')) - float(shares_prev.replace(',', ''))
-            if self._use_two_decimals:
-                shares_gap = round(shares_gap, 2)
-            else:
-                shares_gap = int(shares_gap)
-            shares_gap_formatted = format_number(
-                shares_gap, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            )
-            shares_curr_formatted = format_number(
-                shares_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            )
-            shares_prev_formatted = format_number(
-                shares_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
-            )
+            # Share counts are whole numbers whatever the precision of the TB amounts
+            shares_gap = int(float(shares_curr.replace(',', '')) - float(shares_prev.replace(',', '')))
+            shares_gap_formatted = format_number(shares_gap, is_cost_or_admin=False, is_liability=False)
+            shares_curr_formatted = format_number(shares_curr, is_cost_or_admin=False, is_liability=False)
+            shares_prev_formatted = format_number(shares_prev, is_cost_or_admin=False, is_liability=False)
 
-            shares_cap_curr = 0
-            shares_cap_prev = 0
-            for item in balance_current['equity']:
-                if item['name'] == "share capital":
-                    shares_cap_curr = item['value']
-                    break
-            for item in balance_previous['equity']:
-                if item['name'] == "share capital":
-                    shares_cap_prev = item['value']
-                    break
+            shares_cap_curr = index_current.value('equity', "share capital")
+            shares_cap_prev = index_previous.value('equity', "share capital")
             shares_cap_gap = shares_cap_curr - shares_cap_prev
-            if self._use_two_decimals:
+            if job.use_two_decimals:
                 shares_cap_curr = round(shares_cap_curr, 2)
                 shares_cap_prev = round(shares_cap_prev, 2)
                 shares_cap_gap = round(shares_cap_gap, 2)
@@ -996,25 +1157,14 @@ class DocumentGenerator:
                 shares_cap_prev = int(shares_cap_prev)
                 shares_cap_gap = int(shares_cap_gap)
 
-            for item in balance_current['current_assets']:
-                if item['name'] in ["amount due from a director", "amount due from the director", "amount due from director", "amount due from directors"]:
-                    due_from_director_curr = item['value']
-                    show_due_paragraph = True
-                    break
-            for item in balance_current['current_liabilities']:
-                if item['name'] in ["amount due to a director", "amount due to the director", "amount due to director", "amount due to directors"]:
-                    due_to_director_curr = -item['value']
-                    break
-            for item in balance_previous['current_assets']:
-                if item['name'] in ["amount due from a director", "amount due from the director", "amount due from director", "amount due from directors"]:
-                    due_from_director_prev = item['value']
-                    show_due_paragraph = True
-                    break
-            for item in balance_previous['current_liabilities']:
-                if item['name'] in ["amount due to a director", "amount due to the director", "amount due to director", "amount due to directors"]:
-                    due_to_director_prev = -item['value']
-                    break
-            if self._use_two_decimals:
+            due_from_director_curr = index_current.first('current_assets', self.due_from_director_items, None)
+            due_from_director_prev = index_previous.first('current_assets', self.due_from_director_items, None)
+            show_due_paragraph = due_from_director_curr is not None or due_from_director_prev is not None
+            due_from_director_curr = due_from_director_curr or 0
+            due_from_director_prev = due_from_director_prev or 0
+            due_to_director_curr = -index_current.first('current_liabilities', self.due_to_director_items)
+            due_to_director_prev = -index_previous.first('current_liabilities', self.due_to_director_items)
+            if job.use_two_decimals:
                 due_from_director_curr = round(due_from_director_curr, 2)
                 due_to_director_curr = round(due_to_director_curr, 2)
                 due_from_director_prev = round(due_from_director_prev, 2)
@@ -1035,38 +1185,29 @@ class DocumentGenerator:
             else:
                 due_prev = due_to_director_prev
 
-            if self._first_year:
+            if job.first_year:
                 due_max = max(due_curr, shares_cap_curr)
             else:
                 due_max = max(due_curr, due_prev)
-            if self._use_two_decimals:
+            if job.use_two_decimals:
                 due_max = round(due_max, 2)
             else:
                 due_max = int(due_max)
 
             due_curr = format_number(
-                due_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                due_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if due_curr != 0 else "-"
             due_prev = format_number(
-                due_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                due_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if due_prev != 0 else "-"
             due_max = format_number(
-                due_max, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                due_max, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             ) if due_max != 0 else "-"
 
-            cap_res_curr = 0
-            cap_res_prev = 0
-            cap_res_gap = 0
-            for item in balance_current['equity']:
-                if item['name'] in ["capital reserves", "reserves"]:
-                    cap_res_curr = item['value']
-                    break
-            for item in balance_previous['equity']:
-                if item['name'] in ["capital reserves", "reserves"]:
-                    cap_res_prev = item['value']
-                    break
+            cap_res_curr = index_current.first('equity', ["capital reserves", "reserves"])
+            cap_res_prev = index_previous.first('equity', ["capital reserves", "reserves"])
             cap_res_gap = cap_res_curr - cap_res_prev
-            if self._use_two_decimals:
+            if job.use_two_decimals:
                 cap_res_curr = round(cap_res_curr, 2)
                 cap_res_prev = round(cap_res_prev, 2)
                 cap_res_gap = round(cap_res_gap, 2)
@@ -1075,27 +1216,27 @@ class DocumentGenerator:
                 cap_res_prev = int(cap_res_prev)
                 cap_res_gap = int(cap_res_gap)
             cap_res_curr = format_number(
-                cap_res_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                cap_res_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             )
             cap_res_prev = format_number(
-                cap_res_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                cap_res_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             )
 
-            balance_before_current = self._accountant_helper._get_balance_before_period(current_year)
-            balance_before_previous = self._accountant_helper._get_balance_before_period(previous_year)
+            balance_before_current = job.accountant_helper._get_balance_before_period(current_year)
+            balance_before_previous = job.accountant_helper._get_balance_before_period(previous_year)
             profit_for_year_current = statement_current['ProfitForYear']
             profit_for_year_previous = statement_previous['ProfitForYear']
 
             re_curr_num = balance_before_current + profit_for_year_current + dividend_curr 
             re_prev_num = balance_before_previous + profit_for_year_previous + dividend_prev
-            if self._use_two_decimals:
+            if job.use_two_decimals:
                 re_curr_num = round(re_curr_num, 2)
                 re_prev_num = round(re_prev_num, 2)
             else:
                 re_curr_num = int(re_curr_num)
                 re_prev_num = int(re_prev_num)
 
-            if self._first_year:
+            if job.first_year:
                 if re_curr_num >= 0:
                     re_name = "Retained earnings"
                 else:
@@ -1114,15 +1255,15 @@ class DocumentGenerator:
                     re_name_fn = "Accumulated loss"
 
             re_curr = format_number(
-                re_curr_num, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                re_curr_num, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             )
             re_prev = format_number(
-                re_prev_num, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals
+                re_prev_num, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals
             )
 
             total_equity_current = balance_current['total_equity'] + re_curr_num - dividend_curr
             total_equity_previous = balance_previous['total_equity'] + re_prev_num - dividend_prev
-            if self._use_two_decimals:
+            if job.use_two_decimals:
                 total_equity_current = round(total_equity_current, 2)
                 total_equity_previous = round(total_equity_previous, 2)
             else:
@@ -1130,7 +1271,7 @@ class DocumentGenerator:
                 total_equity_previous = int(total_equity_previous)
             profit_current = abs(profit_for_year_current)
             equity_current = abs(total_equity_current)
-            if self._use_two_decimals:
+            if job.use_two_decimals:
                 profit_current = round(profit_current, 2)
                 equity_current = round(equity_current, 2)
             else:
@@ -1139,7 +1280,7 @@ class DocumentGenerator:
 
             re_total = re_prev_num + profit_for_year_current + dividend_curr
             re_total2 = total_equity_previous + cap_res_gap + profit_for_year_current + dividend_prev
-            if self._use_two_decimals:
+            if job.use_two_decimals:
                 re_total = round(re_total, 2)
                 re_total2 = round(re_total2, 2)
             else:
@@ -1158,13 +1299,12 @@ class DocumentGenerator:
                     f"NetAssetsPrevious ({net_assets_previous}) does not equal TotalEquityPrevious ({total_equity_previous}). Document generation aborted."
                 )
 
-            due_final_holding_parent_company_info = self.get_due_info(self.due_from_final_holding_parent_company_items,
-                                                                      self.due_to_final_holding_parent_company_items,
-                                                                      self.due_final_holding_parent_company_items)
-            due_shareholder_info = self.get_due_info(self.due_from_shareholder_items, self.due_to_shareholder_items, self.due_shareholder_items)
-            due_imme_parent_company_info = self.get_due_info(self.due_from_imme_parent_company_items, self.due_to_imme_parent_company_items, self.due_imme_parent_company_items)
-            due_ultimate_holding_company_info = self.get_due_info(self.due_from_ultimate_holding_company_items, self.due_to_ultimate_holding_company_items, self.due_ultimate_holding_company_items)
-            due_holding_company_info = self.get_due_info(self.due_from_holding_company_items, self.due_to_holding_company_items, self.due_holding_company_items)
+            related_party_info = job.related_party_info or self.get_related_party_info(job)
+            due_final_holding_parent_company_info = related_party_info['final_holding_parent_company']
+            due_shareholder_info = related_party_info['shareholder']
+            due_imme_parent_company_info = related_party_info['imme_parent_company']
+            due_ultimate_holding_company_info = related_party_info['ultimate_holding_company']
+            due_holding_company_info = related_party_info['holding_company']
             footnote_vars = [
                 ('HasProperty', has_property, ['property, plant and equipment']),
                 ('HasLongTermInvestments', has_long_term_investments, ['long-term investments']),
@@ -1207,280 +1347,127 @@ class DocumentGenerator:
                 for item in director_items:
                     if item in all_items:
                         footnote_numbers[item] = 7
-                        logger.debug(f"Assigned {item}: 7")
+                        logger.debug("Assigned %s: 7", item)
 
             for var_name, var_value, item_names in footnote_vars:
-                logger.debug(f"Checking {var_name}: {var_value}")
+                logger.debug("Checking %s: %s", var_name, var_value)
                 if var_value:
                     if item_names:
                         for item_name in item_names:
                             footnote_numbers[item_name] = current_footnote
-                            logger.debug(f"Assigned {item_name}: {current_footnote}")
+                            logger.debug("Assigned %s: %s", item_name, current_footnote)
                     else:
                         footnote_numbers[var_name] = current_footnote
-                        logger.debug(f"Assigned {var_name}: {current_footnote}")
+                        logger.debug("Assigned %s: %s", var_name, current_footnote)
                     current_footnote += 1
-            logger.debug(f"Final footnote_numbers: {footnote_numbers}")
-
-            non_current_asset_names = sorted(set(
-                item['name'] for item in balance_current['non_current_assets']
-            ).union(
-                item['name'] for item in balance_previous['non_current_assets']
-            ))
-
-            non_current_assets_list = []
-            for idx, name in enumerate(non_current_asset_names):
-                current_value = next((item['value'] for item in balance_current['non_current_assets'] if item['name'] == name), 0)
-                prev_value = next((item['value'] for item in balance_previous['non_current_assets'] if item['name'] == name), 0)
-                fnnum = str(footnote_numbers.get(name, ""))
-                logger.debug(f"Item: {name}, Footnote: '{fnnum}'")
-                non_current_assets_list.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, use_two_decimals=self._use_two_decimals) if current_value != 0 else "-",
-                    'pr': format_number(prev_value, use_two_decimals=self._use_two_decimals) if prev_value != 0 else "-",
-                    'fnnum': fnnum,
-                    'is_last': idx == len(non_current_asset_names) - 1
-                })
-
-            current_asset_names = sorted(set(
-                item['name'] for item in balance_current['current_assets']
-            ).union(
-                item['name'] for item in balance_previous['current_assets']
-            ))
-
-            current_assets_list = []
-            for idx, name in enumerate(current_asset_names):
-                current_value = next((item['value'] for item in balance_current['current_assets'] if item['name'] == name), 0)
-                prev_value = next((item['value'] for item in balance_previous['current_assets'] if item['name'] == name), 0)
-                fnnum = str(footnote_numbers.get(name, ""))
-                logger.debug(f"Item: {name}, Footnote: '{fnnum}'")
-                current_assets_list.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, use_two_decimals=self._use_two_decimals) if current_value != 0 else "-",
-                    'pr': format_number(prev_value, use_two_decimals=self._use_two_decimals) if prev_value != 0 else "-",
-                    'fnnum': fnnum,
-                    'is_last': idx == len(current_asset_names) - 1
-                })
-
-            current_liabilities_names = sorted(set(
-                item['name'] for item in balance_current['current_liabilities']
-            ).union(
-                item['name'] for item in balance_previous['current_liabilities']
-            ))
-
-            current_liabilities_list = []
-            for idx, name in enumerate(current_liabilities_names):
-                current_value = next((item['value'] for item in balance_current['current_liabilities'] if item['name'] == name), 0)
-                prev_value = next((item['value'] for item in balance_previous['current_liabilities'] if item['name'] == name), 0)
-                fnnum = str(footnote_numbers.get(name, ""))
-                logger.debug(f"Item: {name}, Footnote: '{fnnum}'")
-                current_liabilities_list.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, is_liability=True, use_two_decimals=self._use_two_decimals) if current_value != 0 else "-",
-                    'pr': format_number(prev_value, is_liability=True, use_two_decimals=self._use_two_decimals) if prev_value != 0 else "-",
-                    'fnnum': fnnum,
-                    'is_last': idx == len(current_liabilities_names) - 1
-                })
-
-            non_current_liabilities_names = sorted(set(
-                item['name'] for item in balance_current['non_current_liabilities']
-            ).union(
-                item['name'] for item in balance_previous['non_current_liabilities']
-            ))
-
-            non_current_liabilities_list = []
-            for idx, name in enumerate(non_current_liabilities_names):
-                current_value = next((item['value'] for item in balance_current['non_current_liabilities'] if item['name'] == name), 0)
-                prev_value = next((item['value'] for item in balance_previous['non_current_liabilities'] if item['name'] == name), 0)
-                fnnum = str(footnote_numbers.get(name, ""))
-                logger.debug(f"Item: {name}, Footnote: '{fnnum}'")
-                non_current_liabilities_list.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, is_liability=True, use_two_decimals=self._use_two_decimals) if current_value != 0 else "-",
-                    'pr': format_number(prev_value, is_liability=True, use_two_decimals=self._use_two_decimals) if prev_value != 0 else "-",
-                    'fnnum': fnnum,
-                    'is_last': idx == len(non_current_liabilities_names) - 1
-                })
-
-            equity_names = set(
-                item['name'] for item in balance_current['equity']
-            ).union(
-                item['name'] for item in balance_previous['equity']
-            )
+            logger.debug("Final footnote_numbers: %s", footnote_numbers)
+
+            # Row formatters for comparative_rows, each formatting a whole column of amounts at once
+            number_formatter = get_formatter(job.use_two_decimals)
+
+            def amounts(**flags):
+                return lambda names, values: number_formatter.format_many(values, **flags)
+
+            def cost_amounts(names, values):
+                # Closing inventories reduce the cost of sales, so they are shown without brackets
+                closing = [name == 'closing inventories' for name in names]
+                return number_formatter.format_many(values, is_cost_or_admin=True, is_tax=closing)
+
+            def general_admin_amounts(names, values):
+                # Credit balances (negative expenses) are shown without brackets
+                credits = [not value > 0 for value in values]
+                return number_formatter.format_many(values, is_cost_or_admin=True, is_tax=credits)
+
+            non_current_assets_list = comparative_rows(
+                balance_current['non_current_assets'], balance_previous['non_current_assets'],
+                amounts(), footnotes=footnote_numbers)
+            current_assets_list = comparative_rows(
+                balance_current['current_assets'], balance_previous['current_assets'],
+                amounts(), footnotes=footnote_numbers)
+            current_liabilities_list = comparative_rows(
+                balance_current['current_liabilities'], balance_previous['current_liabilities'],
+                amounts(is_liability=True), footnotes=footnote_numbers)
+            non_current_liabilities_list = comparative_rows(
+                balance_current['non_current_liabilities'], balance_previous['non_current_liabilities'],
+                amounts(is_liability=True), footnotes=footnote_numbers)
+            # DO NOT list dividends: only the priority equity items are shown
+            equity_list = comparative_rows(
+                balance_current['equity'], balance_previous['equity'], amounts(),
+                priority=EQUITY_ORDER, others=False, footnotes=footnote_numbers)
 
-            priority_order = ["share capital", "reserves", "capital reserves"]
-            sorted_equity_names = []
-            for item in priority_order:
-                if item in equity_names:
-                    sorted_equity_names.append(item)
-                    equity_names.remove(item)
-            # DO NOT list dividends
-            #sorted_equity_names.extend(sorted(equity_names))
-
-            equity_list = []
-            for idx, name in enumerate(sorted_equity_names):
-                current_value = next((item['value'] for item in balance_current['equity'] if item['name'] == name), 0)
-                prev_value = next((item['value'] for item in balance_previous['equity'] if item['name'] == name), 0)
-                fnnum = str(footnote_numbers.get(name, ""))
-                logger.debug(f"Item: {name}, Footnote: '{fnnum}'")
-                equity_list.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, use_two_decimals=self._use_two_decimals) if current_value != 0 else "-",
-                    'pr': format_number(prev_value, use_two_decimals=self._use_two_decimals) if prev_value != 0 else "-",
-                    'fnnum': fnnum,
-                    'is_last': idx == len(sorted_equity_names) - 1
-                })
-
-            self._closing_inventories_curr = 0 
-            self._closing_inventories_prev = 0 
-            cost_items = []
             cost_items_current = statement_current['CostItemsDetails']
             cost_items_previous = statement_previous['CostItemsDetails']
-            cost_item_names = sorted(set(item['name'] for item in cost_items_current + cost_items_previous))
-            priority_order = ['opening inventories', 'purchases', 'closing inventories', 'direct costs']
-            sorted_cost_item_names = []
-            for item in priority_order:
-                if item in cost_item_names:
-                    sorted_cost_item_names.append(item)
-                    cost_item_names.remove(item)
-            sorted_cost_item_names.extend(sorted(cost_item_names))
-            for idx, name in enumerate(sorted_cost_item_names):
-                current_value = next((item['value'] for item in cost_items_current if item['name'] == name), 0)
-                previous_value = next((item['value'] for item in cost_items_previous if item['name'] == name), 0)
-                if name == 'closing inventories':
-                    self._closing_inventories_curr = current_value
-                    self._closing_inventories_prev = previous_value
-                    cost_items.append({
-                        'name': name.capitalize(),
-                        'cu': format_number(current_value, is_tax=True, use_two_decimals=self._use_two_decimals),
-                        'pr': format_number(previous_value, is_tax=True, use_two_decimals=self._use_two_decimals),
-                        'is_last': idx == len(sorted_cost_item_names) - 1
-                    })
-                else:
-                    cost_items.append({
-                        'name': name.capitalize(),
-                        'cu': format_number(current_value, is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                        'pr': format_number(previous_value, is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                        'is_last': idx == len(sorted_cost_item_names) - 1
-                    })
-
-            turnover_items = []
-            turnover_current = statement_current['RevenueItemsDetails']
-            turnover_previous = statement_previous['RevenueItemsDetails']
-            turnover_names = sorted(set(item['name'] for item in turnover_current + turnover_previous))
-            for idx, name in enumerate(turnover_names):
-                current_value = next((item['value'] for item in turnover_current if item['name'] == name), 0)
-                previous_value = next((item['value'] for item in turnover_previous if item['name'] == name), 0)
-                turnover_items.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, use_two_decimals=self._use_two_decimals),
-                    'pr': format_number(previous_value, use_two_decimals=self._use_two_decimals),
-                    'is_last': idx == len(turnover_names) - 1
-                })
-
-            other_income_items = []
-            other_income_current = statement_current['OtherIncomeDetails']
-            other_income_previous = statement_previous['OtherIncomeDetails']
-            other_income_names = sorted(set(item['name'] for item in other_income_current + other_income_previous))
-            for idx, name in enumerate(other_income_names):
-                current_value = next((item['value'] for item in other_income_current if item['name'] == name), 0)
-                previous_value = next((item['value'] for item in other_income_previous if item['name'] == name), 0)
-                other_income_items.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, use_two_decimals=self._use_two_decimals),
-                    'pr': format_number(previous_value, use_two_decimals=self._use_two_decimals),
-                    'is_last': idx == len(other_income_names) - 1
-                })
-
-            general_admin_expenses_items = []
-            general_admin_current = statement_current['GeneralAdminExpensesDetails']
-            general_admin_previous = statement_previous['GeneralAdminExpensesDetails']
-            general_admin_names = sorted(set(item['name'] for item in general_admin_current + general_admin_previous))
-            for idx, name in enumerate(general_admin_names):
-                current_value = next((item['value'] for item in general_admin_current if item['name'] == name), 0)
-                previous_value = next((item['value'] for item in general_admin_previous if item['name'] == name), 0)
-                if current_value > 0:
-                    current_value_fmt = format_number(current_value, is_cost_or_admin=True, use_two_decimals=self._use_two_decimals)
-                else:
-                    current_value_fmt = format_number(current_value, is_tax=True, use_two_decimals=self._use_two_decimals)
-                if previous_value > 0:
-                    previous_value_fmt = format_number(previous_value, is_cost_or_admin=True, use_two_decimals=self._use_two_decimals)
-                else:
-                    previous_value_fmt = format_number(previous_value, is_tax=True, use_two_decimals=self._use_two_decimals)
-                general_admin_expenses_items.append({
-                    'name': name.capitalize(),
-                    'cu': current_value_fmt,
-                    'pr': previous_value_fmt,
-                    'is_last': idx == len(general_admin_names) - 1
-                })
-
-            finance_costs_items = []
-            finance_costs_current = statement_current['FinanceCostsDetails']
-            finance_costs_previous = statement_previous['FinanceCostsDetails']
-            finance_costs_names = sorted(set(item['name'] for item in finance_costs_current + finance_costs_previous))
-            for idx, name in enumerate(finance_costs_names):
-                current_value = next((item['value'] for item in finance_costs_current if item['name'] == name), 0)
-                previous_value = next((item['value'] for item in finance_costs_previous if item['name'] == name), 0)
-                finance_costs_items.append({
-                    'name': name.capitalize(),
-                    'cu': format_number(current_value, use_two_decimals=self._use_two_decimals),
-                    'pr': format_number(previous_value, use_two_decimals=self._use_two_decimals),
-                    'is_last': idx == len(finance_costs_names) - 1
-                })
+            cost_items = comparative_rows(cost_items_current, cost_items_previous, cost_amounts, priority=COST_ITEMS_ORDER)
+            closing_inventories_curr = values_by_name(cost_items_current).get('closing inventories', 0)
+            closing_inventories_prev = values_by_name(cost_items_previous).get('closing inventories', 0)
+
+            turnover_items = comparative_rows(
+                statement_current['RevenueItemsDetails'], statement_previous['RevenueItemsDetails'], amounts())
+            other_income_items = comparative_rows(
+                statement_current['OtherIncomeDetails'], statement_previous['OtherIncomeDetails'], amounts())
+            general_admin_expenses_items = comparative_rows(
+                statement_current['GeneralAdminExpensesDetails'], statement_previous['GeneralAdminExpensesDetails'],
+                general_admin_amounts)
+            finance_costs_items = comparative_rows(
+                statement_current['FinanceCostsDetails'], statement_previous['FinanceCostsDetails'], amounts())
+            metrics.count('table_rows', sum(len(rows) for rows in (
+                non_current_assets_list, current_assets_list, current_liabilities_list, non_current_liabilities_list,
+                equity_list, cost_items, turnover_items, other_income_items, general_admin_expenses_items, finance_costs_items,
+            )))
 
             show_gross_profit = statement_current['GrossProfit'] != 0 or statement_previous['GrossProfit'] != 0
-            logger.debug(f'cost_items: {cost_items}')
+            logger.debug('cost_items: %s', cost_items)
             data = {
                 "CompanyNameInChinesePlaceholder": company_name_cn,
-                "CompanyNameInEnglishPlaceholder": self._company_name_en,
+                "CompanyNameInEnglishPlaceholder": job.company_name_en,
                 "CompanyAddressPlaceHolder": company_address_cleaned,
-                "BusinessType": self._business_type,
+                "BusinessType": job.business_type,
                 "BusinessDescriptionPlaceholder": business_description,
                 "bizAdditionalDesc": additional_business_description,
                 "LastDayOfYear": last_day_of_year,
-                "LastDayOfYearNum": self._last_day_date_num,
-                "OneYearAgo": self._one_year_ago,
-                "ExactlyOneYearAgo": self._exactly_one_year_ago,
-                "DateOfIncorporation": self._date_of_incorporation,
+                "LastDayOfYearNum": job.last_day_date_num,
+                "OneYearAgo": job.one_year_ago,
+                "ExactlyOneYearAgo": job.exactly_one_year_ago,
+                "DateOfIncorporation": job.date_of_incorporation,
                 "AuditFirmInEnglishPlacehoder": audit_firm,
                 "ApprovalDatePlaceholder": approval_date,
                 "AuditorNamePlaceholder": auditor_name,
                 "AuditorLicenseNoPlaceholder": auditor_license,
-                "CuYear": self._cu_year_for_first_year if self._first_year else str(current_year),
-                "PrYear": self._pr_year_for_first_year if self._first_year else str(previous_year),
-                "CYear": self._c_year_for_first_year, 
-                "Exceed18m": self._over18m,
+                "CuYear": job.cu_year_for_first_year if job.first_year else str(current_year),
+                "PrYear": job.pr_year_for_first_year if job.first_year else str(previous_year),
+                "CYear": job.c_year_for_first_year, 
+                "Exceed18m": job.over18m,
                 "CurrencyDesc": currency_desc,
                 "CurrencyFullDesc": currency_full_desc,
-                "Currency": self._currency,
-                "directors": self._directors_list,
+                "Currency": job.currency,
+                "directors": job.directors_list,
                 "FirstDirectorNamePlaceholder": first_director_name,
-                "BusinessType": self._business_type,
+                "BusinessType": job.business_type,
                 "RevenueName": revenue_name,
-                "RevenueCurrent": format_number(statement_current['Revenue'], use_two_decimals=self._use_two_decimals),
-                "CostSalesCurr": format_number(statement_current['CostOfSales'], is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                "CostSalesPrev": format_number(statement_previous['CostOfSales'], is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                "CostOfSalesCurrent": format_number(statement_current['CostOfSales'], is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                "GrossProfitCurrent": format_number(statement_current['GrossProfit'], use_two_decimals=self._use_two_decimals),
-                "OtherIncomeCurrent": format_number(statement_current['OtherIncome'], use_two_decimals=self._use_two_decimals),
-                "GeneralAdminExpensesCurrent": format_number(statement_current['GeneralAdminExpenses'], is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                "FinanceCostsCurrent": format_number(statement_current['FinanceCosts'], use_two_decimals=self._use_two_decimals),
-                "CalcTotalCurrent": format_number(statement_current['CalcTotal'], use_two_decimals=self._use_two_decimals),
-                "ProfitBeforeTaxCurrent": format_number(statement_current['ProfitBeforeTax'], use_two_decimals=self._use_two_decimals),
-                "TaxationCurrent": format_number(statement_current['Taxation'], use_two_decimals=self._use_two_decimals),
-                "TaxationCurrentFn": format_number(statement_current['Taxation'], is_tax=True, use_two_decimals=self._use_two_decimals),
-                "ProfitForYearCurrent": format_number(statement_current['ProfitForYear'], use_two_decimals=self._use_two_decimals),
-                "RevenuePrevious": format_number(statement_previous['Revenue'], use_two_decimals=self._use_two_decimals),
-                "CostOfSalesPrevious": format_number(statement_previous['CostOfSales'], is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                "GrossProfitPrevious": format_number(statement_previous['GrossProfit'], use_two_decimals=self._use_two_decimals),
-                "OtherIncomePrevious": format_number(statement_previous['OtherIncome'], use_two_decimals=self._use_two_decimals),
-                "GeneralAdminExpensesPrevious": format_number(statement_previous['GeneralAdminExpenses'], is_cost_or_admin=True, use_two_decimals=self._use_two_decimals),
-                "FinanceCostsPrevious": format_number(statement_previous['FinanceCosts'], use_two_decimals=self._use_two_decimals),
-                "CalcTotalPrevious": format_number(statement_previous['CalcTotal'], use_two_decimals=self._use_two_decimals),
-                "ProfitBeforeTaxPrevious": format_number(statement_previous['ProfitBeforeTax'], use_two_decimals=self._use_two_decimals),
-                "TaxationPrevious": format_number(statement_previous['Taxation'], use_two_decimals=self._use_two_decimals),
-                "TaxationPreviousFn": format_number(statement_previous['Taxation'], is_tax=True, use_two_decimals=self._use_two_decimals),
-                "ProfitForYearPrevious": format_number(statement_previous['ProfitForYear'], use_two_decimals=self._use_two_decimals),
+                "RevenueCurrent": format_number(statement_current['Revenue'], use_two_decimals=job.use_two_decimals),
+                "CostSalesCurr": format_number(statement_current['CostOfSales'], is_cost_or_admin=True, use_two_decimals=job.use_two_decimals),
+                "CostSalesPrev": format_number(statement_previous['CostOfSales'], is_cost_or_admin=True, use_two_decimals=job.use_two_decimals),
+                "CostOfSalesCurrent": format_number(statement_current['CostOfSales'], is_cost_or_admin=True, use_two_decimals=job.use_two_decimals),
+                "GrossProfitCurrent": format_number(statement_current['GrossProfit'], use_two_decimals=job.use_two_decimals),
+                "OtherIncomeCurrent": format_number(statement_current['OtherIncome'], use_two_decimals=job.use_two_decimals),
+                "GeneralAdminExpensesCurrent": format_number(statement_current['GeneralAdminExpenses'], is_cost_or_admin=True, use_two_decimals=job.use_two_decimals),
+                "FinanceCostsCurrent": format_number(statement_current['FinanceCosts'], use_two_decimals=job.use_two_decimals),
+                "CalcTotalCurrent": format_number(statement_current['CalcTotal'], use_two_decimals=job.use_two_decimals),
+                "ProfitBeforeTaxCurrent": format_number(statement_current['ProfitBeforeTax'], use_two_decimals=job.use_two_decimals),
+                "TaxationCurrent": format_number(statement_current['Taxation'], use_two_decimals=job.use_two_decimals),
+                "TaxationCurrentFn": format_number(statement_current['Taxation'], is_tax=True, use_two_decimals=job.use_two_decimals),
+                "ProfitForYearCurrent": format_number(statement_current['ProfitForYear'], use_two_decimals=job.use_two_decimals),
+                "RevenuePrevious": format_number(statement_previous['Revenue'], use_two_decimals=job.use_two_decimals),
+                "CostOfSalesPrevious": format_number(statement_previous['CostOfSales'], is_cost_or_admin=True, use_two_decimals=job.use_two_decimals),
+                "GrossProfitPrevious": format_number(statement_previous['GrossProfit'], use_two_decimals=job.use_two_decimals),
+                "OtherIncomePrevious": format_number(statement_previous['OtherIncome'], use_two_decimals=job.use_two_decimals),
+                "GeneralAdminExpensesPrevious": format_number(statement_previous['GeneralAdminExpenses'], is_cost_or_admin=True, use_two_decimals=job.use_two_decimals),
+                "FinanceCostsPrevious": format_number(statement_previous['FinanceCosts'], use_two_decimals=job.use_two_decimals),
+                "CalcTotalPrevious": format_number(statement_previous['CalcTotal'], use_two_decimals=job.use_two_decimals),
+                "ProfitBeforeTaxPrevious": format_number(statement_previous['ProfitBeforeTax'], use_two_decimals=job.use_two_decimals),
+                "TaxationPrevious": format_number(statement_previous['Taxation'], use_two_decimals=job.use_two_decimals),
+                "TaxationPreviousFn": format_number(statement_previous['Taxation'], is_tax=True, use_two_decimals=job.use_two_decimals),
+                "ProfitForYearPrevious": format_number(statement_previous['ProfitForYear'], use_two_decimals=job.use_two_decimals),
                 "PLBFTName": plbft_name,
                 "PLName": pl_name,
                 "PLNameCurr": pl_name_curr,
@@ -1491,20 +1478,20 @@ class DocumentGenerator:
                 "current_liabilities": current_liabilities_list,
                 "non_current_liabilities": non_current_liabilities_list,
                 "equity": equity_list,
-                "TotalNonCurrentAssetsCurrent": format_number(balance_current['total_non_current_assets'], use_two_decimals=self._use_two_decimals),
-                "TotalNonCurrentAssetsPrevious": format_number(balance_previous['total_non_current_assets'], use_two_decimals=self._use_two_decimals),
-                "TotalCurrentAssetsCurrent": format_number(balance_current['total_current_assets'], use_two_decimals=self._use_two_decimals),
-                "TotalCurrentAssetsPrevious": format_number(balance_previous['total_current_assets'], use_two_decimals=self._use_two_decimals),
-                "TotalCurrentLiabilitiesCurrent": format_number(balance_current['total_current_liabilities'], is_liability=True, use_two_decimals=self._use_two_decimals),
-                "TotalCurrentLiabilitiesPrevious": format_number(balance_previous['total_current_liabilities'], is_liability=True, use_two_decimals=self._use_two_decimals),
-                "TotalNonCurrentLiabilitiesCurrent": format_number(balance_current['total_non_current_liabilities'], is_liability=True, use_two_decimals=self._use_two_decimals),
-                "TotalNonCurrentLiabilitiesPrevious": format_number(balance_previous['total_non_current_liabilities'], is_liability=True, use_two_decimals=self._use_two_decimals),
-                "NetAssetsCurrent": format_number(balance_current['net_assets'], use_two_decimals=self._use_two_decimals),
-                "NetAssetsPrevious": format_number(balance_previous['net_assets'], use_two_decimals=self._use_two_decimals),
-                "TotalEquityCurrent": format_number(total_equity_current, use_two_decimals=self._use_two_decimals), #format_number(balance_current['total_equity'] + re_curr_num),
-                "TotalEquityPrevious": format_number(total_equity_previous, use_two_decimals=self._use_two_decimals), #format_number(balance_previous['total_equity'] + re_prev_num),
-                "ProfitCurrent": format_number(profit_current, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals),
-                "EquityCurrent": format_number(equity_current, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals),
+                "TotalNonCurrentAssetsCurrent": format_number(balance_current['total_non_current_assets'], use_two_decimals=job.use_two_decimals),
+                "TotalNonCurrentAssetsPrevious": format_number(balance_previous['total_non_current_assets'], use_two_decimals=job.use_two_decimals),
+                "TotalCurrentAssetsCurrent": format_number(balance_current['total_current_assets'], use_two_decimals=job.use_two_decimals),
+                "TotalCurrentAssetsPrevious": format_number(balance_previous['total_current_assets'], use_two_decimals=job.use_two_decimals),
+                "TotalCurrentLiabilitiesCurrent": format_number(balance_current['total_current_liabilities'], is_liability=True, use_two_decimals=job.use_two_decimals),
+                "TotalCurrentLiabilitiesPrevious": format_number(balance_previous['total_current_liabilities'], is_liability=True, use_two_decimals=job.use_two_decimals),
+                "TotalNonCurrentLiabilitiesCurrent": format_number(balance_current['total_non_current_liabilities'], is_liability=True, use_two_decimals=job.use_two_decimals),
+                "TotalNonCurrentLiabilitiesPrevious": format_number(balance_previous['total_non_current_liabilities'], is_liability=True, use_two_decimals=job.use_two_decimals),
+                "NetAssetsCurrent": format_number(balance_current['net_assets'], use_two_decimals=job.use_two_decimals),
+                "NetAssetsPrevious": format_number(balance_previous['net_assets'], use_two_decimals=job.use_two_decimals),
+                "TotalEquityCurrent": format_number(total_equity_current, use_two_decimals=job.use_two_decimals), #format_number(balance_current['total_equity'] + re_curr_num),
+                "TotalEquityPrevious": format_number(total_equity_previous, use_two_decimals=job.use_two_decimals), #format_number(balance_previous['total_equity'] + re_prev_num),
+                "ProfitCurrent": format_number(profit_current, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals),
+                "EquityCurrent": format_number(equity_current, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals),
                 "NetAssetsName": net_assets_name,
                 "turnover_items": turnover_items,
                 "cost_items": cost_items,
@@ -1532,16 +1519,16 @@ class DocumentGenerator:
                 "SharesCurr": shares_curr_formatted,
                 "SharesPrev": shares_prev_formatted,
                 "SharesGap": shares_gap_formatted,
-                "SharesCapCurr": format_number(shares_cap_curr, use_two_decimals=self._use_two_decimals),
-                "SharesCapPrev": format_number(shares_cap_prev, use_two_decimals=self._use_two_decimals),
-                "SharesCapGap": format_number(shares_cap_gap, use_two_decimals=self._use_two_decimals),
+                "SharesCapCurr": format_number(shares_cap_curr, use_two_decimals=job.use_two_decimals),
+                "SharesCapPrev": format_number(shares_cap_prev, use_two_decimals=job.use_two_decimals),
+                "SharesCapGap": format_number(shares_cap_gap, use_two_decimals=job.use_two_decimals),
                 "CapResCurr": cap_res_curr,
                 "CapResPrev": cap_res_prev,
-                "CapResGap": format_number(cap_res_gap, use_two_decimals=self._use_two_decimals),
+                "CapResGap": format_number(cap_res_gap, use_two_decimals=job.use_two_decimals),
                 "RECurr": re_curr,
                 "REPrev": re_prev,
-                "RETotal": format_number(re_total, use_two_decimals=self._use_two_decimals),
-                "RETotal2": format_number(re_total2, use_two_decimals=self._use_two_decimals),
+                "RETotal": format_number(re_total, use_two_decimals=job.use_two_decimals),
+                "RETotal2": format_number(re_total2, use_two_decimals=job.use_two_decimals),
                 "REName": re_name,
                 "RENameFn": re_name_fn,
                 "HasNameChanged": has_name_changed,
@@ -1602,15 +1589,15 @@ class DocumentGenerator:
                 "DueShareholderCurr": due_shareholder_info['curr'],
                 "DueShareholderPrev": due_shareholder_info['prev'], #due_shareholder_prev,
                 "DueShareholderMax": due_shareholder_info['max'], #due_shareholder_max,
-                "DividendCurr": format_number(dividend_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals) if dividend_curr != 0 else "-",
-                "DividendPrev": format_number(dividend_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=self._use_two_decimals) if dividend_prev != 0 else "-",
+                "DividendCurr": format_number(dividend_curr, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals) if dividend_curr != 0 else "-",
+                "DividendPrev": format_number(dividend_prev, is_cost_or_admin=False, is_liability=False, use_two_decimals=job.use_two_decimals) if dividend_prev != 0 else "-",
                 "InvestmentInCompany": investment_in_company,
                 "InvestmentInSecurity": investment_in_security,
                 "Opinion": audit_opinion,
-                "LongTermInvestmentCurr": format_number(long_term_investments_curr, use_two_decimals=self._use_two_decimals),
-                "LongTermInvestmentPrev": format_number(long_term_investments_prev, use_two_decimals=self._use_two_decimals),
-                "CurrentInvestmentCurr": format_number(current_investment_curr, use_two_decimals=self._use_two_decimals),
-                "CurrentInvestmentPrev": format_number(current_investment_prev, use_two_decimals=self._use_two_decimals),
+                "LongTermInvestmentCurr": format_number(long_term_investments_curr, use_two_decimals=job.use_two_decimals),
+                "LongTermInvestmentPrev": format_number(long_term_investments_prev, use_two_decimals=job.use_two_decimals),
+                "CurrentInvestmentCurr": format_number(current_investment_curr, use_two_decimals=job.use_two_decimals),
+                "CurrentInvestmentPrev": format_number(current_investment_prev, use_two_decimals=job.use_two_decimals),
                 "HasDueFromUltimateHoldingCompany": due_ultimate_holding_company_info['need_footnote'],
                 "HasDueToUltimateHoldingCompany2": due_ultimate_holding_company_info['both_to'],
                 "DueFromUltimateHoldingCompanyName": due_ultimate_holding_company_info['title_name'],
@@ -1626,12 +1613,12 @@ class DocumentGenerator:
                 "DueHoldingCompanyMax": due_holding_company_info['max'],
             }
 
-            logger.debug(f"SubsidiaryName: {data['SubsidiaryName']}")
+            logger.debug("SubsidiaryName: %s", data['SubsidiaryName'])
             excluded_fields = [
                 "DueFromShareHolderName", "CompanyNameInChinesePlaceholder", "bizAdditionalDesc",
                 "DueFinalParentName", "DueImmeParentName", "DueFromShareHolderName", "SubsidiaryName", "ApprovalDatePlaceholder"
             ]
-            if not self._first_year:
+            if not job.first_year:
                 excluded_fields.extend(["DateOfIncorporation", "CYear"])
             if not has_name_changed:
                 excluded_fields.extend(["PassedDate", "NewCompanyName", "OldCompanyName", "EffectiveDate"])
@@ -1649,7 +1636,7 @@ class DocumentGenerator:
                 if key not in excluded_fields and isinstance(value, str) and not value.strip():
                     logger.error(f"Please fill in all fields: {key}")
                     return None, f"Error: Please fill in all fields: {key}"
-            if not self._directors_list:
+            if not job.directors_list:
                 logger.error("Please provide at least one director name")
                 return None, "Error: Please provide at least one director name."
             if has_long_term_investments:
@@ -1660,83 +1647,32 @@ class DocumentGenerator:
             final_output_path = output_path if output_path else "audit_report_filled.docx"
             logger.info(f"Will save output to: {final_output_path}")
 
-            logger.info("Rendering template")
-            template.render(data)
-            logger.info("Rendering template completed")
-            template.save(final_output_path)
+            with self._stage(progress, STAGE_RENDERING, metrics):
+                logger.info("Rendering template")
+                metrics.count('context_fields', len(data))
+                template.render(data)
+                logger.info("Rendering template completed")
 
-            doc = Document(final_output_path)
+            # Post-process the rendered document in memory so the package is written only once
+            doc = template.docx
             #insert_page_break_before_income_statement(doc)
 
-            for table in doc.tables:
-                for row in table.rows:
-                    row.height = None
-                    for cell in row.cells:
-                        cell_text = "".join(p.text for p in cell.paragraphs).strip()
-                        has_underline = '[[UNDERLINE]]' in cell_text
-                        has_dbline = '[[DBLine]]' in cell_text
-
-                        # Log cell text for debugging
-                        logger.debug(f"Processing cell with text: '{cell_text}', has_dbline: {has_dbline}, has_underline: {has_underline}")
-
-                        # Remove [[DBLine]] and [[UNDERLINE]] from all paragraphs and runs
-                        for paragraph in cell.paragraphs:
-                            for run in paragraph.runs:
-                                if '[[DBLine]]' in run.text or '[[UNDERLINE]]' in run.text:
-                                    run.font.size = Pt(11)
-                                    run.text = run.text.replace('[[DBLine]]', '').replace('[[UNDERLINE]]', '')
-                                    logger.debug(f"Removed placeholders from run: '{run.text}'")
-
-                            # Re-check paragraph text after run replacements
-                            paragraph_text = paragraph.text
-                            if '[[DBLine]]' in paragraph_text or '[[UNDERLINE]]' in paragraph_text:
-                                #run.font.size = Pt(11)
-                                clean_text = paragraph_text.replace('[[DBLine]]', '').replace('[[UNDERLINE]]', '')
-                                #clean_text.font.size = Pt(11)
-                                # Clear all runs
-                                while paragraph.runs:
-                                    paragraph.runs[0]._element.getparent().remove(paragraph.runs[0]._element)
-                                # Add cleaned text as a new run
-                                paragraph.add_run(clean_text)
-                                logger.debug(f"Replaced paragraph text with: '{clean_text}'")
-
-                            paragraph.space_before = 0
-                            paragraph.space_after = 0
-                            paragraph.style.paragraph_format.line_spacing = 1.0
-
-                        # Apply borders if needed
-                        if has_dbline or has_underline:
-                            tc = cell._element
-                            tcPr = tc.get_or_add_tcPr()
-                            # Remove existing borders
-                            existing_borders = tcPr.xpath('./w:tcBorders')
-                            if existing_borders:
-                                tcPr.remove(existing_borders[0])
-                            # Add new borders
-                            tcBorders = OxmlElement('w:tcBorders')
-                            bottom = OxmlElement('w:bottom')
-                            if has_dbline:
-                                bottom.set(qn('w:val'), 'double')
-                                bottom.set(qn('w:sz'), '8')  # Size in eighths of a point
-                                logger.debug("Applying double bottom border")
-                            elif has_underline:
-                                bottom.set(qn('w:val'), 'single')
-                                bottom.set(qn('w:sz'), '4')
-                                logger.debug("Applying single bottom border")
-                            bottom.set(qn('w:space'), '0')
-                            bottom.set(qn('w:color'), '000000')
-                            tcBorders.append(bottom)
-                            tcPr.append(tcBorders)
-
-            logger.info("Before update_fields")
-            update_fields(doc)
-            logger.info("Before final save")
-            doc.save(final_output_path)
-            logger.info("Document saved successfully")
-            if self._inventories_curr != self._closing_inventories_curr or self._inventories_prev != self._closing_inventories_prev:
-                warning = f"inventories mismatch:\n, inventories_curr: {self._inventories_curr}, inventories_prev: {self._inventories_prev}\n closing_inventories_curr: {self._closing_inventories_curr}, closing_inventories_prev: {self._closing_inventories_prev}"
+            with self._stage(progress, STAGE_POST_PROCESSING, metrics):
+                metrics.count('cells_touched', apply_border_placeholders(doc))
+                logger.info("Before update_fields")
+                update_fields(doc)
+
+            with self._stage(progress, STAGE_SAVING, metrics):
+                logger.info("Before final save")
+                template.save(final_output_path)
+                logger.info("Document saved successfully")
+            if job.inventories_curr != closing_inventories_curr or job.inventories_prev != closing_inventories_prev:
+                warning = f"inventories mismatch:\n, inventories_curr: {job.inventories_curr}, inventories_prev: {job.inventories_prev}\n closing_inventories_curr: {closing_inventories_curr}, closing_inventories_prev: {closing_inventories_prev}"
                 return True, warning
             return True, ""
+        except GenerationCancelledError:
+            logger.info("Document generation cancelled")
+            raise
         except InvalidTBSheetFormatError as e:
             logger.error(f"Invalid trial balance sheet format: {str(e)}")
             return None, str(e)
@@ -1764,4 +1700,65 @@ class DocumentGenerator:
             return None, str(e)
         except Exception as e:
             logger.exception(f"Unexpected error during document generation: {str(e)}")
-            return None, str(e)
\ No newline at end of file
+            return None, str(e)
+
+    def generate_all(self, fields, aux_fields, parallel=False, progress=None, force=False):
+        """Generate the main and aux reports of a company from one ReportContext.
+
+        fields are generate_document's arguments and aux_fields generate_aux_document's; the TB, year and
+        date arguments (REPORT_CONTEXT_ARGS) are taken from fields for both. Reports found in the ReportCache
+        are copied first (unless force is True); the TB is loaded and categorized only if a report is missing,
+        then the missing reports are rendered, in parallel threads when parallel is True. Rendering mostly
+        holds the GIL, so threads rarely help much on CPython.
+        Returns the (main, aux) GenerationResults; the main report's metrics include the context building.
+        Errors are returned as (None, message) results, like generate_document returns them. fields and
+        aux_fields must not hold the arguments generate_all passes itself (GENERATE_ALL_RESERVED).
+        """
+        for name, arguments in (('fields', fields), ('aux_fields', aux_fields)):
+            reserved = [field for field in GENERATE_ALL_RESERVED if field in arguments]
+            if reserved:
+                raise ValueError(f"generate_all sets {', '.join(reserved)} itself; remove them from {name}")
+
+        shared = {name: fields[name] for name in REPORT_CONTEXT_ARGS if name in fields}
+        aux_fields = dict(aux_fields, **shared)
+        result = self._cached_result(self.generate_document, 'output_path', dict(fields, force=force))
+        aux_result = self._cached_result(self.generate_aux_document, 'aux_output_path', dict(aux_fields, force=force))
+        if result is not None and aux_result is not None:
+            return result, aux_result
+
+        metrics = RunMetrics()
+        try:
+            context = self.build_report_context(
+                shared.get('last_day_of_year'), shared.get('excel_file'), shared.get('first_year', False),
+                shared.get('current_year'), shared.get('date_of_incorporation'), progress, metrics
+            )
+        except GenerationCancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Failed to load the trial balance: {str(e)}")
+            return GenerationResult(None, str(e), metrics.finish()), GenerationResult(None, str(e), RunMetrics().finish())
+
+        if not parallel or result is not None or aux_result is not None:
+            if result is None:
+                result = self.generate_document(context=context, progress=progress, metrics=metrics, force=force, **fields)
+            if aux_result is None:
+                aux_result = self._generate_aux_with_context(context, progress, aux_fields, force)
+            return result, aux_result
+
+        progress = _monotonic_progress(progress)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='aux-report') as executor:
+            aux_future = executor.submit(self._generate_aux_with_context, context, progress, aux_fields, force)
+            result = self.generate_document(context=context, progress=progress, metrics=metrics, force=force, **fields)
+            aux_result = aux_future.result()
+        return result, aux_result
+
+    def _generate_aux_with_context(self, context, progress, aux_fields, force=False):
+        """Run generate_aux_document for generate_all, returning its errors as a (None, message) result."""
+        metrics = RunMetrics()
+        try:
+            return self.generate_aux_document(context=context, progress=progress, metrics=metrics, force=force, **aux_fields)
+        except GenerationCancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Failed to generate aux document: {str(e)}")
+            return GenerationResult(None, str(e), metrics.finish())
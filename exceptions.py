@@ -12,4 +12,12 @@ class InvalidItemNameError(Exception):
 
 # Custom exception for net assets and total equity mismatch
 class NetAssetsEquityMismatchError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+# Custom exception for TB sheets missing from the Excel file
+class MissingTBSheetError(ValueError):
+    pass
+
+# Custom exception for a report generation cancelled by the user
+class GenerationCancelledError(Exception):
+    pass
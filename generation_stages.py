@@ -0,0 +1,11 @@
+# Stages passed to the progress callback of DocumentGenerator.generate_document/generate_aux_document, in order.
+# Kept apart from document_generator so the GUI can use them without importing the heavy report modules.
+STAGE_LOADING_TB = "Loading trial balance"
+STAGE_CATEGORIZING = "Categorizing"
+STAGE_BUILDING_CONTEXT = "Building report data"
+STAGE_RENDERING = "Rendering"
+STAGE_POST_PROCESSING = "Post-processing"
+STAGE_SAVING = "Saving"
+GENERATION_STAGES = (
+    STAGE_LOADING_TB, STAGE_CATEGORIZING, STAGE_BUILDING_CONTEXT, STAGE_RENDERING, STAGE_POST_PROCESSING, STAGE_SAVING,
+)
@@ -1,9 +1,11 @@
 import json
+from category_index import CategoryIndex
 from .gui_utils import load_categories
 
 class CategoryManager:
     def __init__(self, config_file='categories.json'):
         self.config_file = config_file
+        self._index = None
         self.categories = self.load_default_categories()
         self.load_from_file()
 
@@ -105,12 +107,14 @@ class CategoryManager:
         # Ensure closing_inventories is a list
         if isinstance(self.categories['closing_inventories'], str):
             self.categories['closing_inventories'] = [self.categories['closing_inventories']]
+        self._index = None
 
     def add_item(self, category, item):
         """Add an item to a category."""
         if item in self.categories[category]:
             raise ValueError("Item already exists in this category")
         self.categories[category].append(item.lower())
+        self._index = None
 
     def modify_item(self, category, old_item, new_item):
         """Modify an existing item in a category."""
@@ -119,18 +123,26 @@ class CategoryManager:
             raise ValueError("New item name already exists in this category")
         index = items.index(old_item)
         items[index] = new_item.lower()
+        self._index = None
 
     def delete_item(self, category, item):
         """Delete an item from a category."""
         self.categories[category].remove(item)
         if category == 'closing_inventories' and not self.categories[category]:
             self.categories[category] = ['Closing inventories']
+        self._index = None
 
     def save(self):
         """Save categories to JSON file."""
         with open(self.config_file, 'w') as f:
             json.dump(self.categories, f, indent=4)
 
+    def get_index(self):
+        """Return the CategoryIndex for the current categories, rebuilding it after any change."""
+        if self._index is None:
+            self._index = CategoryIndex(self.categories)
+        return self._index
+
     def get_categories(self):
         """Return the categories dictionary."""
         return self.categories
\ No newline at end of file
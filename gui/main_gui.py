@@ -1,45 +1,47 @@
 import os
 import sys
 import time
+import queue
 import logging
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import datetime
 # import pandas as pd  # Moved to generate_aux_report and generate_report
 # import xml.sax.saxutils as saxutils  # Uncomment if needed for escaping
 
-# Setup file-based logging
+logger = logging.getLogger(__name__)
 start_time = time.time()
-log_file = os.path.join(os.path.dirname(sys.executable), "startup_log.txt") if hasattr(sys, 'frozen') else "startup_log.txt"
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-logging.info(f"Start imports: {start_time:.3f} seconds")
+logger.info(f"Start imports: {start_time:.3f} seconds")
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from document_generator import DocumentGenerator
 from exceptions import *
+from generation_stages import GENERATION_STAGES
+from lazy_import import BackgroundImport
+from tb_cache import TBCache
+from report_cache import ReportCache
+from tb_sheets import list_tb_sheets
 from .category_manager import CategoryManager
 from .tabs.general_tab import GeneralTab
 from .tabs.company_tab import CompanyTab
 # from .tabs.audit_tab import AuditTab
 # from .tabs.files_tab import FilesTab
 
-logging.info(f"Finished imports: {time.time() - start_time:.3f} seconds")
+logger.info(f"Finished imports: {time.time() - start_time:.3f} seconds")
+
+# How often the Tk thread checks the generation worker for progress, in milliseconds
+WORKER_POLL_MS = 100
 
 class AuditReportGUI(tk.Tk):
     def __init__(self):
         init_start = time.time()
-        logging.info(f"Start AuditReportGUI.__init__: {init_start - start_time:.3f} seconds")
+        logger.info(f"Start AuditReportGUI.__init__: {init_start - start_time:.3f} seconds")
 
         super().__init__()
         self.title("深圳好景商务公司 * Audit Report Generator")
         self.geometry("1024x900")
 
-        logging.info(f"Window setup: {time.time() - init_start:.3f} seconds")
+        logger.info(f"Window setup: {time.time() - init_start:.3f} seconds")
 
         # Default values
         self.current_year = datetime.datetime.now().year - 1
@@ -88,10 +90,11 @@ class AuditReportGUI(tk.Tk):
         self.first_year = tk.BooleanVar(value=False)
 
         self.excel_file_path = tk.StringVar()
+        self.excel_file_path.trace_add("write", self.on_excel_file_change)
         self.output_file_path = tk.StringVar(value=os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_report_filled.docx"))
         self.output_aux_file_path = tk.StringVar(value=os.path.join(os.path.dirname(os.path.abspath(__file__)), "aux_report_filled.docx"))
 
-        logging.info(f"Variables setup: {time.time() - init_start:.3f} seconds")
+        logger.info(f"Variables setup: {time.time() - init_start:.3f} seconds")
 
         # Optimize notebook style
         style = ttk.Style()
@@ -106,12 +109,14 @@ class AuditReportGUI(tk.Tk):
         self.notebook.add(self.general_frame, text="General")
         self.notebook.add(self.company_frame, text="Company Info")
 
-        logging.info(f"Notebook setup: {time.time() - init_start:.3f} seconds")
+        logger.info(f"Notebook setup: {time.time() - init_start:.3f} seconds")
 
-        GeneralTab(self.general_frame, self)
-        CompanyTab(self.company_frame, self)
+        # Only the first tab is built now; the others are built the first time they are shown
+        self._pending_tabs = {str(self.general_frame): GeneralTab, str(self.company_frame): CompanyTab}
+        self.build_tab(str(self.general_frame))
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
-        logging.info(f"Tab creation: {time.time() - init_start:.3f} seconds")
+        logger.info(f"Tab creation: {time.time() - init_start:.3f} seconds")
 
         """
         # Setup tabs with slight delay to ensure event loop readiness
@@ -153,22 +158,53 @@ class AuditReportGUI(tk.Tk):
         self.generate_aux_btn = ttk.Button(self.buttons_frame, text="Generate Aux Report", command=self.generate_aux_report)
         self.generate_aux_btn.pack(side='right', padx=5)
 
+        self.generate_both_btn = ttk.Button(self.buttons_frame, text="Generate Both", command=self.generate_both_reports)
+        self.generate_both_btn.pack(side='right', padx=5)
+
+        self.cancel_btn = ttk.Button(self.buttons_frame, text="Cancel", command=self.cancel_generation, state='disabled')
+        self.cancel_btn.pack(side='right', padx=5)
+
+        self.progress_bar = ttk.Progressbar(self.buttons_frame, mode='determinate', maximum=len(GENERATION_STAGES), length=200)
+        self.progress_bar.pack(side='left', padx=5)
+        self._cancel_event = None
+
         self.status_label = ttk.Label(self, text="Ready")
         self.status_label.pack(side='bottom', fill='x', padx=10, pady=5)
 
-        logging.info(f"Buttons and status setup: {time.time() - init_start:.3f} seconds")
+        logger.info(f"Buttons and status setup: {time.time() - init_start:.3f} seconds")
 
         # Initialize category manager
         self.category_manager = CategoryManager()
-        logging.info(f"CategoryManager init: {time.time() - init_start:.3f} seconds")
+        logger.info(f"CategoryManager init: {time.time() - init_start:.3f} seconds")
+
+        # pandas, docxtpl and python-docx load in the background once the window is up, see document_generator
+        self._generator_module = BackgroundImport('document_generator')
+        self._document_generator = None
+        self._generator_lock = threading.Lock()
 
-        self._document_generator = DocumentGenerator(self.category_manager)
-        logging.info(f"DocumentGenerator init: {time.time() - init_start:.3f} seconds")
+        # Compile the selected auditor's templates in the background, again whenever the auditor changes
+        self.after_idle(self.warm_up_templates)
+        self.audit_type.trace_add("write", self.warm_up_templates)
 
         self.load_categories()
-        logging.info(f"load_categories: {time.time() - init_start:.3f} seconds")
+        logger.info(f"load_categories: {time.time() - init_start:.3f} seconds")
+
+        logger.info(f"Finished AuditReportGUI.__init__: {time.time() - init_start:.3f} seconds")
+        self.after_idle(lambda: logger.info(f"Interactive: {time.time() - start_time:.3f} seconds after start"))
 
-        logging.info(f"Finished AuditReportGUI.__init__: {time.time() - init_start:.3f} seconds")
+    def build_tab(self, frame_name):
+        """Build a notebook tab's widgets if they have not been built yet, logging the time and widget count."""
+        tab_class = self._pending_tabs.pop(frame_name, None)
+        if tab_class is None:
+            return
+        tab_start = time.time()
+        frame = self.nametowidget(frame_name)
+        tab_class(frame, self)
+        logger.info(f"{tab_class.__name__} creation: {time.time() - tab_start:.3f} seconds, "
+                     f"{self._count_widgets_recursive(frame)} widgets")
+
+    def on_tab_changed(self, event):
+        self.build_tab(self.notebook.select())
 
     def _count_widgets_recursive(self, widget):
         """Recursively count all widgets in the widget tree."""
@@ -177,6 +213,22 @@ class AuditReportGUI(tk.Tk):
             count += self._count_widgets_recursive(child)
         return count
 
+    def get_document_generator(self):
+        """Return the DocumentGenerator, waiting for its modules to finish importing. Safe to call from any thread."""
+        with self._generator_lock:
+            if self._document_generator is None:
+                document_generator = self._generator_module.get()
+                self._document_generator = document_generator.DocumentGenerator(
+                    self.category_manager, tb_cache=TBCache(), report_cache=ReportCache())
+                logger.info(f"DocumentGenerator ready: {time.time() - start_time:.3f} seconds after start")
+            return self._document_generator
+
+    def warm_up_templates(self, *args):
+        audit_type = self.audit_type.get()
+        threading.Thread(
+            target=lambda: self.get_document_generator().warm_up_templates(audit_type), daemon=True
+        ).start()
+
     def load_categories(self):
         self.non_current_assets = self.category_manager.categories['non_current_assets']
         self.current_assets = self.category_manager.categories['current_assets']
@@ -287,6 +339,45 @@ class AuditReportGUI(tk.Tk):
         except ValueError:
             pass
 
+    def on_excel_file_change(self, *args):
+        """List the TB sheets of the chosen workbook and switch to its latest year if the current one has no sheet."""
+        file_path = self.excel_file_path.get()
+        if not os.path.isfile(file_path):
+            return
+        try:
+            years = list_tb_sheets(file_path)
+        except (OSError, ValueError) as e:
+            logger.info(f"Could not list the TB sheets of {file_path}: {str(e)}")
+            return
+        if not years:
+            self.status_label.config(text="Warning: The selected file has no TB sheets (e.g. 2024TB)")
+            return
+        self.status_label.config(text=f"TB sheets found: {', '.join(f'{year}TB' for year in years)}")
+        try:
+            if int(self.year_var.get()) in years:
+                return
+        except ValueError:
+            pass
+        self.year_var.set(str(years[-1]))
+
+    def check_tb_sheets(self, excel_file, current_year):
+        """Show an error and return False if the workbook lacks a TB sheet the report needs."""
+        try:
+            years = list_tb_sheets(excel_file)
+        except (OSError, ValueError):
+            return True  # Not an .xlsx workbook; DataLoader reports any problem
+        required = [current_year] if self.first_year.get() else [current_year, current_year - 1]
+        missing = [f"{year}TB" for year in required if year not in years]
+        if missing:
+            available = ', '.join(f"{year}TB" for year in years) or "none"
+            self.show_error(
+                f"The Excel file does not contain the required sheet(s): {', '.join(missing)}.\n"
+                f"TB sheets in the file: {available}.",
+                "Error: Missing required sheets"
+            )
+            return False
+        return True
+
     def update_directors(self, event=None):
         self.directors.set(self.directors_text.get('1.0', 'end-1c'))
 
@@ -342,101 +433,184 @@ class AuditReportGUI(tk.Tk):
         from .manage_categories_dialog import ManageCategoriesDialog
         ManageCategoriesDialog(self)
 
+    def _set_generating(self, generating):
+        state = 'disabled' if generating else 'normal'
+        self.generate_btn.config(state=state)
+        self.generate_aux_btn.config(state=state)
+        self.generate_both_btn.config(state=state)
+        self.cancel_btn.config(state='normal' if generating else 'disabled')
+        self.progress_bar['value'] = 0
+
+    def _run_in_background(self, work, on_done, on_error):
+        """Run work(progress) on a worker thread, then on_done(result) or on_error(exception) on the Tk thread."""
+        cancel_event = threading.Event()
+        events = queue.Queue()
+        self._cancel_event = cancel_event
+        self._set_generating(True)
+
+        def progress(stage):
+            if cancel_event.is_set():
+                raise GenerationCancelledError("Report generation cancelled.")
+            events.put(('stage', stage))
+
+        def run():
+            try:
+                events.put(('done', work(progress)))
+            except Exception as e:
+                events.put(('error', e))
+
+        threading.Thread(target=run, daemon=True).start()
+        self.after(WORKER_POLL_MS, self._poll_worker, events, on_done, on_error)
+
+    def _poll_worker(self, events, on_done, on_error):
+        while True:
+            try:
+                kind, value = events.get_nowait()
+            except queue.Empty:
+                self.after(WORKER_POLL_MS, self._poll_worker, events, on_done, on_error)
+                return
+            if kind == 'stage':
+                if value in GENERATION_STAGES:
+                    self.progress_bar['value'] = GENERATION_STAGES.index(value) + 1
+                if not self._cancel_event.is_set():
+                    self.status_label.config(text=f"{value}... Please wait.")
+                continue
+
+            self._set_generating(False)
+            self._cancel_event = None
+            if kind == 'done':
+                on_done(value)
+            elif isinstance(value, GenerationCancelledError):
+                self.status_label.config(text="Report generation cancelled")
+            else:
+                on_error(value)
+            return
+
+    def cancel_generation(self):
+        """Ask the running generation to stop before its next stage."""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.cancel_btn.config(state='disabled')
+            self.status_label.config(text="Cancelling...")
+
     def generate_aux_report(self):
+        kwargs = self._aux_report_kwargs()
+        if kwargs is None:
+            return
+
+        self.status_label.config(text="Generating report... Please wait.")
+        output_aux_file_path = kwargs['aux_output_path']
+        self._run_in_background(
+            lambda progress: self.get_document_generator().generate_aux_document(progress=progress, **kwargs),
+            lambda outcome: self._aux_report_done(outcome, output_aux_file_path),
+            self._aux_report_failed,
+        )
+
+    def _aux_report_kwargs(self):
+        """Validate the form for the aux report and return generate_aux_document's arguments, or None."""
         if not self.excel_file_path.get():
             self.show_error("Please select a Trial Balance Excel file", "Error: No Excel file selected")
-            return
+            return None
 
         if not self.output_aux_file_path.get():
             self.show_error("Please specify an output aux file path", "Error: No output aux path specified")
-            return
+            return None
 
         # Validate shareholders
         shareholders = self.shareholders.get().splitlines()
         shareholders_list = [s.strip() for s in shareholders if s.strip()]
         if not shareholders_list:
             self.show_error("Shareholders list is empty after cleaning")
-            return
+            return None
 
         try:
             self.current_year = int(self.year_var.get())
         except ValueError:
             self.show_error("Current year must be a valid integer.", "Error: Invalid current year")
-            return
+            return None
 
-        import pandas as pd
-        excel = pd.ExcelFile(self.excel_file_path.get())
-        sheet_names = excel.sheet_names
-        self.previous_year = self.current_year - 1
-        self.current_sheet = f"{self.current_year}TB"
-        self.previous_sheet = f"{self.previous_year}TB"
-
-        missing_sheets = []
-        if self.current_sheet not in sheet_names:
-            missing_sheets.append(self.current_sheet)
-        if not self.first_year.get() and self.previous_sheet not in sheet_names:
-            missing_sheets.append(self.previous_sheet)
-
-        if missing_sheets:
-            error_msg = f"The Excel file does not contain the required sheet(s): {', '.join(missing_sheets)}.\n"
-            error_msg += f"The Excel file contains the following sheets: {', '.join(sheet_names)}."
-            messagebox.showerror("Sheet Not Found", error_msg)
-            raise ValueError(f"Required sheets not found: {error_msg}")
-
-        self.status_label.config(text="Generating report... Please wait.")
-        self.update()
+        if not self.check_tb_sheets(self.excel_file_path.get(), self.current_year):
+            return None
 
         output_aux_file_path = self.output_aux_file_path.get()
         print(f"Output aux path from GUI: {output_aux_file_path}")
 
-        try:
-            result, error_message = self._document_generator.generate_aux_document(
-                last_day_of_year=self.last_day_of_year.get(),
-                date_of_incorporation=self.date_of_incorporation.get(),
-                first_year=self.first_year.get(),
-                business_type=self.business_type.get(),
-                aux_output_path=output_aux_file_path,
-                company_name_en=self.company_name_en.get(),
-                company_name_cn=self.company_name_cn.get(),
-                directors=self.directors.get().splitlines(),
-                shareholders=shareholders_list,
-                currency=self.currency.get(),
-                has_stocking_letter=False,
-                br_no=self.br_no.get(),
-                excel_file=self.excel_file_path.get(),
-                current_year=self.current_year,
-                audit_type=self.audit_type.get(),
-            )
+        # Read every Tk variable here; the worker thread must not touch them
+        return dict(
+            last_day_of_year=self.last_day_of_year.get(),
+            date_of_incorporation=self.date_of_incorporation.get(),
+            first_year=self.first_year.get(),
+            business_type=self.business_type.get(),
+            aux_output_path=output_aux_file_path,
+            company_name_en=self.company_name_en.get(),
+            company_name_cn=self.company_name_cn.get(),
+            directors=self.directors.get().splitlines(),
+            shareholders=shareholders_list,
+            currency=self.currency.get(),
+            has_stocking_letter=False,
+            br_no=self.br_no.get(),
+            excel_file=self.excel_file_path.get(),
+            current_year=self.current_year,
+            audit_type=self.audit_type.get(),
+        )
 
-            if result is None:
-                self.status_label.config(text=error_message)
-                messagebox.showwarning("Warning", error_message)
-                return
+    def _aux_report_done(self, outcome, output_aux_file_path):
+        result, error_message = outcome
+        logger.info(f"Run metrics: {outcome.metrics.to_json()}")
+        if result is None:
+            self.status_label.config(text=error_message)
+            messagebox.showwarning("Warning", error_message)
+            return
 
-            if not os.path.exists(output_aux_file_path):
-                self.show_error(f"Generated file not found at {output_aux_file_path}", "Error: Generated file not found")
-                return
+        if not os.path.exists(output_aux_file_path):
+            self.show_error(f"Generated file not found at {output_aux_file_path}", "Error: Generated file not found")
+            return
 
-            self.status_label.config(text=f"Report generated successfully: {output_aux_file_path}")
+        self.status_label.config(text=f"Report generated successfully: {output_aux_file_path}")
 
-            if messagebox.askyesno("Success", f"Report generated successfully at {output_aux_file_path}. Would you like to open it now?"):
-                if sys.platform == 'darwin':
-                    os.system(f"open '{output_aux_file_path}'")
-                elif sys.platform == 'win32':
-                    os.system(f'start "" "{output_aux_file_path}"')
-                else:
-                    os.system(f"xdg-open '{output_aux_file_path}'")
+        if messagebox.askyesno("Success", f"Report generated successfully at {output_aux_file_path}. Would you like to open it now?"):
+            self._open_document(output_aux_file_path)
+
+    def _open_document(self, path):
+        if sys.platform == 'darwin':
+            os.system(f"open '{path}'")
+        elif sys.platform == 'win32':
+            os.system(f'start "" "{path}"')
+        else:
+            os.system(f"xdg-open '{path}'")
+
+    def _aux_report_failed(self, error):
+        try:
+            raise error
+        except MissingTBSheetError as e:
+            self.status_label.config(text="Error: Missing required sheets")
+            messagebox.showerror("Sheet Not Found", str(e))
+            return
         except Exception as e:
             raise e
 
     def generate_report(self):
+        kwargs = self._report_kwargs()
+        if kwargs is None:
+            return
+
+        self.status_label.config(text="Generating report... Please wait.")
+        output_path = kwargs['output_path']
+        self._run_in_background(
+            lambda progress: self.get_document_generator().generate_document(progress=progress, **kwargs),
+            lambda outcome: self._report_done(outcome, output_path),
+            self._report_failed,
+        )
+
+    def _report_kwargs(self):
+        """Validate the form for the audit report and return generate_document's arguments, or None."""
         if not self.excel_file_path.get():
             self.show_error("Please select a Trial Balance Excel file", "Error: No Excel file selected")
-            return
+            return None
 
         if not self.output_file_path.get():
             self.show_error("Please specify an output file path", "Error: No output path specified")
-            return
+            return None
 
         try:
             shares_curr_input = self.shares_curr.get()
@@ -451,16 +625,13 @@ class AuditReportGUI(tk.Tk):
                 self.show_error("Share numbers must be non-negative integers.", "Error: Invalid share numbers")
             else:
                 self.show_error("Share numbers must be valid integers.", "Error: Invalid share numbers")
-            return
+            return None
 
         try:
             current_year = int(self.year_var.get())
         except ValueError:
             self.show_error("Current year must be a valid integer.", "Error: Invalid current year")
-            return
-
-        self.status_label.config(text="Generating report... Please wait.")
-        self.update()
+            return None
 
         excel_file_path = self.excel_file_path.get()
         output_path = self.output_file_path.get()
@@ -472,139 +643,138 @@ class AuditReportGUI(tk.Tk):
 
         if not os.path.exists(excel_file_path):
             self.show_error(f"Trial balance Excel file not found: {excel_file_path}", "Error: Excel file not found")
-            return
+            return None
+
+        if not self.check_tb_sheets(excel_file_path, current_year):
+            return None
+
+        # Read every Tk variable here; the worker thread must not touch them
+        return dict(
+            business_type=self.business_type.get(),
+            excel_file=excel_file_path,
+            output_path=output_path,
+            current_year=current_year,
+            first_year=self.first_year.get(),
+            company_name_en=self.company_name_en.get(),
+            company_name_cn=self.company_name_cn.get(),
+            company_address=self.company_address.get(),
+            business_description=self.business_description.get(),
+            additional_business_description=self.additional_business_description.get(),
+            last_day_of_year=self.last_day_of_year.get(),
+            date_of_incorporation=self.date_of_incorporation.get(),
+            audit_firm=self.audit_firm.get(),
+            approval_date=self.approval_date.get(),
+            auditor_name=self.auditor_name.get(),
+            auditor_license=self.auditor_license.get(),
+            currency=self.currency.get(),
+            currency_desc=self.currency_desc.get(),
+            currency_full_desc=self.currency_full_desc.get(),
+            directors=self.directors.get().splitlines(),
+            shareholders=self.shareholders.get().splitlines(),
+            shares_curr=self.shares_curr.get(),
+            shares_prev=self.shares_prev.get(),
+            non_current_assets=self.non_current_assets,
+            current_assets=self.current_assets,
+            current_liabilities=self.current_liabilities,
+            non_current_liabilities=self.non_current_liabilities,
+            equity=self.equity,
+            revenue_items=self.revenue_items,
+            cost_of_sales_items=self.cost_of_sales_items,
+            closing_inventories=self.closing_inventories,
+            other_income_items=self.other_income_items,
+            general_admin_expenses_items=self.general_admin_expenses_items,
+            finance_costs_items=self.finance_costs_items,
+            tax_items=self.tax_items,
+            has_name_changed=self.has_name_changed.get(),
+            passed_date=self.passed_date.get(),
+            new_company_name=self.new_company_name.get(),
+            effective_date=self.effective_date.get(),
+            old_company_name=self.old_company_name.get(),
+            has_related_party=self.has_related_party.get(),
+            inventory_valuation=self.inventory_valuation.get(),
+            tax_opt=self.tax_opt.get(),
+            capital_increase=self.capital_increase.get(),
+            has_ultimate_company=self.has_ultimate_company.get(),
+            ultimate_company_option=self.ultimate_company_option.get(),
+            ultimate_company_name1=self.ultimate_company_name1.get(),
+            ultimate_company_location1=self.ultimate_company_location1.get(),
+            ultimate_company_name2=self.ultimate_company_name2.get(),
+            ultimate_company_location2=self.ultimate_company_location2.get(),
+            investment_in_company=self.investment_in_company.get(),
+            investment_in_security=self.investment_in_security.get(),
+            audit_opinion=self.audit_opinion.get(),
+            audit_type=self.audit_type.get(),
+        )
 
-        from data_loader import DataLoader
-        original_init = DataLoader.__init__
+    def _report_done(self, outcome, output_path):
+        result, error_message = outcome
+        logger.info(f"Run metrics: {outcome.metrics.to_json()}")
+        if result is None:
+            self.status_label.config(text=error_message)
+            messagebox.showwarning("Warning", error_message)
+            return
 
-        def custom_init(self, excel_file, first_year=False, current_year=None, non_current_assets=None, current_assets=None,
-                current_liabilities=None, non_current_liabilities=None, equity=None,
-                revenue_items=None, cost_of_sales_items=None, closing_inventories=None,
-                other_income_items=None, general_admin_expenses_items=None,
-                finance_costs_items=None, tax_items=None):
-            gui_year = current_year
+        if error_message:
+            messagebox.showwarning("Warning", error_message)
 
-            print(f"Custom init with forced year from GUI: {gui_year}")
-            self.excel_file = excel_file
-            self.current_year = gui_year
-            self.previous_year = gui_year - 1
-            self.current_sheet = f"{self.current_year}TB"
-            self.previous_sheet = f"{self.previous_year}TB"
-            print(f"Using sheet names: {self.current_sheet} and {self.previous_sheet}")
+        if not os.path.exists(output_path):
+            default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_report_filled.docx")
+            if os.path.exists(default_path):
+                import shutil
+                shutil.copy2(default_path, output_path)
+                print(f"Moved file from {default_path} to {output_path}")
 
-            try:
-                import pandas as pd
-                excel = pd.ExcelFile(excel_file)
-                sheet_names = excel.sheet_names
-
-                missing_sheets = []
-                if self.current_sheet not in sheet_names:
-                    missing_sheets.append(self.current_sheet)
-                if not first_year and self.previous_sheet not in sheet_names:
-                    missing_sheets.append(self.previous_sheet)
-
-                if missing_sheets:
-                    error_msg = f"The Excel file does not contain the required sheet(s): {', '.join(missing_sheets)}.\n"
-                    error_msg += f"The Excel file contains the following sheets: {', '.join(sheet_names)}."
-                    raise ValueError(f"Required sheets not found: {error_msg}")
-
-                return original_init(self, excel_file, first_year, gui_year, non_current_assets, current_assets,
-                            current_liabilities, non_current_liabilities, equity, revenue_items,
-                            cost_of_sales_items, closing_inventories, other_income_items,
-                            general_admin_expenses_items, finance_costs_items, tax_items)
-            except ValueError as e:
-                raise
-            except Exception as e:
-                raise
+        if not os.path.exists(output_path):
+            self.show_error(f"Generated file not found at {output_path}", "Error: Generated file not found")
+            return
 
-        DataLoader.__init__ = custom_init
+        self.status_label.config(text=f"Report generated successfully: {output_path}")
 
-        try:
-            result, error_message = self._document_generator.generate_document(
-                business_type=self.business_type.get(),
-                excel_file=excel_file_path,
-                output_path=output_path,
-                current_year=current_year,
-                first_year=self.first_year.get(),
-                company_name_en=self.company_name_en.get(),
-                company_name_cn=self.company_name_cn.get(),
-                company_address=self.company_address.get(),
-                business_description=self.business_description.get(),
-                additional_business_description=self.additional_business_description.get(),
-                last_day_of_year=self.last_day_of_year.get(),
-                date_of_incorporation=self.date_of_incorporation.get(),
-                audit_firm=self.audit_firm.get(),
-                approval_date=self.approval_date.get(),
-                auditor_name=self.auditor_name.get(),
-                auditor_license=self.auditor_license.get(),
-                currency=self.currency.get(),
-                currency_desc=self.currency_desc.get(),
-                currency_full_desc=self.currency_full_desc.get(),
-                directors=self.directors.get().splitlines(),
-                shareholders=self.shareholders.get().splitlines(),
-                shares_curr=self.shares_curr.get(),
-                shares_prev=self.shares_prev.get(),
-                non_current_assets=self.non_current_assets,
-                current_assets=self.current_assets,
-                current_liabilities=self.current_liabilities,
-                non_current_liabilities=self.non_current_liabilities,
-                equity=self.equity,
-                revenue_items=self.revenue_items,
-                cost_of_sales_items=self.cost_of_sales_items,
-                closing_inventories=self.closing_inventories,
-                other_income_items=self.other_income_items,
-                general_admin_expenses_items=self.general_admin_expenses_items,
-                finance_costs_items=self.finance_costs_items,
-                tax_items=self.tax_items,
-                has_name_changed=self.has_name_changed.get(),
-                passed_date=self.passed_date.get(),
-                new_company_name=self.new_company_name.get(),
-                effective_date=self.effective_date.get(),
-                old_company_name=self.old_company_name.get(),
-                has_related_party=self.has_related_party.get(),
-                inventory_valuation=self.inventory_valuation.get(),
-                tax_opt=self.tax_opt.get(),
-                capital_increase=self.capital_increase.get(),
-                has_ultimate_company=self.has_ultimate_company.get(),
-                ultimate_company_option=self.ultimate_company_option.get(),
-                ultimate_company_name1=self.ultimate_company_name1.get(),
-                ultimate_company_location1=self.ultimate_company_location1.get(),
-                ultimate_company_name2=self.ultimate_company_name2.get(),
-                ultimate_company_location2=self.ultimate_company_location2.get(),
-                investment_in_company=self.investment_in_company.get(),
-                investment_in_security=self.investment_in_security.get(),
-                audit_opinion=self.audit_opinion.get(),
-                audit_type=self.audit_type.get(),
-            )
-            if result is None:
-                self.status_label.config(text=error_message)
-                messagebox.showwarning("Warning", error_message)
-                return
+        if messagebox.askyesno("Success", f"Report generated successfully at {output_path}. Would you like to open it now?"):
+            self._open_document(output_path)
 
-            if error_message:
-                messagebox.showwarning("Warning", error_message)
+    def generate_both_reports(self):
+        """Generate the audit and aux reports in one run, loading and categorizing the TB only once."""
+        kwargs = self._report_kwargs()
+        if kwargs is None:
+            return
+        aux_kwargs = self._aux_report_kwargs()
+        if aux_kwargs is None:
+            return
 
-            if not os.path.exists(output_path):
-                default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_report_filled.docx")
-                if os.path.exists(default_path):
-                    import shutil
-                    shutil.copy2(default_path, output_path)
-                    print(f"Moved file from {default_path} to {output_path}")
+        self.status_label.config(text="Generating reports... Please wait.")
+        output_path, output_aux_file_path = kwargs['output_path'], aux_kwargs['aux_output_path']
+        self._run_in_background(
+            lambda progress: self.get_document_generator().generate_all(kwargs, aux_kwargs, progress=progress),
+            lambda outcomes: self._both_reports_done(outcomes, output_path, output_aux_file_path),
+            self._report_failed,
+        )
 
-            if not os.path.exists(output_path):
-                self.show_error(f"Generated file not found at {output_path}", "Error: Generated file not found")
-                return
+    def _both_reports_done(self, outcomes, output_path, output_aux_file_path):
+        generated, messages = [], []
+        for outcome, path in zip(outcomes, (output_path, output_aux_file_path)):
+            result, error_message = outcome
+            logger.info(f"Run metrics ({os.path.basename(path)}): {outcome.metrics.to_json()}")
+            # A TB error fails both reports with the same message; show it once
+            if error_message and error_message not in messages:
+                messages.append(error_message)
+                messagebox.showwarning("Warning", error_message)
+            if result is not None and os.path.exists(path):
+                generated.append(path)
+        if not generated:
+            self.status_label.config(text=messages[0] if messages else "Error: No report generated")
+            return
 
-            self.status_label.config(text=f"Report generated successfully: {output_path}")
+        paths = " and ".join(generated)
+        self.status_label.config(text=f"Generated: {paths}")
 
-            if messagebox.askyesno("Success", f"Report generated successfully at {output_path}. Would you like to open it now?"):
-                if sys.platform == 'darwin':
-                    os.system(f"open '{output_path}'")
-                elif sys.platform == 'win32':
-                    os.system(f'start "" "{output_path}"')
-                else:
-                    os.system(f"xdg-open '{output_path}'")
+        if messagebox.askyesno("Success", f"Generated {paths}. Would you like to open them now?"):
+            for path in generated:
+                self._open_document(path)
 
+    def _report_failed(self, error):
+        try:
+            raise error
         except UnrecognizedItemError as e:
             self.status_label.config(text="Error: Unrecognized item in TB sheet")
             messagebox.showwarning("Warning", str(e))
@@ -630,9 +800,6 @@ class AuditReportGUI(tk.Tk):
             traceback.print_exc()
             return
 
-        finally:
-            DataLoader.__init__ = original_init
-
 if __name__ == "__main__":
     app = AuditReportGUI()
     app.mainloop()
\ No newline at end of file
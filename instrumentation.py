@@ -0,0 +1,95 @@
+"""Timings and counters of a report run, returned with its result so slow runs can be diagnosed from the log."""
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+
+class RunMetrics:
+    """Span timings and counters recorded during one generate_document/generate_aux_document call.
+
+    Spans are either sequential (begin() ends the open span and starts the next, as the generation stages do)
+    or context-managed with span(). Counters are plain named integers.
+    """
+
+    def __init__(self):
+        self.spans = []  # [name, seconds] in start order
+        self.counters = {}
+        self.total_seconds = None
+        self._started = time.perf_counter()
+        self._open = None  # (span, start time) of the span begun with begin()
+
+    @contextmanager
+    def span(self, name):
+        """Time the with block as a span called name."""
+        span = [name, None]
+        self.spans.append(span)
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            span[1] = time.perf_counter() - started
+
+    def begin(self, name):
+        """End the open sequential span, if any, and start one called name."""
+        self.end()
+        span = [name, None]
+        self.spans.append(span)
+        self._open = (span, time.perf_counter())
+
+    def end(self):
+        """End the open sequential span."""
+        if self._open is not None:
+            span, started = self._open
+            span[1] = time.perf_counter() - started
+            self._open = None
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self):
+        """End the open span and record the run's total time."""
+        self.end()
+        self.total_seconds = time.perf_counter() - self._started
+        return self
+
+    def to_dict(self):
+        return {
+            'total_seconds': None if self.total_seconds is None else round(self.total_seconds, 6),
+            'spans': [{'name': name, 'seconds': None if seconds is None else round(seconds, 6)} for name, seconds in self.spans],
+            'counters': dict(self.counters),
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+class GenerationResult(tuple):
+    """The (result, message) pair of a generation run, with the run's RunMetrics as .metrics.
+
+    It unpacks like the plain pair, so existing callers are unaffected.
+    """
+
+    def __new__(cls, result, message, metrics=None):
+        pair = super().__new__(cls, (result, message))
+        pair.metrics = metrics
+        return pair
+
+    @property
+    def result(self):
+        return self[0]
+
+    @property
+    def message(self):
+        return self[1]
+
+
+def instrumented(method):
+    """Give a generation method a RunMetrics (metrics=, or a new one) and return a GenerationResult."""
+    @functools.wraps(method)
+    def wrapper(self, *args, metrics=None, **kwargs):
+        if metrics is None:
+            metrics = RunMetrics()
+        result, message = method(self, *args, metrics=metrics, **kwargs)
+        return GenerationResult(result, message, metrics.finish())
+    return wrapper
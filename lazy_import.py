@@ -0,0 +1,46 @@
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundImport:
+    """Import a module on a daemon thread, so a slow import (pandas, docxtpl) does not block the caller.
+
+    start() begins the import; get() waits for it, starting it first if needed, and re-raises any import error.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._module = None
+        self._error = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._import, daemon=True)
+                self._thread.start()
+        return self
+
+    def _import(self):
+        started = time.perf_counter()
+        try:
+            self._module = importlib.import_module(self.name)
+            logger.info(f"Imported {self.name} in the background: {time.perf_counter() - started:.3f} seconds")
+        except Exception as e:
+            self._error = e
+
+    def ready(self):
+        """Return True once the import has finished, successfully or not."""
+        return self._thread is not None and not self._thread.is_alive()
+
+    def get(self):
+        self.start()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._module
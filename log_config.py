@@ -0,0 +1,92 @@
+"""Logging setup for the entry points (main.py, batch.py); library modules only create their loggers.
+
+Records go through a QueueHandler to a QueueListener thread that does the file and console writes, so logging
+never blocks report generation on I/O. Levels can be set per subsystem (logger name), from code or from the
+AUDIT_REPORT_LOG_LEVELS environment variable, e.g. "INFO,document_generator=DEBUG,template_cache=WARNING".
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+LOG_LEVELS_ENV = 'AUDIT_REPORT_LOG_LEVELS'
+
+_listener = None
+
+
+def default_log_file(name="startup_log.txt"):
+    """Return the log file path: next to the executable when frozen, otherwise in the working directory."""
+    return os.path.join(os.path.dirname(sys.executable), name) if hasattr(sys, 'frozen') else name
+
+
+def parse_levels(spec):
+    """Parse "LEVEL,name=LEVEL,..." into {logger name: level}; a bare level is for the root logger ('')."""
+    levels = {}
+    for part in (spec or '').split(','):
+        if not part.strip():
+            continue
+        name, _, level = part.rpartition('=')
+        levels[name.strip()] = _level(level)
+    return levels
+
+
+def _level(level):
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(level.strip().upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return value
+
+
+def configure_logging(log_file=None, level=logging.INFO, levels=None, console=False):
+    """Send every log record through a queue to the log file and/or stderr, replacing earlier handlers.
+
+    level is the root level; levels maps logger names to their own level. Both are overridden by
+    AUDIT_REPORT_LOG_LEVELS. Returns the started QueueListener, which is stopped (and flushed) at exit.
+    """
+    global _listener
+    stop_logging()
+
+    formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(QueueHandler(log_queue))
+
+    all_levels = {'': level}
+    all_levels.update(levels or {})
+    all_levels.update(parse_levels(os.environ.get(LOG_LEVELS_ENV)))
+    for name, name_level in all_levels.items():
+        logging.getLogger(name or None).setLevel(_level(name_level))
+
+    _listener = QueueListener(log_queue, *handlers)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Stop the listener started by configure_logging after it has written every queued record."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
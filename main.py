@@ -1,4 +1,7 @@
-from gui.main_gui import AuditReportGUI
+from log_config import configure_logging, default_log_file
 if __name__ == "__main__":
+    # Before importing the GUI, so its import timings are logged too
+    configure_logging(default_log_file())
+    from gui.main_gui import AuditReportGUI
     app = AuditReportGUI()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Report amount formatting: thousands separators, brackets for costs/liabilities/negatives and '-' for zero."""
+from functools import lru_cache
+
+import numpy as np
+
+DASH = "-"
+
+
+def parse_amount(value):
+    """Return a number from an amount, accepting formatted strings such as '1,234' or '(1,234.50)'; '' is 0."""
+    if isinstance(value, str):
+        value = value.replace(',', '').replace('(', '').replace(')', '')
+        return float(value) if value else 0
+    return value
+
+
+class NumberFormatter:
+    """Formats amounts for one precision (whole numbers or two decimals) and an optional currency prefix.
+
+    The format spec is compiled once per formatter. Whole numbers are truncated, as int() does, and two-decimal
+    amounts are rounded by the format spec. An amount shows '-' when it formats as zero.
+
+    Sign conventions: is_tax shows the absolute value without brackets, is_cost_or_admin and is_liability always
+    bracket it, otherwise negative amounts are bracketed.
+    """
+
+    def __init__(self, use_two_decimals=False, currency=""):
+        self.use_two_decimals = use_two_decimals
+        self.currency = currency
+        self._spec = (currency + "{:,.2f}" if use_two_decimals else currency + "{:,.0f}").format
+        self._zero = self._spec(0)
+
+    def format(self, value, is_cost_or_admin=False, is_liability=False, is_tax=False):
+        value = parse_amount(value)
+        if not self.use_two_decimals:
+            value = int(value)
+        text = self._spec(abs(value))
+        if text == self._zero:
+            return DASH
+        if is_tax:
+            return text
+        if is_cost_or_admin or is_liability or value < 0:
+            return f"({text})"
+        return text
+
+    def format_many(self, values, is_cost_or_admin=False, is_liability=False, is_tax=False):
+        """Format a sequence of amounts in one call and return a list of strings.
+
+        The flags are either a bool for every amount or a sequence with one bool per amount.
+        """
+        amounts = np.array([parse_amount(value) for value in values], dtype=float)
+        if not self.use_two_decimals:
+            amounts = np.trunc(amounts)
+        texts = [self._spec(value) for value in np.abs(amounts).tolist()]
+        # dtype=bool keeps an empty flag sequence from becoming a float array
+        bracketed = (
+            np.asarray(is_cost_or_admin, dtype=bool) | np.asarray(is_liability, dtype=bool) | (amounts < 0)
+        ) & ~np.asarray(is_tax, dtype=bool)
+        bracketed = np.broadcast_to(bracketed, amounts.shape).tolist()
+        zero = self._zero
+        return [
+            DASH if text == zero else f"({text})" if bracket else text
+            for text, bracket in zip(texts, bracketed)
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_formatter(use_two_decimals=False, currency=""):
+    """Return the shared formatter for a precision and currency prefix."""
+    return NumberFormatter(bool(use_two_decimals), currency)
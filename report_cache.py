@@ -0,0 +1,166 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+from tb_cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+# Modules whose code shapes the generated reports; a change to any of them misses every older entry
+REPORT_MODULES = (
+    'balance_index', 'category_index', 'comparative_table', 'data_loader', 'document_generator', 'number_format',
+    'report_cache', 'template_cache', 'utils',
+)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".audit_report_cache", "reports")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Return a digest of the REPORT_MODULES sources, or of the executable's size and mtime in a frozen build."""
+    base = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    try:
+        for name in REPORT_MODULES:
+            digest.update(file_digest(os.path.join(base, f"{name}.py")).encode('ascii'))
+    except OSError:
+        # PyInstaller builds ship bytecode only, and every build produces a new executable
+        stat = os.stat(sys.executable)
+        return f"executable:{stat.st_size}:{stat.st_mtime_ns}"
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """On-disk LRU cache of generated reports, keyed by everything the report is generated from.
+
+    An entry is the report ({key}.docx) plus the message its run returned ({key}.json). A hit copies the
+    report to the requested output path, or hard-links it when link is True; linked outputs share the cached
+    file, so they must not be edited in place.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, link=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.link = link
+        self._digests = {}  # (path, mtime, size) -> content digest, avoids rehashing unchanged files
+
+    def digest(self, path):
+        """Return the content digest of a file, rehashing it only when it changed."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(signature)
+        if digest is None:
+            digest = file_digest(path)
+            self._digests[signature] = digest
+        return digest
+
+    @staticmethod
+    def key_for(*parts):
+        """Build a cache key from the code version, content digests and JSON-serializable inputs."""
+        source = json.dumps([code_version()] + list(parts), sort_keys=True, ensure_ascii=False, default=repr)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def _path(self, key, extension):
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+
+    def fetch(self, key, output_path):
+        """Put the cached report for a key at output_path and return its message, or return None on a miss."""
+        report_path = self._path(key, '.docx')
+        try:
+            with open(self._path(key, '.json'), encoding='utf-8') as f:
+                message = json.load(f)['message']
+            if os.path.lexists(output_path):
+                os.remove(output_path)
+            if self.link:
+                try:
+                    os.link(report_path, output_path)
+                except OSError:
+                    shutil.copyfile(report_path, output_path)  # Another volume, or no hard links there
+            else:
+                shutil.copyfile(report_path, output_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Cannot use cached report {report_path}: {str(e)}")
+            return None
+        for path in (report_path, self._path(key, '.json')):
+            try:
+                os.utime(path)  # Mark as recently used
+            except OSError:
+                pass
+        return message
+
+    def put(self, key, report_path, message=""):
+        """Store a generated report atomically, then evict the least recently used reports over the size limit."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # The report goes in first: an entry counts only once its message file exists
+        self._write(self._path(key, '.docx'), lambda tmp_path: shutil.copyfile(report_path, tmp_path))
+        self._write(self._path(key, '.json'), lambda tmp_path: self._dump_message(tmp_path, message))
+        self._evict()
+
+    def _write(self, path, write):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _dump_message(path, message):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'message': message}, f, ensure_ascii=False)
+
+    def clear(self):
+        """Remove every cached report."""
+        for key, _, _ in self._entries():
+            self._remove_entry(key)
+
+    def _entries(self):
+        """Return (key, last use, bytes) for every cached report."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return []
+        entries = {}
+        for name in names:
+            key, extension = os.path.splitext(name)
+            if extension not in ('.docx', '.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            used, size = entries.get(key, (0, 0))
+            entries[key] = (max(used, stat.st_mtime), size + stat.st_size)
+        return [(key, used, size) for key, (used, size) in entries.items()]
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove_entry(key)
+            total -= size
+
+    def _remove_entry(self, key):
+        # The message file goes first, so a half-removed entry is a miss
+        self._remove(self._path(key, '.json'))
+        self._remove(self._path(key, '.docx'))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
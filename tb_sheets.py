@@ -0,0 +1,49 @@
+import posixpath
+import re
+import zipfile
+from xml.etree import ElementTree
+
+# Trial balance sheets are named after their year, e.g. '2024TB'
+TB_SHEET_NAME = re.compile(r"(\d{4})TB")
+
+WORKBOOK_PART = 'xl/workbook.xml'
+OFFICE_DOCUMENT_REL = '/officeDocument'
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _workbook_part(archive):
+    """Return the name of the workbook part, normally xl/workbook.xml."""
+    if WORKBOOK_PART in archive.namelist():
+        return WORKBOOK_PART
+    with archive.open('_rels/.rels') as f:
+        for relationship in ElementTree.parse(f).getroot():
+            if relationship.get('Type', '').endswith(OFFICE_DOCUMENT_REL):
+                return posixpath.normpath(relationship.get('Target').lstrip('/'))
+    raise ValueError("The file has no workbook part")
+
+
+def list_sheet_names(path):
+    """Return the sheet names of an .xlsx/.xlsm workbook in tab order, reading only its workbook part."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(_workbook_part(archive)) as f:
+                return [
+                    element.get('name')
+                    for _, element in ElementTree.iterparse(f)
+                    if _local_name(element.tag) == 'sheet'
+                ]
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise ValueError(f"Cannot read the sheet names of {path}: {str(e)}")
+
+
+def list_tb_sheets(path):
+    """Return the years that have a '{year}TB' sheet in the workbook, in ascending order."""
+    years = set()
+    for name in list_sheet_names(path):
+        match = TB_SHEET_NAME.fullmatch(name or '')
+        if match:
+            years.add(int(match.group(1)))
+    return sorted(years)
@@ -0,0 +1,146 @@
+import io
+import logging
+import os
+import threading
+from collections import namedtuple
+from importlib.metadata import PackageNotFoundError, version
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+logger = logging.getLogger(__name__)
+
+# CachedDocxTemplate overrides docxtpl internals that were verified against this release series only
+SUPPORTED_DOCXTPL = (0, 20)
+_DOCXTPL_HOOKS = ('init_docx', 'patch_xml', 'map_tree', 'render_xml_part', 'get_xml', 'get_part_xml',
+                  'get_headers_footers')
+
+
+def _docxtpl_supported():
+    """Return True if the installed docxtpl has the internals CachedDocxTemplate overrides."""
+    if not all(hasattr(DocxTemplate, name) for name in _DOCXTPL_HOOKS):
+        return False
+    try:
+        installed = tuple(int(part) for part in version('docxtpl').split('.')[:2])
+    except PackageNotFoundError:
+        return True  # Frozen builds may not ship package metadata; the pinned version is bundled
+    except ValueError:
+        return False
+    return installed == SUPPORTED_DOCXTPL
+
+
+DOCXTPL_SUPPORTED = _docxtpl_supported()
+if not DOCXTPL_SUPPORTED:
+    logger.warning("Unsupported docxtpl version, templates are cached as files only and rendered by plain DocxTemplate")
+
+# data is the raw .docx bytes; env and patched hold the compiled Jinja templates and patched XML
+_TemplateEntry = namedtuple('_TemplateEntry', ['mtime_ns', 'data', 'env', 'patched'])
+
+
+class _CompilingEnvironment(Environment):
+    """Jinja environment that compiles each template source only once."""
+
+    def __init__(self):
+        super().__init__()
+        self._compiled = {}
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals is not None or template_class is not None:
+            return super().from_string(source, globals, template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = super().from_string(source)
+            self._compiled[source] = template
+        return template
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """DocxTemplate built from cached bytes that reuses its entry's patched XML and compiled Jinja templates."""
+
+    def __init__(self, entry):
+        super().__init__(io.BytesIO(entry.data))
+        self._entry = entry
+
+    def patch_xml(self, src_xml):
+        patched = self._entry.patched.get(src_xml)
+        if patched is None:
+            patched = super().patch_xml(src_xml)
+            self._entry.patched[src_xml] = patched
+        return patched
+
+    def map_tree(self, tree):
+        # lxml is much slower replacing the body with an element from another document
+        # than moving that element's children into the existing body
+        body = self.docx._element.body
+        body[:] = list(tree)
+
+    def render(self, context, jinja_env=None, autoescape=False):
+        if jinja_env is None and not autoescape:
+            jinja_env = self._entry.env
+        super().render(context, jinja_env, autoescape)
+
+
+class TemplateCache:
+    """In-memory cache of report templates keyed by path and modification time."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, path):
+        mtime_ns = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry.mtime_ns == mtime_ns:
+            return entry, False
+        with open(path, 'rb') as f:
+            data = f.read()
+        entry = _TemplateEntry(mtime_ns, data, _CompilingEnvironment(), {})
+        with self._lock:
+            self._entries[path] = entry
+        return entry, True
+
+    def is_cached(self, path):
+        """Return True if the template at path is loaded and unchanged on disk."""
+        with self._lock:
+            entry = self._entries.get(path)
+        return entry is not None and entry.mtime_ns == os.stat(path).st_mtime_ns
+
+    def get(self, path):
+        """Return a fresh template for one render, reloading the file only if it changed on disk."""
+        entry, _ = self._entry(path)
+        if not DOCXTPL_SUPPORTED:
+            return DocxTemplate(io.BytesIO(entry.data))
+        return CachedDocxTemplate(entry)
+
+    def warm_up(self, paths):
+        """Load and compile templates on a background thread so the first render does not pay for it."""
+        thread = threading.Thread(target=self._warm_up, args=(list(paths),), daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self, paths):
+        for path in paths:
+            try:
+                entry, loaded = self._entry(path)
+                if loaded and DOCXTPL_SUPPORTED:
+                    self._precompile(CachedDocxTemplate(entry))
+                    logger.info(f"Warmed up template: {path}")
+            except Exception as e:
+                logger.warning(f"Failed to warm up template {path}: {str(e)}")
+
+    @staticmethod
+    def _precompile(template):
+        """Patch and compile the body, header and footer XML the way DocxTemplate.render does."""
+        template.init_docx()
+        parts = [(template.get_xml(), template.docx._part)]
+        for uri in (template.HEADER_URI, template.FOOTER_URI):
+            parts.extend((template.get_part_xml(part), part) for _, part in template.get_headers_footers(uri))
+        for xml, part in parts:
+            try:
+                template.render_xml_part(template.patch_xml(xml), part, {}, template._entry.env)
+            except Exception:
+                pass  # An empty context may not render, but the part is compiled by then
+
+
+# Shared by every DocumentGenerator in the process
+TEMPLATE_CACHE = TemplateCache()
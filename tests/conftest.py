@@ -0,0 +1,76 @@
+import os
+import sys
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+
+from benchmarks.synthetic_tb import write_workbook  # noqa: E402
+from data_loader import DataLoader  # noqa: E402
+from gui.category_manager import CategoryManager  # noqa: E402
+
+HEADER_ROWS = [["Company"], ["Trial balance"], ["Item", "Debtor", "Creditor"]]
+CATEGORY_KEYS = ('non_current_assets', 'current_assets', 'current_liabilities', 'non_current_liabilities', 'equity',
+                 'revenue_items', 'cost_of_sales_items', 'closing_inventories', 'other_income_items',
+                 'general_admin_expenses_items', 'finance_costs_items', 'tax_items')
+
+
+def docx_parts(path):
+    """Return the contents of a .docx by part name, without the docProps parts that hold timestamps."""
+    with zipfile.ZipFile(path) as docx:
+        return {name: docx.read(name) for name in docx.namelist() if not name.startswith('docProps')}
+
+
+@pytest.fixture(scope='session')
+def categories():
+    default = CategoryManager.load_default_categories(None)
+    return {key: default[key] for key in CATEGORY_KEYS}
+
+
+@pytest.fixture
+def write_tb(tmp_path):
+    """Write a workbook with one TB sheet per year: the header rows followed by `rows`, or by rows[year] for a dict."""
+    def write(rows, years=(2024, 2023), name='tb.xlsx'):
+        workbook = Workbook()
+        workbook.remove(workbook.active)
+        for year in years:
+            worksheet = workbook.create_sheet(f'{year}TB')
+            body = rows[year] if isinstance(rows, dict) else rows
+            for row in HEADER_ROWS + [list(row) for row in body]:
+                worksheet.append(row)
+        path = tmp_path / name
+        workbook.save(path)
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def make_loader(categories):
+    def make(excel_file, current_year=2024, first_year=False, **kwargs):
+        return DataLoader(excel_file, first_year, current_year, **categories, **kwargs)
+    return make
+
+
+@pytest.fixture
+def category_manager(tmp_path):
+    return CategoryManager(config_file=str(tmp_path / 'categories.json'))
+
+
+@pytest.fixture
+def report_fields(tmp_path, monkeypatch):
+    """generate_document and generate_aux_document arguments for a balanced synthetic TB."""
+    monkeypatch.chdir(ROOT)  # resource_path finds the templates from the working directory
+    excel_file = write_workbook(str(tmp_path / 'synthetic.xlsx'), rows=60)
+    company = dict(company_name_en="Acme Limited", directors=["Alice"], shareholders=["Alice"], audit_type="WOCP")
+    fields = dict(
+        company, excel_file=excel_file, output_path=str(tmp_path / 'report.docx'), current_year=2024,
+        last_day_of_year="31 December 2024", date_of_incorporation="1 January 2020", capital_increase="no_change",
+    )
+    aux_fields = dict(
+        company, aux_output_path=str(tmp_path / 'aux.docx'), business_type="general trading", currency="HK$",
+        has_stocking_letter=False, br_no="1",
+    )
+    return fields, aux_fields
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from balance_index import BalanceIndex
+from document_generator import DocumentGenerator
+
+
+def statement(current_assets=(), current_liabilities=(), **details):
+    balance = {'current_assets': [{'name': n, 'value': v} for n, v in current_assets],
+               'current_liabilities': [{'name': n, 'value': v} for n, v in current_liabilities],
+               'total_current_assets': sum(v for _, v in current_assets)}
+    result = {'BalanceSheet': balance}
+    result.update((key, [{'name': n, 'value': v} for n, v in items]) for key, items in details.items())
+    return result
+
+
+def test_lookups_with_repeated_names():
+    index = BalanceIndex(statement(
+        current_assets=[('deposits', 50), ('cash at bank', 100), ('deposits', 25)],
+        GeneralAdminExpensesDetails=[('rent', 10)],
+    ))
+    assert index.value('current_assets', 'deposits') == 50
+    assert index.value('current_assets', 'missing', None) is None
+    assert index.first('current_assets', ['cash at bank', 'deposits']) == 50
+    assert index.first('current_assets', ['missing']) == 0
+    assert index.total('current_assets', ['deposits', 'deposits', 'cash at bank']) == 175
+    assert index.value('GeneralAdminExpensesDetails', 'rent') == 10
+
+
+def test_due_info_prefers_liability_and_builds_title():
+    due_from = ['amount due from director']
+    due_to = ['amount due to director']
+    current = statement(current_assets=[('amount due from director', 3000)],
+                        current_liabilities=[('amount due to director', 500)])
+    previous = statement(current_assets=[('amount due from director', 1200)])
+    job = SimpleNamespace(
+        index_current=BalanceIndex(current), index_previous=BalanceIndex(previous), use_two_decimals=False,
+        all_items=frozenset(due_from + due_to), all_items_curr=frozenset(due_from + due_to),
+        all_items_prev=frozenset(due_from),
+    )
+
+    info = DocumentGenerator(None).get_due_info(job, due_from, due_to, due_from + due_to)
+    assert info == {'need_footnote': True, 'both_to': True, 'curr': '(500)', 'prev': '1,200', 'max': '1,200',
+                    'title_name': 'amount due from/(to) director'}
+
+    empty = SimpleNamespace(index_current=BalanceIndex(statement()), index_previous=BalanceIndex(statement()),
+                            use_two_decimals=False)
+    assert DocumentGenerator(None).get_due_info(empty, due_from, due_to, due_from + due_to) == {
+        'need_footnote': False, 'both_to': False, 'curr': '-', 'prev': '-', 'max': '-', 'title_name': ''}
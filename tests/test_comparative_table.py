@@ -0,0 +1,41 @@
+from comparative_table import comparative_rows, order_names, values_by_name
+from number_format import get_formatter
+
+
+def format_values(names, values):
+    return get_formatter(False).format_many(values)
+
+
+def detail(name, value):
+    return {'name': name, 'value': value}
+
+
+def test_repeated_name_keeps_first_value():
+    assert values_by_name([detail('cash', 10), detail('bank', 5), detail('cash', 99)]) == {'cash': 10, 'bank': 5}
+
+    rows = comparative_rows([detail('cash', 10), detail('cash', 99)], [detail('cash', 7)], format_values)
+    assert rows == [{'name': 'Cash', 'cu': '10', 'pr': '7', 'is_last': True}]
+
+
+def test_outer_join_fills_missing_year_with_zero():
+    rows = comparative_rows([detail('rent', 1200), detail('audit fee', 300)], [detail('bank charges', 40)],
+                            format_values)
+    assert [(row['name'], row['cu'], row['pr']) for row in rows] == [
+        ('Audit fee', '300', '-'), ('Bank charges', '-', '40'), ('Rent', '1,200', '-')]
+    assert [row['is_last'] for row in rows] == [False, False, True]
+
+
+def test_empty_section():
+    assert comparative_rows([], [], format_values) == []
+    assert comparative_rows([], [], format_values, priority=('share capital',), footnotes={}) == []
+
+
+def test_priority_order_and_footnotes():
+    current = [detail('reserves', 5), detail('share capital', 100), detail('accumulated losses', -20)]
+    rows = comparative_rows(current, [], format_values, priority=('share capital', 'reserves'),
+                            footnotes={'share capital': 8})
+    assert [row['name'] for row in rows] == ['Share capital', 'Reserves', 'Accumulated losses']
+    assert [row['fnnum'] for row in rows] == ['8', '', '']
+
+    assert order_names({'b', 'a', 'c'}, priority=('c',), others=False) == ['c']
+    assert order_names({'b', 'a', 'c'}, priority=('z', 'c')) == ['c', 'a', 'b']
@@ -0,0 +1,113 @@
+import pytest
+
+from category_index import CategoryIndex
+from exceptions import InvalidItemNameError
+
+TB_ROWS = [
+    ["Sales of goods", None, 10000],
+    ["Purchases", 4000, None],
+    ["Opening inventories", 500, None],
+    ["Closing inventories", -700, None],
+    ["Bank interest income", None, 200],
+    ["Accountancy fee", 1000, None],
+    ["Loan interest", 300, None],
+    ["Taxation", 150, None],
+    ["Intangible assets", 2000, None],
+    ["Amount due from director", 3000, None],
+    ["Accrued expenses", None, 800],
+    ["Deferred tax liabilities", None, 400],
+    ["Share capital", None, 10000],
+    ["合計", 10950, 21400],
+]
+
+
+def test_categorize_items_matches_hand_computed_statement(write_tb, make_loader):
+    statement = make_loader(write_tb(TB_ROWS)).get_income_statement(2024)
+
+    assert statement['Revenue'] == 10000
+    assert statement['CostOfSales'] == 4000 + 500 - 700
+    assert statement['GrossProfit'] == 6200
+    assert statement['OtherIncome'] == 200
+    assert statement['CalcTotal'] == 6400
+    assert statement['GeneralAdminExpenses'] == 1000
+    assert statement['FinanceCosts'] == -300
+    assert statement['ProfitBeforeTax'] == 6400 - 1000 - 300
+    assert statement['Taxation'] == -150
+    assert statement['ProfitForYear'] == 4950
+    assert [(d['name'], d['value']) for d in statement['CostItemsDetails']] == [
+        ('purchases', 4000), ('opening inventories', 500), ('closing inventories', 700)]
+    assert [d['name'] for d in statement['GeneralAdminExpensesDetails']] == ['accountancy fee']
+
+    balance = statement['BalanceSheet']
+    assert balance['total_non_current_assets'] == 2000
+    assert balance['total_current_assets'] == 3000
+    assert balance['total_current_liabilities'] == 800
+    assert balance['total_non_current_liabilities'] == 400
+    assert balance['total_equity'] == 10000
+    assert balance['net_assets'] == 2000 + 3000 - 800 - 400
+    assert [(d['name'], d['value']) for d in balance['equity']] == [('share capital', 10000)]
+    assert all(isinstance(statement[key], int) for key in ('Revenue', 'CostOfSales', 'ProfitForYear'))
+
+
+def test_categorize_items_keeps_cents(write_tb, make_loader):
+    rows = [["Sales of goods", None, 1000.25], ["Accountancy fee", 200.1, None], ["Share capital", None, 800.15]]
+    loader = make_loader(write_tb(rows))
+    statement = loader.get_income_statement(2024)
+
+    assert loader.use_two_decimals
+    assert statement['Revenue'] == 1000.25
+    assert statement['GeneralAdminExpenses'] == 200.1
+    assert statement['ProfitForYear'] == pytest.approx(800.15)
+    assert statement['BalanceSheet']['total_equity'] == 800.15
+
+
+def test_income_statement_is_memoized(write_tb, make_loader):
+    loader = make_loader(write_tb(TB_ROWS))
+    statement = loader.get_income_statement(2024)
+
+    assert loader.get_income_statement(2024) is statement
+    with pytest.raises(TypeError):
+        statement['Revenue'] = 0
+
+    loader.invalidate_cache()
+    assert loader.get_income_statement(2024) is not statement
+    assert loader.get_income_statement(2024) == statement
+
+
+def test_income_statement_recomputed_when_inputs_change(write_tb, make_loader, categories):
+    loader = make_loader(write_tb(TB_ROWS))
+    statement = loader.get_income_statement(2024)
+
+    df = loader.data[2024].copy()
+    df.loc[df['Item'] == 'sales of goods', 'Creditor'] = 12000
+    loader.data[2024] = df
+    assert loader.get_income_statement(2024)['Revenue'] == 12000
+
+    loader.category_index = CategoryIndex(categories)
+    assert loader.get_income_statement(2024) is not statement
+
+    loader.use_two_decimals = True
+    assert isinstance(loader.get_income_statement(2024)['Revenue'], float)
+
+
+def test_invalid_item_names_reported_together(write_tb, make_loader):
+    rows = [["Sales of goods", None, 100], ["Cash #1", 100, None], ["Rent (office)", 5, None]]
+    with pytest.raises(InvalidItemNameError) as excinfo:
+        make_loader(write_tb(rows))
+    message = str(excinfo.value)
+    assert "Sheet '2024TB', row 5: 'cash #1'" in message
+    assert "Sheet '2024TB', row 6: 'rent (office)'" in message
+    assert "Sheet '2023TB', row 5: 'cash #1'" in message
+
+
+def test_previous_year_decimals_switch_precision(write_tb, make_loader):
+    rows = {2024: [["Sales of goods", None, 1000]], 2023: [["Sales of goods", None, 999.5]]}
+    loader = make_loader(write_tb(rows))
+    assert loader.use_two_decimals
+    assert loader.get_income_statement(2023)['Revenue'] == 999.5
+
+
+def test_whole_amounts_keep_integer_precision(write_tb, make_loader):
+    loader = make_loader(write_tb([["Sales of goods", None, 1000.0000001]]))
+    assert not loader.use_two_decimals
+    assert loader.get_income_statement(2024)['Revenue'] == 1000
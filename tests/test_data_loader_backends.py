@@ -0,0 +1,33 @@
+import pytest
+
+from data_loader import BACKENDS
+from exceptions import InvalidTBSheetFormatError
+
+BODY = [["Cash and bank balances", 1000, None], ["Share capital", None, 1000]]
+TOTALS = [["合計", 1000, 1000], ["董事簽名：", None, None]]
+
+
+def load_both(make_loader, path):
+    return [make_loader(path, backend=backend) for backend in BACKENDS]
+
+
+def test_header_only_sheet_rejected_by_both_backends(write_tb, make_loader):
+    path = write_tb([])
+    for backend in BACKENDS:
+        with pytest.raises(InvalidTBSheetFormatError):
+            make_loader(path, backend=backend)
+
+
+@pytest.mark.parametrize('rows', [
+    BODY + TOTALS,
+    BODY + TOTALS + [["Prepared by the accountant", None, None], [None, None, None], ["Reviewed", None, None]],
+    TOTALS,
+], ids=['terminator', 'notes-after-totals', 'terminator-only'])
+def test_backends_agree(write_tb, make_loader, rows):
+    loaders = load_both(make_loader, write_tb(rows))
+    frames = [loader.data[2024].reset_index(drop=True) for loader in loaders]
+    assert frames[0].values.tolist() == frames[1].values.tolist()
+    assert not frames[0]['Item'].isin(['合計', '董事簽名：']).any()
+    statements = [loader.get_income_statement(2024) for loader in loaders]
+    assert statements[0]['BalanceSheet'] == statements[1]['BalanceSheet']
+    assert statements[0]['BalanceSheet']['net_assets'] == (1000 if rows[0] is BODY[0] else 0)
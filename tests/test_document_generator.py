@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from benchmarks.synthetic_tb import write_workbook
+from conftest import docx_parts
+from document_generator import DocumentGenerator
+from exceptions import GenerationCancelledError
+from generation_stages import STAGE_RENDERING, STAGE_SAVING
+
+
+def test_loader_reused_until_categories_change(write_tb, category_manager):
+    generator = DocumentGenerator(category_manager)
+    path = write_tb([["Sales of goods", None, 1000], ["Consulting income", None, 500]])
+
+    loader = generator._get_accountant_helper(path, False, 2024)
+    assert generator._get_accountant_helper(path, False, 2024) is loader
+    index = loader.category_index
+
+    category_manager.add_item('revenue_items', 'consulting income')
+    updated = generator._get_accountant_helper(path, False, 2024)
+    assert updated is not loader
+    assert loader.category_index is index  # Jobs still holding the old loader are unaffected
+    assert updated.get_income_statement(2024)['Revenue'] == 1500
+    assert generator._get_accountant_helper(path, False, 2024) is updated
+
+
+def test_generate_all_rejects_reserved_fields(report_fields, category_manager):
+    fields, aux_fields = report_fields
+    generator = DocumentGenerator(category_manager)
+    with pytest.raises(ValueError, match="progress"):
+        generator.generate_all(dict(fields, progress=None), aux_fields)
+    with pytest.raises(ValueError, match="force"):
+        generator.generate_all(fields, dict(aux_fields, force=True))
+
+
+@pytest.mark.parametrize('change', [
+    {'last_day_of_year': "not a date"},
+    {'excel_file': 'missing.xlsx'},
+], ids=['bad-date', 'missing-workbook'])
+def test_generate_all_returns_errors(report_fields, category_manager, change):
+    fields, aux_fields = report_fields
+    result, aux_result = DocumentGenerator(category_manager).generate_all(dict(fields, **change), aux_fields)
+    assert result.result is None and result.message
+    assert aux_result == result
+    assert result.metrics.total_seconds is not None
+    assert not os.path.exists(fields['output_path']) and not os.path.exists(aux_fields['aux_output_path'])
+
+
+def test_generate_all_missing_sheet(tmp_path, report_fields, category_manager):
+    fields, aux_fields = report_fields
+    excel_file = write_workbook(str(tmp_path / 'one_year.xlsx'), years=(2024,), rows=20)
+    result, aux_result = DocumentGenerator(category_manager).generate_all(dict(fields, excel_file=excel_file), aux_fields)
+    assert result.result is None and '2023TB' in result.message
+    assert aux_result.message == result.message
+
+
+def test_generate_all_parallel_matches_sequential(tmp_path, report_fields, category_manager):
+    fields, aux_fields = report_fields
+    outputs = {}
+    for parallel in (False, True):
+        paths = dict(output_path=str(tmp_path / f'report_{parallel}.docx'),
+                     aux_output_path=str(tmp_path / f'aux_{parallel}.docx'))
+        stages = []
+        result, aux_result = DocumentGenerator(category_manager).generate_all(
+            dict(fields, output_path=paths['output_path']), dict(aux_fields, aux_output_path=paths['aux_output_path']),
+            parallel=parallel, progress=stages.append,
+        )
+        assert result.result and aux_result.result
+        assert stages[-1] == STAGE_SAVING
+        outputs[parallel] = [docx_parts(path) for path in paths.values()]
+    assert outputs[True] == outputs[False]
+
+
+def test_generate_all_cancelled(report_fields, category_manager):
+    fields, aux_fields = report_fields
+
+    def progress(stage):
+        if stage == STAGE_RENDERING:
+            raise GenerationCancelledError("Cancelled")
+    with pytest.raises(GenerationCancelledError):
+        DocumentGenerator(category_manager).generate_all(fields, aux_fields, progress=progress)
@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from number_format import get_formatter  # noqa: E402
+
+
+def test_format_many_empty_section():
+    formatter = get_formatter(False)
+    assert formatter.format_many([]) == []
+    assert formatter.format_many([], is_cost_or_admin=True, is_tax=[]) == []
+
+
+def test_format_many_matches_format():
+    formatter = get_formatter(True)
+    values = [1234.5, -20, 0, "(3,000)"]
+    is_tax = [False, True, False, False]
+    expected = [formatter.format(value, is_cost_or_admin=True, is_tax=tax) for value, tax in zip(values, is_tax)]
+    assert formatter.format_many(values, is_cost_or_admin=True, is_tax=is_tax) == expected
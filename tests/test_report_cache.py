@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+import report_cache
+from conftest import docx_parts
+from document_generator import DocumentGenerator
+from report_cache import ReportCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'source.docx'
+    path.write_bytes(b'report contents')
+    return str(path)
+
+
+def test_fetch_miss_then_hit(tmp_path, source):
+    cache = ReportCache(str(tmp_path / 'cache'))
+    key = cache.key_for('input')
+    output = str(tmp_path / 'out.docx')
+
+    assert cache.fetch(key, output) is None
+    assert not os.path.exists(output)
+    cache.put(key, source, "Done")
+    assert cache.fetch(key, output) == "Done"
+    with open(output, 'rb') as f:
+        assert f.read() == b'report contents'
+
+
+def test_key_changes_with_inputs_and_code_version(monkeypatch):
+    key = ReportCache.key_for('digest', {'company_name_en': "Acme"})
+    assert ReportCache.key_for('digest', {'company_name_en': "Acme"}) == key
+    assert ReportCache.key_for('digest', {'company_name_en': "Acme Ltd"}) != key
+
+    monkeypatch.setattr(report_cache, 'code_version', lambda: 'changed')
+    assert ReportCache.key_for('digest', {'company_name_en': "Acme"}) != key
+
+
+def test_link_mode_shares_cached_file(tmp_path, source):
+    for link in (False, True):
+        cache = ReportCache(str(tmp_path / 'cache'), link=link)
+        key = cache.key_for('input')
+        cache.put(key, source)
+        output = str(tmp_path / f'out_{link}.docx')
+        assert cache.fetch(key, output) == ""
+        assert os.path.samefile(output, cache._path(key, '.docx')) is link
+
+
+def test_least_recently_used_report_evicted(tmp_path, source):
+    cache = ReportCache(str(tmp_path / 'cache'))
+    keys = [cache.key_for(name) for name in ('a', 'b', 'c')]
+    for when, key in enumerate(keys[:2]):
+        cache.put(key, source)
+        for extension in ('.docx', '.json'):
+            os.utime(cache._path(key, extension), (1000 + when, 1000 + when))
+    assert cache.fetch(keys[0], str(tmp_path / 'out.docx')) is not None  # 'a' is now the most recently used
+
+    cache.max_bytes = sum(size for _, _, size in cache._entries())
+    cache.put(keys[2], source)
+    assert sorted(key for key, _, _ in cache._entries()) == sorted([keys[0], keys[2]])
+
+
+def test_generate_document_reuses_unchanged_report(tmp_path, report_fields, category_manager):
+    fields, _ = report_fields
+    generator = DocumentGenerator(category_manager, report_cache=ReportCache(str(tmp_path / 'cache')))
+
+    first = generator.generate_document(**fields)
+    assert first.result and first.metrics.counters['report_cache_misses'] == 1
+    generated = docx_parts(fields['output_path'])
+
+    second = generator.generate_document(**fields)
+    assert second.result and second.metrics.counters['report_cache_hits'] == 1
+    assert docx_parts(fields['output_path']) == generated
+
+    forced = generator.generate_document(force=True, **fields)
+    assert forced.result and 'report_cache_hits' not in forced.metrics.counters
+
+    changed = generator.generate_document(**dict(fields, company_name_en="Other Limited"))
+    assert 'report_cache_hits' not in changed.metrics.counters
+
+
+def test_generate_all_skips_trial_balance_when_both_reports_cached(tmp_path, report_fields, category_manager,
+                                                                   monkeypatch):
+    fields, aux_fields = report_fields
+    generator = DocumentGenerator(category_manager, report_cache=ReportCache(str(tmp_path / 'cache')))
+    assert all(result.result for result in generator.generate_all(fields, aux_fields))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("the trial balance was loaded")
+    monkeypatch.setattr(generator, 'build_report_context', fail)
+    result, aux_result = generator.generate_all(fields, aux_fields)
+    assert result.result and result.metrics.counters['report_cache_hits'] == 1
+    assert aux_result.result and aux_result.metrics.counters['report_cache_hits'] == 1
+
+    result, aux_result = generator.generate_all(fields, aux_fields, force=True)
+    assert result == (None, "the trial balance was loaded") == aux_result
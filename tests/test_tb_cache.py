@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from exceptions import InvalidItemNameError
+from tb_cache import TBCache
+
+ROWS = [["Sales of goods", None, 1000], ["Share capital", None, 1000]]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TBCache(cache_dir=str(tmp_path / 'tb'))
+
+
+def test_unchanged_workbook_hits_cache(write_tb, make_loader, cache):
+    path = write_tb(ROWS)
+    first = make_loader(path, cache=cache)
+    second = make_loader(path, cache=cache)
+
+    assert not first.loaded_from_cache
+    assert second.loaded_from_cache
+    assert second.get_income_statement(2024) == first.get_income_statement(2024)
+
+
+def test_changed_workbook_misses_cache(write_tb, make_loader, cache):
+    path = write_tb(ROWS)
+    make_loader(path, cache=cache)
+
+    assert write_tb([["Sales of goods", None, 2500], ["Share capital", None, 1000]]) == path
+    loader = make_loader(path, cache=cache)
+    assert not loader.loaded_from_cache
+    assert loader.get_income_statement(2024)['Revenue'] == 2500
+
+
+def test_load_options_are_part_of_key(write_tb, make_loader, cache):
+    path = write_tb(ROWS)
+    make_loader(path, cache=cache)
+
+    assert not make_loader(path, cache=cache, backend='openpyxl').loaded_from_cache
+    assert not make_loader(path, cache=cache, first_year=True).loaded_from_cache
+
+
+def test_cached_error_is_raised_again(write_tb, make_loader, cache):
+    path = write_tb([["Cash #1", 1, None]])
+    with pytest.raises(InvalidItemNameError):
+        make_loader(path, cache=cache)
+    assert len(cache._entries()) == 1
+    with pytest.raises(InvalidItemNameError, match="row 4: 'cash #1'"):
+        make_loader(path, cache=cache)
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = TBCache(cache_dir=str(tmp_path), max_bytes=0)
+    cache.put('old', {'value': 1})
+    assert cache.get('old') is None
+    assert os.listdir(tmp_path) == []
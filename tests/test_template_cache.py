@@ -0,0 +1,48 @@
+import io
+import zipfile
+
+import pytest
+from docx import Document
+from docxtpl import DocxTemplate
+
+import template_cache
+from template_cache import CachedDocxTemplate, TemplateCache
+
+CONTEXT = {'company_name': 'SAMPLE LIMITED', 'rows': [{'name': 'Cash', 'value': '1,000'}, {'name': 'Bank', 'value': '(20)'}]}
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    document = Document()
+    document.add_paragraph("{{ company_name }}")
+    document.add_paragraph("{% for row in rows %}{{ row.name }}: {{ row.value }}; {% endfor %}")
+    document.sections[0].header.add_paragraph("{{ company_name }} header")
+    path = tmp_path / 'template.docx'
+    document.save(path)
+    return str(path)
+
+
+def rendered_xml(template):
+    template.render(CONTEXT)
+    out = io.BytesIO()
+    template.save(out)
+    with zipfile.ZipFile(out) as docx:
+        return docx.read('word/document.xml'), docx.read('word/header1.xml')
+
+
+@pytest.mark.skipif(not template_cache.DOCXTPL_SUPPORTED, reason="installed docxtpl is not the verified release")
+def test_cached_template_renders_like_docxtpl(template_path):
+    cache = TemplateCache()
+    expected = rendered_xml(DocxTemplate(template_path))
+    assert b'Cash: 1,000; Bank: (20);' in expected[0]
+    first = cache.get(template_path)
+    assert isinstance(first, CachedDocxTemplate)
+    assert rendered_xml(first) == expected
+    assert rendered_xml(cache.get(template_path)) == expected
+
+
+def test_unsupported_docxtpl_falls_back_to_plain_template(monkeypatch, template_path):
+    monkeypatch.setattr(template_cache, 'DOCXTPL_SUPPORTED', False)
+    template = TemplateCache().get(template_path)
+    assert type(template) is DocxTemplate
+    assert rendered_xml(template) == rendered_xml(DocxTemplate(template_path))
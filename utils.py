@@ -1,9 +1,19 @@
 import os
 import sys
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
+from docx.shared import Pt
+from docx.text.paragraph import Paragraph
+from number_format import get_formatter
+
+# Cell markers emitted by the templates -> (w:val, w:sz) of the bottom border that replaces them
+BORDER_PLACEHOLDERS = {'[[UNDERLINE]]': ('single', '4'), '[[DBLine]]': ('double', '8')}
+
+# Cells of the body tables, skipping vertically merged continuations (their content lives in the cell above)
+TABLE_CELLS_XPATH = './w:tbl/w:tr/w:tc[not(w:tcPr/w:vMerge) or w:tcPr/w:vMerge/@w:val="restart"]'
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and PyInstaller."""
@@ -15,23 +25,9 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-def format_number(value, is_cost_or_admin=False, is_liability=False, is_tax=False):
+def format_number(value, is_cost_or_admin=False, is_liability=False, is_tax=False, use_two_decimals=False):
     """Format a number: commas for thousands, parentheses for costs/admin/liabilities, dash for zero (others)."""
-    if isinstance(value, str):
-        value = int(value.replace(',', '').replace('(', '').replace(')', '')) if value else 0
-    else:
-        value = int(value)
-    if value == 0:
-            return "-"
-    if is_tax:
-        return f"{abs(value):,.0f}"
-    elif is_cost_or_admin or is_liability:
-        return f"({abs(value):,.0f})"
-    else:
-        if value < 0:
-            return f"({abs(value):,.0f})"
-        else:
-            return f"{value:,.0f}"
+    return get_formatter(use_two_decimals).format(value, is_cost_or_admin, is_liability, is_tax)
 
 def update_fields(doc):
     """Update all fields in the document, including page numbers in footers."""
@@ -44,6 +40,64 @@ def update_fields(doc):
                     field.set(qn('w:instr'), 'PAGE')
                     run._element.append(field)
 
+def _strip_placeholders(text):
+    for placeholder in BORDER_PLACEHOLDERS:
+        text = text.replace(placeholder, '')
+    return text
+
+def apply_border_placeholders(doc):
+    """Replace [[UNDERLINE]]/[[DBLine]] table cell markers with bottom borders and reset table row heights and line spacing.
+
+    Returns the number of cells given a border.
+    """
+    body = doc.element.body
+
+    # Drop fixed row heights
+    for tr_height in body.xpath('./w:tbl/w:tr/w:trPr/w:trHeight[@w:val]'):
+        del tr_height.attrib[qn('w:val')]
+
+    # Single line spacing for every paragraph style used in the tables, set once per style
+    style_ids = set(body.xpath(TABLE_CELLS_XPATH + '/w:p/w:pPr/w:pStyle/@w:val'))
+    if body.xpath(TABLE_CELLS_XPATH + '/w:p[not(w:pPr/w:pStyle)]'):
+        style_ids.add(None)
+    for style_id in style_ids:
+        doc.part.get_style(str(style_id) if style_id is not None else None, WD_STYLE_TYPE.PARAGRAPH).paragraph_format.line_spacing = 1.0
+
+    marked = ' or '.join(f"contains(., '{placeholder}')" for placeholder in BORDER_PLACEHOLDERS)
+    bordered = 0
+    for tc in body.xpath(f'{TABLE_CELLS_XPATH}[{marked}]'):
+        paragraphs = [Paragraph(p, None) for p in tc.p_lst]
+        cell_text = "".join(paragraph.text for paragraph in paragraphs).strip()
+        border = next((BORDER_PLACEHOLDERS[placeholder] for placeholder in ('[[DBLine]]', '[[UNDERLINE]]') if placeholder in cell_text), None)
+        if border is None:
+            continue  # The marker was only in a nested table
+
+        for paragraph in paragraphs:
+            for run in paragraph.runs:
+                if any(placeholder in run.text for placeholder in BORDER_PLACEHOLDERS):
+                    run.font.size = Pt(11)
+                    run.text = _strip_placeholders(run.text)
+            # A marker split across runs is only visible in the paragraph text
+            paragraph_text = paragraph.text
+            if any(placeholder in paragraph_text for placeholder in BORDER_PLACEHOLDERS):
+                for r in paragraph._p.r_lst:
+                    paragraph._p.remove(r)
+                paragraph.add_run(_strip_placeholders(paragraph_text))
+
+        tcPr = tc.get_or_add_tcPr()
+        for existing_borders in tcPr.xpath('./w:tcBorders')[:1]:
+            tcPr.remove(existing_borders)
+        tcBorders = OxmlElement('w:tcBorders')
+        bottom = OxmlElement('w:bottom')
+        bottom.set(qn('w:val'), border[0])
+        bottom.set(qn('w:sz'), border[1])
+        bottom.set(qn('w:space'), '0')
+        bottom.set(qn('w:color'), '000000')
+        tcBorders.append(bottom)
+        tcPr.append(tcBorders)
+        bordered += 1
+    return bordered
+
 def insert_page_break_before_income_statement(doc):
     """Insert a page break before the Statement of Comprehensive Income table."""
     for i, para in enumerate(doc.paragraphs):